@@ -0,0 +1,251 @@
+"""End-to-end benchmark for the ticket pipeline.
+
+Drives ``SupportAgent.process_ticket`` over a ticket corpus with a deterministic fake LLM
+(the synthetic provider by default) and reports end-to-end latency percentiles,
+throughput, LLM calls per ticket, the attempt distribution and time spent in each graph
+node. Results are written as JSON so runs can be compared across commits:
+
+    python -m benchmarks.bench_pipeline --out benchmarks/results/current.json
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/baseline.json --max-regression 10
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "tickets.jsonl"
+NODES = ("classify", "retrieve", "draft", "review", "escalate")
+
+
+def load_corpus(path: str) -> List[Dict[str, str]]:
+    """Read tickets from JSONL; records with title/body (like requests.jsonl) are mapped too"""
+    tickets = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            tickets.append({
+                "subject": str(record.get("subject", record.get("title", ""))),
+                "description": str(record.get("description", record.get("body", "")))
+            })
+    return tickets
+
+
+def _pipeline_profiler():
+    # Imported lazily so the environment is configured before src.* reads settings
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class PipelineProfiler(BaseCallbackHandler):
+        """Collects per-node wall time and LLM call/token counts for one ticket"""
+
+        def __init__(self):
+            self.node_seconds: Dict[str, float] = defaultdict(float)
+            self.llm_calls = 0
+            self.tokens = 0
+            self._starts: Dict[Any, tuple] = {}
+            self._lock = threading.Lock()
+
+        def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None,
+                           tags=None, metadata=None, **kwargs):
+            node = (metadata or {}).get("langgraph_node")
+            # The node's own run is the one named after it and tagged with its graph step
+            if node and kwargs.get("name") == node:
+                with self._lock:
+                    self._starts[run_id] = (node, time.perf_counter())
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            with self._lock:
+                started = self._starts.pop(run_id, None)
+                if started:
+                    node, start = started
+                    self.node_seconds[node] += time.perf_counter() - start
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self.on_chain_end(None, run_id=run_id)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            with self._lock:
+                self.llm_calls += 1
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            usage = {}
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or usage
+            with self._lock:
+                self.tokens += usage.get("total_tokens", 0)
+
+    return PipelineProfiler
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    from src.core.batch import LatencyRecorder
+
+    recorder = LatencyRecorder(capacity=max(1, len(values)))
+    for value in values:
+        recorder.add(value)
+    return {
+        "mean": round(recorder.mean, 4),
+        "p50": round(recorder.percentile(50), 4),
+        "p95": round(recorder.percentile(95), 4),
+        "p99": round(recorder.percentile(99), 4),
+        "max": round(recorder.max, 4),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(tickets: List[Dict[str, str]], concurrency: int = 8, repeat: int = 1) -> Dict[str, Any]:
+    from src.config import settings
+    from src.core import SupportAgent
+    from src.core.llm_service import llm_service
+
+    profiler_cls = _pipeline_profiler()
+    agent = SupportAgent()
+    workload = [ticket for _ in range(repeat) for ticket in tickets]
+
+    def timed(ticket: Dict[str, str]) -> Dict[str, Any]:
+        profiler = profiler_cls()
+        start = time.perf_counter()
+        result = agent.process_ticket(ticket, {"callbacks": [profiler]})
+        return {
+            "latency": time.perf_counter() - start,
+            "attempt": result.get("attempt", 0),
+            "escalated": bool(result.get("escalated")),
+            "reused": bool(result.get("reused")),
+            "llm_calls": profiler.llm_calls,
+            "tokens": profiler.tokens,
+            "nodes": dict(profiler.node_seconds),
+        }
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        samples = list(executor.map(timed, workload))
+    wall = time.perf_counter() - started
+
+    node_samples: Dict[str, List[float]] = {node: [] for node in NODES}
+    for sample in samples:
+        for node in NODES:
+            node_samples[node].append(sample["nodes"].get(node, 0.0))
+
+    count = len(samples)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "provider": settings.LLM_PROVIDER,
+            "synthetic_latency_scale": settings.SYNTHETIC_LATENCY_SCALE,
+            "synthetic_seed": settings.SYNTHETIC_SEED,
+            "incremental_retry": settings.INCREMENTAL_RETRY,
+            "duplicate_reuse": settings.DUPLICATE_REUSE_ENABLED,
+            "concurrency": concurrency,
+            "tickets": count,
+        },
+        "throughput_tickets_per_s": round(count / wall, 3) if wall > 0 else 0.0,
+        "wall_time_s": round(wall, 3),
+        "latency_s": _percentiles([s["latency"] for s in samples]),
+        "llm_calls_per_ticket": {
+            "mean": round(sum(s["llm_calls"] for s in samples) / count, 3) if count else 0.0,
+            "distribution": {str(k): v for k, v in sorted(Counter(s["llm_calls"] for s in samples).items())},
+        },
+        "tokens_per_ticket": round(sum(s["tokens"] for s in samples) / count, 1) if count else 0.0,
+        "attempts": {str(k): v for k, v in sorted(Counter(s["attempt"] for s in samples).items())},
+        "escalation_rate": round(sum(s["escalated"] for s in samples) / count, 3) if count else 0.0,
+        "reuse_rate": round(sum(s["reused"] for s in samples) / count, 3) if count else 0.0,
+        "node_time_s": {
+            node: {**_percentiles(values), "total": round(sum(values), 4)}
+            for node, values in node_samples.items()
+        },
+        "llm_cache": llm_service.cache_stats(),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Iterator[tuple]:
+    """Yield (metric, baseline, current, percent change) for the headline numbers"""
+    metrics = [
+        ("latency_s.p50", lambda r: r["latency_s"]["p50"]),
+        ("latency_s.p95", lambda r: r["latency_s"]["p95"]),
+        ("latency_s.p99", lambda r: r["latency_s"]["p99"]),
+        ("llm_calls_per_ticket.mean", lambda r: r["llm_calls_per_ticket"]["mean"]),
+        ("throughput_tickets_per_s", lambda r: -r["throughput_tickets_per_s"]),  # higher is better
+    ]
+    for name, get in metrics:
+        before, after = get(baseline), get(current)
+        change = ((after - before) / abs(before) * 100) if before else 0.0
+        yield name, abs(before), abs(after), change
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ticket pipeline with a fake LLM")
+    parser.add_argument('--corpus', default=str(DEFAULT_CORPUS), help='JSONL ticket corpus')
+    parser.add_argument('--provider', default='synthetic', choices=['synthetic', 'replay'],
+                        help='Offline LLM provider to benchmark against')
+    parser.add_argument('--latency-scale', type=float, default=0.05,
+                        help='Multiplier on the synthetic latency distributions (0 = CPU only)')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic provider seed')
+    parser.add_argument('--concurrency', type=int, default=8, help='Tickets in flight')
+    parser.add_argument('--repeat', type=int, default=1, help='Passes over the corpus')
+    parser.add_argument('--out', default=str(ROOT / "benchmarks" / "results" / "latest.json"),
+                        help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Baseline results JSON to diff against')
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help='Exit non-zero if any compared metric regresses by more than this percent')
+    args = parser.parse_args(argv)
+
+    # Settings are read at import time, so configure the fake LLM before importing src.*
+    os.environ["LLM_PROVIDER"] = args.provider
+    os.environ["LLM_FALLBACK_PROVIDERS"] = ""
+    os.environ["SYNTHETIC_LATENCY_SCALE"] = str(args.latency_scale)
+    os.environ["SYNTHETIC_SEED"] = str(args.seed)
+    os.environ.setdefault("ESCALATION_LOG_PATH", str(Path(args.out).with_name("escalations.csv")))
+    sys.path.insert(0, str(ROOT))
+
+    results = run_benchmark(load_corpus(args.corpus), args.concurrency, args.repeat)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    latency = results["latency_s"]
+    print(f"tickets={results['meta']['tickets']} throughput={results['throughput_tickets_per_s']}/s "
+          f"p50={latency['p50']}s p95={latency['p95']}s p99={latency['p99']}s")
+    print(f"llm_calls/ticket={results['llm_calls_per_ticket']['mean']} attempts={results['attempts']} "
+          f"escalation_rate={results['escalation_rate']}")
+    for node, stats in results["node_time_s"].items():
+        print(f"  {node:<9} mean={stats['mean']}s p95={stats['p95']}s total={stats['total']}s")
+    print(f"Results written to {out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressed = False
+        for name, before, after, change in compare(results, baseline):
+            print(f"  {name:<28} {before:>10} -> {after:<10} ({change:+.1f}%)")
+            if args.max_regression is not None and change > args.max_regression:
+                regressed = True
+        if regressed:
+            print(f"Regression above {args.max_regression}% detected")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
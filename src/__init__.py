@@ -1,3 +1,7 @@
-from src.core import SupportAgent
+__all__ = ["SupportAgent"]
 
-__all__ = ["SupportAgent"]
\ No newline at end of file
+def __getattr__(name):
+    if name == "SupportAgent":
+        from src.core import SupportAgent
+        return SupportAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
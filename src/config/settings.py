@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import Literal
+from typing import Literal, Optional
 
 load_dotenv()
 
@@ -13,7 +13,16 @@ class Settings:
         "System failure"
         "Empty Input"
 ]
-    LLM_PROVIDER: Literal["groq", "openai"] = "groq"  # Updated to prioritize Groq
+    # Pattern-match certain policy violations locally before the LLM review
+    POLICY_PRECHECK_ENABLED: bool = True
+    # Review output (src/services/review_output.py): tool-calling structured output where the
+    # provider supports it, else tolerant JSON parsing plus one repair call on failure
+    REVIEW_STRUCTURED_OUTPUT: bool = os.getenv("REVIEW_STRUCTURED_OUTPUT", "true").lower() != "false"
+    REVIEW_OUTPUT_REPAIR: bool = True
+    REVIEW_REPAIR_MAX_CHARS: int = 2000  # of the broken output sent to the repair call
+    LLM_PROVIDER: Literal["groq", "openai", "replay", "synthetic"] = os.getenv("LLM_PROVIDER", "groq")  # Updated to prioritize Groq
+    # Providers tried in order after LLM_PROVIDER on 429/5xx; skipped when not configured
+    LLM_FALLBACK_PROVIDERS = [p.strip() for p in os.getenv("LLM_FALLBACK_PROVIDERS", "openai").split(",") if p.strip()]
     GROQ_MODEL: str = "llama3-8b-8192"  # Default Groq model
     OPENAI_MODEL: str = "gpt-4"  # Fallback option
     
@@ -22,15 +31,134 @@ class Settings:
     DRAFT_TEMPERATURE: float = 0.5
     REVIEW_TEMPERATURE: float = 0.2
     
+    # Local pre-classifier: the LLM is only consulted below this confidence
+    CLASSIFIER_CONFIDENCE_THRESHOLD: float = 0.75
+    CLASSIFIER_LLM_ACCURACY: float = 0.9  # assumed when combining an LLM label with the local scores
+    LOCAL_CLASSIFIER_MODEL_PATH: Optional[str] = os.getenv("LOCAL_CLASSIFIER_MODEL_PATH")
+    LOCAL_CLASSIFIER_LANGUAGES = ("en", "und")  # detected languages the local classifier may decide
+    # Micro-batch the LLM classifications of concurrent tickets (batch and server modes):
+    # up to N tickets or T ms per call, one label per ticket ID
+    CLASSIFICATION_BATCHING: bool = os.getenv("CLASSIFICATION_BATCHING", "false").lower() == "true"
+    CLASSIFICATION_BATCH_SIZE: int = 16
+    CLASSIFICATION_BATCH_WAIT_MS: float = float(os.getenv("CLASSIFICATION_BATCH_WAIT_MS", "20"))
+    CLASSIFICATION_BATCH_IN_FLIGHT: int = 4  # batched calls running at once
+    
+    # Provider routing: per-provider rate limits, retry rounds and pooled HTTP clients
+    PROVIDER_RATE_LIMITS = {
+        "groq": {"requests_per_minute": 30, "tokens_per_minute": 6000},
+        "openai": {"requests_per_minute": 500, "tokens_per_minute": 30000}
+    }
+    LLM_MAX_RETRIES: int = 2  # full rounds across all providers after the first
+    LLM_BACKOFF_BASE: float = 0.5
+    LLM_BACKOFF_MAX: float = 8.0
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE: int = 20
+    LLM_HTTP_TIMEOUT: float = 60.0
+    
+    # Offline providers (LLM_PROVIDER=replay|synthetic) for tests, load tests and benchmarks
+    LLM_REPLAY_FIXTURE_PATH: str = os.getenv("LLM_REPLAY_FIXTURE_PATH", "data/llm_fixtures.json")
+    LLM_REPLAY_RECORD_FROM: Optional[str] = os.getenv("LLM_REPLAY_RECORD_FROM")  # e.g. "groq" records misses
+    SYNTHETIC_SEED: int = int(os.getenv("SYNTHETIC_SEED", "0"))
+    SYNTHETIC_APPROVAL_RATE: float = float(os.getenv("SYNTHETIC_APPROVAL_RATE", "0.8"))
+    SYNTHETIC_LATENCY_MS = {
+        "classification": {"distribution": "lognormal", "mean_ms": 250, "spread": 0.4},
+        "draft": {"distribution": "lognormal", "mean_ms": 1200, "spread": 0.5},
+        "review": {"distribution": "lognormal", "mean_ms": 600, "spread": 0.4}
+    }
+    SYNTHETIC_LATENCY_SCALE: float = float(os.getenv("SYNTHETIC_LATENCY_SCALE", "1.0"))  # 0 disables sleeps
+    
+    # LLM Response Cache (drafting stays uncached so responses are not reused verbatim)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PURPOSES = ("classification", "review")
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_TTL_SECONDS: float = 3600
+    LLM_CACHE_SQLITE_PATH: Optional[str] = os.getenv("LLM_CACHE_SQLITE_PATH")
+    
     # RAG Configuration
     MAX_CONTEXT_LENGTH: int = 28000  # Increased for Groq's larger context
     CONTEXT_TOKENS_RESERVED: int = 1000
+    # Context packing (src/services/context_packer.py): tokens of retrieved context per
+    # prompt, further capped by what MAX_CONTEXT_LENGTH leaves after the rest of the prompt
+    CONTEXT_TOKEN_BUDGETS = {"draft": 1500, "revision": 1000}
+    CONTEXT_TOKENIZER: str = os.getenv("CONTEXT_TOKENIZER", "cl100k_base")  # tiktoken encoding, or "heuristic"
+    CONTEXT_CHUNK_TOKENS: int = 200
+    CONTEXT_MIN_CHUNK_TOKENS: int = 32  # smaller leftovers are not worth a truncated chunk
+    CONTEXT_DEDUP_THRESHOLD: float = 0.8  # share of a chunk's 3-word shingles already in context
+    RETRIEVAL_ENGINE: Literal["bm25", "vector"] = os.getenv("RETRIEVAL_ENGINE", "bm25")
+    RETRIEVAL_TOP_K: int = 3
+    RETRIEVAL_RETRY_TOP_K_STEP: int = 3  # extra documents per retry that re-retrieves
+    RETRIEVAL_INDEX_PATH: str = "data/kb_index"  # Built with `python -m src.services.retrieval_engine`
+    KNOWLEDGE_BASE_PATH: Optional[str] = os.getenv("KNOWLEDGE_BASE_PATH")  # JSONL articles for BM25
     
     # Agent Behavior
     MAX_RETRY_ATTEMPTS: int = 2
+    # Retries revise the rejected draft with reviewer feedback and reuse the retrieved
+    # context unless the feedback says it was lacking; set false for full re-runs
+    INCREMENTAL_RETRY: bool = os.getenv("INCREMENTAL_RETRY", "true").lower() != "false"
+    # Stream drafts and policy-check the partial text; a certain violation stops the
+    # generation and goes straight to retry/escalation without an LLM review
+    DRAFT_STREAMING: bool = os.getenv("DRAFT_STREAMING", "false").lower() == "true"
+    DRAFT_STREAM_CHECK_CHARS: int = 120  # re-check at sentence ends or after this many new characters
+    # Speculative drafting (src/services/speculative_drafting.py): K candidate drafts per
+    # attempt, drafted and reviewed concurrently; the first approved one wins
+    SPECULATIVE_DRAFTING: bool = os.getenv("SPECULATIVE_DRAFTING", "false").lower() == "true"
+    SPECULATIVE_CANDIDATES = {"Billing": 3, "Technical": 3, "Security": 2, "General": 2}
+    SPECULATIVE_TOKEN_BUDGETS = {"Billing": 6000, "Technical": 6000, "Security": 4000, "General": 4000}  # draft prompt tokens per attempt
+    SPECULATIVE_TEMPERATURES = (0.3, 0.8)  # for candidates after the first, in turn
+    # Near-duplicate reuse (src/core/duplicate_index.py): a ticket whose MinHash similarity
+    # to a recently approved one reaches the threshold gets that classification and draft.
+    # Opt-in: the reused draft was written for another customer's ticket and is sent verbatim
+    DUPLICATE_REUSE_ENABLED: bool = os.getenv("DUPLICATE_REUSE_ENABLED", "false").lower() == "true"
+    DUPLICATE_SIMILARITY_THRESHOLD: float = float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.9"))
+    DUPLICATE_INDEX_MAX_ENTRIES: int = 5000
+    DUPLICATE_INDEX_TTL_SECONDS: float = 86400
+    DUPLICATE_MINHASH_PERMUTATIONS: int = 64
+    DUPLICATE_LSH_BANDS: int = 16  # 16 bands x 4 rows
+
+    # Batch Processing
+    BATCH_CONCURRENCY: int = 8  # tickets in flight (per worker process in "processes" mode)
+    SHARD_SIZE: int = 16  # tickets handed to a worker process at a time
+    SHARD_START_METHOD: Literal["spawn", "fork", "forkserver"] = os.getenv("SHARD_START_METHOD", "spawn")
+    
+    # LangGraph checkpointing of AgentState after each node, keyed by ticket ID
+    CHECKPOINT_BACKEND: Literal["none", "memory", "sqlite"] = os.getenv("CHECKPOINT_BACKEND", "none")
+    CHECKPOINT_SQLITE_PATH: str = os.getenv("CHECKPOINT_SQLITE_PATH", "data/checkpoints.db")
+    CHECKPOINT_RESUME_RETRIES: int = 2  # in-call resumes from the last checkpoint on retryable errors
+
+    # Multi-turn conversation memory (src/core/memory.py); set the SQLite path to keep
+    # conversations across restarts and share them between processes
+    MEMORY_MAX_CONVERSATIONS: int = 1000  # in-process LRU cap
+    MEMORY_TTL_SECONDS: float = 86400  # since the last turn
+    MEMORY_SQLITE_PATH: Optional[str] = os.getenv("MEMORY_SQLITE_PATH")
+
+    # Durable job queue (python -m src.core.job_queue)
+    QUEUE_PATH: str = os.getenv("QUEUE_PATH", "data/queue.db")
+    QUEUE_LEASE_SECONDS: float = 120.0  # extended after every node; expired leases are re-delivered
+    QUEUE_MAX_ATTEMPTS: int = 3
+    # A failed job waits base * 2^(attempts - 1) seconds, up to the max, before it is leased again
+    QUEUE_RETRY_BACKOFF_BASE: float = 5.0
+    QUEUE_RETRY_BACKOFF_MAX: float = 300.0
+    QUEUE_POLL_INTERVAL: float = 0.5
+    
+    # HTTP service (python -m src.server)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8080"))
+    SERVER_CONCURRENCY: int = int(os.getenv("SERVER_CONCURRENCY", "8"))
+    SERVER_MAX_QUEUE: int = int(os.getenv("SERVER_MAX_QUEUE", "64"))  # beyond this, requests get 429
+    SERVER_MAX_BATCH: int = 100
+    SERVER_RETRY_AFTER_SECONDS: int = 1
     
     # Paths
-    ESCALATION_LOG_PATH: str = "data/escalations.csv"
+    ESCALATION_LOG_PATH: str = os.getenv("ESCALATION_LOG_PATH", "data/escalations.csv")
+    ESCALATION_SINK_BACKEND: Literal["csv", "jsonl", "sqlite"] = os.getenv("ESCALATION_SINK_BACKEND", "csv")
+    ESCALATION_BATCH_SIZE: int = 50
+    ESCALATION_FLUSH_INTERVAL: float = 1.0  # seconds between background flushes
+    
+    # Per-node tracing/metrics (see src/core/instrumentation.py); nodes run unwrapped when off
+    INSTRUMENTATION_ENABLED: bool = os.getenv("INSTRUMENTATION_ENABLED", "false").lower() == "true"
+    INSTRUMENTATION_EXPORTERS = [e.strip() for e in os.getenv("INSTRUMENTATION_EXPORTERS", "prometheus").split(",") if e.strip()]
+    PROMETHEUS_TEXTFILE_PATH: Optional[str] = os.getenv("PROMETHEUS_TEXTFILE_PATH")  # written at exit
+    TRACE_SPANS_PATH: str = os.getenv("TRACE_SPANS_PATH", "data/spans.jsonl")
     
     @property
     def groq_api_key(self) -> str:
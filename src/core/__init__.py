@@ -1,4 +1,3 @@
-from .agent import SupportAgent
 from .schemas import Ticket, Classification, Context, Draft, Review, AgentState
 
 __all__ = [
@@ -9,4 +8,12 @@ __all__ = [
     "Draft",
     "Review",
     "AgentState"
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    # The agent pulls in langgraph/langchain; load it on first use so that
+    # `import src.core` (and CLI --help) stays cheap
+    if name == "SupportAgent":
+        from .agent import SupportAgent
+        return SupportAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,88 +1,295 @@
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from src.core.schemas import AgentState
 from src.services import (
+    analyze_ticket,
     classify_ticket,
+    aclassify_ticket,
     retrieve_context,
     generate_draft,
-    review_draft
+    agenerate_draft,
+    stream_draft,
+    astream_draft,
+    speculative_draft,
+    aspeculative_draft,
+    review_draft,
+    areview_draft
 )
 from src.core.utils import prepare_retry_signal, log_escalation
-from typing import Optional
+from src.services.retrieval_engine import tokenize
+from src.services.ticket_analysis import extract_keywords
+from src.services.review import policy_engine
+from src.core.instrumentation import Instrumentation, get_instrumentation, record_error
+from src.core.checkpointing import claim_thread, get_checkpointer, release_thread, run_thread_id, ticket_thread_id
+from src.core.duplicate_index import DuplicateIndex, get_duplicate_index
+from src.core.llm_router import is_retryable
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Optional, Tuple
 import logging
+import re
 from src.config.settings import Settings
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Graph nodes in pipeline order; any of them can be the entry point of a resumed ticket
+NODES = ("classify", "retrieve", "draft", "review", "escalate")
+
+# Called with (node, state) after each node completes, e.g. to persist progress
+NodeCallback = Callable[[str, dict], None]
+
+# Called with (attempt, text) as streamed draft text passes the incremental policy check
+DraftTokenCallback = Callable[[int, str], None]
+
+# Reviewer feedback that means the retrieved documents lacked what the draft needed, so a
+# retry should re-retrieve. Requests for "more details" or better use of the context the
+# draft already had are redrafts on the same context.
+_MISSING_CONTEXT_RE = re.compile(
+    r"\b(missing|lacks?|lacking|insufficient|no|without)\s+(relevant\s+|supporting\s+)?"
+    r"(context|documentation|sources)\b"
+    r"|\bnot (grounded in|supported by) (the )?(context|documentation|sources)\b",
+    re.IGNORECASE
+)
+
 class SupportAgent:
-    def __init__(self):
+    def __init__(self, instrumentation: Optional[Instrumentation] = None, checkpointer: Any = None,
+                 stream_drafts: Optional[bool] = None, on_draft_token: Optional[DraftTokenCallback] = None,
+                 duplicate_index: Optional[DuplicateIndex] = None, speculative_drafts: Optional[bool] = None):
+        self.instrumentation = instrumentation or get_instrumentation()
+        # With a checkpointer, AgentState is saved after every node under the ticket's ID
+        self.checkpointer = checkpointer or get_checkpointer()
+        # Near-duplicates of recently approved tickets reuse that response instead of the graph
+        self.duplicate_index = duplicate_index or get_duplicate_index()
+        # Streamed drafts stop early on a certain policy violation; on_draft_token
+        # (e.g. the CLI's --stream) sees the text as it is generated
+        self.on_draft_token = on_draft_token
+        if stream_drafts is None:
+            stream_drafts = Settings.DRAFT_STREAMING or on_draft_token is not None
+        self.stream_drafts = stream_drafts
+        # Draft and review several candidates per attempt concurrently (see speculative_drafting)
+        self.speculative_drafts = Settings.SPECULATIVE_DRAFTING if speculative_drafts is None else speculative_drafts
         self.workflow = StateGraph(AgentState)
         self._build_workflow()
-        self.graph = self.workflow.compile()
+        self.graph = self.workflow.compile(checkpointer=self.checkpointer)
     
     def _build_workflow(self):
         """Construct the LangGraph workflow with all required nodes"""
-        # Add all nodes with their corresponding methods
-        self.workflow.add_node("classify", self._classify)
-        self.workflow.add_node("retrieve", self._retrieve)
-        self.workflow.add_node("draft", self._generate_draft)
-        self.workflow.add_node("review", self._review)
-        self.workflow.add_node("escalate", self._escalate)
+        # Add all nodes with their corresponding methods; LLM-bound nodes carry
+        # an async implementation that graph.ainvoke uses instead of a thread
+        self.workflow.add_node("classify", self._node("classify", self._classify, self._aclassify))
+        self.workflow.add_node("retrieve", self._node("retrieve", self._retrieve))
+        self.workflow.add_node("draft", self._node("draft", self._generate_draft, self._agenerate_draft))
+        self.workflow.add_node("review", self._node("review", self._review, self._areview))
+        self.workflow.add_node("escalate", self._node("escalate", self._escalate))
 
         # Set edges
-        self.workflow.set_entry_point("classify")
-        self.workflow.add_edge("classify", "retrieve")
+        self.workflow.set_conditional_entry_point(self._entry_point, {node: node for node in NODES})
+        self.workflow.add_conditional_edges(
+            "classify",
+            self._route_classified,
+            {"retrieve": "retrieve", "escalate": "escalate"}
+        )
         self.workflow.add_edge("retrieve", "draft")
         self.workflow.add_edge("draft", "review")
         
         # Conditional edges
         self.workflow.add_conditional_edges(
             "review",
-            self._should_retry,
+            self._route_review,
             {
                 "approve": END,
-                "retry": "retrieve",
+                "retrieve": "retrieve",
+                "redraft": "draft",
                 "escalate": "escalate"
             }
         )
         self.workflow.add_edge("escalate", END)
 
+    def _node(self, name: str, func, afunc=None):
+        """Wrap a node in a tracing span when instrumentation is enabled"""
+        if self.instrumentation is not None:
+            func = self.instrumentation.wrap(name, func)
+            afunc = self.instrumentation.awrap(name, afunc) if afunc else None
+        return RunnableLambda(func, afunc=afunc) if afunc else func
+
+    @staticmethod
+    def _entry_point(state: AgentState) -> str:
+        return state.get("resume_at") or "classify"
+
+    @staticmethod
+    def _analysis(state: AgentState) -> dict:
+        """The ticket's analysis, computed on first use and kept in the state for retries"""
+        if not state.get("analysis"):
+            state["analysis"] = analyze_ticket(state["ticket"])
+        return state["analysis"]
+
     def _classify(self, state: AgentState) -> AgentState:
         try:
-            state["classification"] = classify_ticket(state["ticket"])
+            state["classification"] = classify_ticket(state["ticket"], self._analysis(state))
         except Exception as e:
             logger.error(f"Classification failed: {str(e)}")
+            record_error(e)
             state["classification"] = {"category": "General", "confidence": 0.0}
+        return self._check_ticket(state)
+
+    async def _aclassify(self, state: AgentState) -> AgentState:
+        try:
+            state["classification"] = await aclassify_ticket(state["ticket"], self._analysis(state))
+        except Exception as e:
+            logger.error(f"Classification failed: {str(e)}")
+            record_error(e)
+            state["classification"] = {"category": "General", "confidence": 0.0}
+        return self._check_ticket(state)
+
+    def _check_ticket(self, state: AgentState) -> AgentState:
+        """Escalate before any draft is paid for when the ticket itself matches an escalation rule"""
+        if not Settings.POLICY_PRECHECK_ENABLED:
+            return state
+        violations = [v for v in policy_engine.check_ticket(self._category(state), state["ticket"])
+                      if v in Settings.POLICY_ESCALATION_TRIGGERS]
+        if violations:
+            state["review"] = {
+                "approved": False,
+                "feedback": f"Ticket requires escalation: {'; '.join(violations)}",
+                "violations": violations
+            }
+            state["escalated"] = True
         return state
 
+    @staticmethod
+    def _route_classified(state: AgentState) -> str:
+        return "escalate" if state.get("escalated") else "retrieve"
+
+    @staticmethod
+    def _review_text(state: AgentState) -> str:
+        review = state.get("review") or {}
+        return " ".join([review.get("feedback") or ""] + list(review.get("violations") or []))
+
+    def _retrieval_query(self, state: AgentState, analysis: dict) -> Tuple[str, int]:
+        """The query and top_k; a re-retrieval after a rejection widens both.
+
+        Each retry adds RETRIEVAL_RETRY_TOP_K_STEP documents. The query becomes the
+        ticket's keywords plus the terms of the reviewer's feedback, so what the
+        reviewer found missing is not drowned out by the full ticket text.
+        """
+        attempt = state.get("attempt", 0)
+        if not attempt or (state.get("review") or {}).get("approved", True):
+            return analysis["text"], Settings.RETRIEVAL_TOP_K
+        feedback = _MISSING_CONTEXT_RE.sub(" ", self._review_text(state))
+        keywords = analysis["keywords"]
+        terms = [t for t in extract_keywords(tokenize(feedback)) if t not in keywords]
+        query = " ".join(keywords + terms) or analysis["text"]
+        return query, Settings.RETRIEVAL_TOP_K + Settings.RETRIEVAL_RETRY_TOP_K_STEP * attempt
+
     def _retrieve(self, state: AgentState) -> AgentState:
         try:
-            query = f"{state['ticket']['subject']}\n{state['ticket']['description']}"
+            analysis = self._analysis(state)
+            query, top_k = self._retrieval_query(state, analysis)
             state["context"] = retrieve_context(
                 state["classification"]["category"],
-                query
+                query,
+                analysis,
+                top_k=top_k
             )
         except Exception as e:
             logger.error(f"Context retrieval failed: {str(e)}")
+            record_error(e)
             state["context"] = {"category": state["classification"]["category"], "documents": []}
         return state
 
+    def _revision_inputs(self, state: AgentState) -> dict:
+        """On a retry, hand the rejected draft and its review to the drafting prompt"""
+        if not Settings.INCREMENTAL_RETRY or not state.get("review") or not state.get("draft"):
+            return {}
+        return {"previous_draft": state["draft"], "review": state["review"]}
+
+    def _stream_inputs(self, state: AgentState) -> dict:
+        on_token = partial(self.on_draft_token, state.get("attempt", 0)) if self.on_draft_token else None
+        return {"category": self._category(state), "on_token": on_token}
+
+    def _apply_speculation(self, state: AgentState, outcome: dict) -> AgentState:
+        # The winning candidate's review is applied by the review node for this attempt
+        state["draft"] = outcome["draft"]
+        state["speculation"] = {**outcome["stats"], "attempt": state.get("attempt", 0), "review": outcome["review"]}
+        return state
+
+    @staticmethod
+    def _speculative_review(state: AgentState) -> Optional[dict]:
+        speculation = state.get("speculation") or {}
+        if speculation.get("attempt") == state.get("attempt", 0):
+            return speculation.get("review")
+        return None
+
     def _generate_draft(self, state: AgentState) -> AgentState:
         try:
-            state["draft"] = generate_draft(state["ticket"], state["context"])
+            if self.speculative_drafts:
+                return self._apply_speculation(state, speculative_draft(
+                    state["ticket"], state["context"], self._category(state), **self._revision_inputs(state)
+                ))
+            if self.stream_drafts:
+                state["draft"] = stream_draft(state["ticket"], state["context"],
+                                              **self._revision_inputs(state), **self._stream_inputs(state))
+            else:
+                state["draft"] = generate_draft(state["ticket"], state["context"], **self._revision_inputs(state))
         except Exception as e:
+            if is_retryable(e):
+                # Provider outage: left to the checkpoint resume and the caller's retry,
+                # not answered with the fallback draft
+                raise
             logger.error(f"Draft generation failed: {str(e)}")
-            state["draft"] = {
-                "content": "We're experiencing technical difficulties. Please contact support directly.",
-                "context_used": []
-            }
+            record_error(e)
+            state["draft"] = self._fallback_draft()
+        return state
+
+    async def _agenerate_draft(self, state: AgentState) -> AgentState:
+        try:
+            if self.speculative_drafts:
+                return self._apply_speculation(state, await aspeculative_draft(
+                    state["ticket"], state["context"], self._category(state), **self._revision_inputs(state)
+                ))
+            if self.stream_drafts:
+                state["draft"] = await astream_draft(
+                    state["ticket"], state["context"], **self._revision_inputs(state), **self._stream_inputs(state)
+                )
+            else:
+                state["draft"] = await agenerate_draft(
+                    state["ticket"], state["context"], **self._revision_inputs(state)
+                )
+        except Exception as e:
+            if is_retryable(e):
+                # Provider outage: left to the checkpoint resume and the caller's retry,
+                # not answered with the fallback draft
+                raise
+            logger.error(f"Draft generation failed: {str(e)}")
+            record_error(e)
+            state["draft"] = self._fallback_draft()
         return state
 
+    @staticmethod
+    def _fallback_draft() -> dict:
+        return {
+            "content": "We're experiencing technical difficulties. Please contact support directly.",
+            "context_used": []
+        }
+
     def _review(self, state: AgentState) -> AgentState:
         """Enhanced review with policy enforcement"""
-        review_result = review_draft(state["ticket"], state["draft"])
-        
+        review_result = self._speculative_review(state)
+        if review_result is None:
+            review_result = review_draft(state["ticket"], state["draft"], self._category(state))
+        return self._apply_review(state, review_result)
+
+    async def _areview(self, state: AgentState) -> AgentState:
+        review_result = self._speculative_review(state)
+        if review_result is None:
+            review_result = await areview_draft(state["ticket"], state["draft"], self._category(state))
+        return self._apply_review(state, review_result)
+
+    @staticmethod
+    def _category(state: AgentState) -> str:
+        return (state.get("classification") or {}).get("category", "General")
+
+    def _apply_review(self, state: AgentState, review_result: dict) -> AgentState:
         state["review"] = {
             "approved": review_result["approved"],
             "feedback": review_result["feedback"],
@@ -103,11 +310,12 @@ class SupportAgent:
                 "description": state["ticket"]["description"],
                 "category": state["classification"].get("category", "Unknown"),
                 "attempts": state.get("attempt", 0),
-                "draft": state.get("draft", {}).get("content", "No draft generated"),
-                "feedback": state.get("review", {}).get("feedback", "No feedback available")
+                "draft": (state.get("draft") or {}).get("content", "No draft generated"),
+                "feedback": (state.get("review") or {}).get("feedback", "No feedback available")
             })
         except Exception as e:
             logger.error(f"Escalation logging failed: {str(e)}")
+            record_error(e)
         state["escalated"] = True
         return state
 
@@ -125,8 +333,224 @@ class SupportAgent:
         return "retry" if state.get("attempt", 0) < 2 else "escalate"
             
         return "retry" if state.get("attempt", 0) < 1 else "escalate"  # Only 1 retry
-    def process_ticket(self, ticket: dict) -> dict:
+
+    def _route_review(self, state: AgentState) -> str:
+        """Resolve a retry into either a redraft on the same context or a fresh retrieval"""
+        decision = self._should_retry(state)
+        if decision != "retry":
+            return decision
+        return "retrieve" if self._needs_more_context(state) else "redraft"
+
+    def _needs_more_context(self, state: AgentState) -> bool:
+        if not Settings.INCREMENTAL_RETRY:
+            return True
+        context = state.get("context") or {}
+        if not context.get("documents"):
+            return True
+        return bool(_MISSING_CONTEXT_RE.search(self._review_text(state)))
+
+    def process_ticket(self, ticket: dict, config: Optional[RunnableConfig] = None,
+                       on_node: Optional[NodeCallback] = None) -> dict:
         """Process tickets with empty input handling"""
+        initial_state = self._initial_state(ticket)
+        if initial_state["escalated"]:
+            self._escalate(initial_state)
+            return initial_state
+        reused = self._reuse_duplicate(initial_state)
+        if reused is not None:
+            return reused
+        
+        with self._claimed_thread(initial_state, config) as config:
+            if self._has_pending_checkpoint(config):
+                logger.info(f"Resuming ticket {config['configurable']['thread_id']} from its last checkpoint")
+                result = self._run_graph(None, config, on_node)
+            else:
+                self._start_trace(initial_state)
+                result = self._run_graph({**initial_state, "resume_at": None}, config, on_node)
+        return self._finish(result)
+
+    def resume_ticket(self, state: dict, last_node: str, config: Optional[RunnableConfig] = None,
+                      on_node: Optional[NodeCallback] = None) -> dict:
+        """Continue a ticket from the state saved after ``last_node`` completed"""
+        next_node = self.next_node(last_node, state)
+        if next_node is None:
+            return state
+        state = {**state, "resume_at": next_node}
+        if self.instrumentation is not None:
+            self.instrumentation.resume_trace(state)
+        with self._claimed_thread(state, config) as config:
+            result = self._run_graph(state, config, on_node)
+        return self._finish(result)
+
+    def next_node(self, last_node: str, state: dict) -> Optional[str]:
+        """The node that runs after ``last_node`` given ``state``, or None when the ticket is finished"""
+        if last_node == "review":
+            decision = self._route_review(state)
+            return {"approve": None, "redraft": "draft"}.get(decision, decision)
+        if last_node == "escalate":
+            return None
+        return NODES[NODES.index(last_node) + 1]
+
+    @contextmanager
+    def _claimed_thread(self, state: dict, config: Optional[RunnableConfig]):
+        """Claim the ticket's checkpoint thread for one run and yield the run's config.
+
+        Checkpoints are keyed by ticket ID unless the caller already chose a thread. A
+        thread held by a run still in progress is left to it and this run gets its own.
+        The thread's checkpoints are deleted once the graph has finished, or at the end
+        of a run on a thread nothing can resume.
+        """
+        if self.checkpointer is None:
+            yield config
+            return
+        config = dict(config or {})
+        configurable = dict(config.get("configurable") or {})
+        thread_id = configurable.get("thread_id") or ticket_thread_id(state["ticket"])
+        resumable = thread_id is not None and claim_thread(thread_id)
+        if not resumable:
+            if thread_id is not None:
+                logger.warning(f"Ticket {thread_id} is already being processed; running it on a separate thread")
+            thread_id = run_thread_id(thread_id)
+            claim_thread(thread_id)
+        configurable["thread_id"] = thread_id
+        config["configurable"] = configurable
+        try:
+            yield config
+        finally:
+            try:
+                if not resumable or not self._has_pending_checkpoint(config):
+                    self.checkpointer.delete_thread(thread_id)
+            finally:
+                release_thread(thread_id)
+
+    def _has_pending_checkpoint(self, config: Optional[RunnableConfig]) -> bool:
+        return self.checkpointer is not None and bool(self.graph.get_state(config).next)
+
+    async def _ahas_pending_checkpoint(self, config: Optional[RunnableConfig]) -> bool:
+        return self.checkpointer is not None and bool((await self.graph.aget_state(config)).next)
+
+    def _can_resume(self, error: Exception, attempt: int) -> bool:
+        return (self.checkpointer is not None and attempt < Settings.CHECKPOINT_RESUME_RETRIES
+                and is_retryable(error))
+
+    def _last_state(self, state: Optional[dict], config: Optional[RunnableConfig]) -> dict:
+        """Most recent state for error handling: the last checkpoint when there is one"""
+        if self.checkpointer is not None:
+            saved = self.graph.get_state(config).values
+            if saved:
+                return dict(saved)
+        return state
+
+    def _run_graph(self, state: Optional[dict], config: Optional[RunnableConfig],
+                   on_node: Optional[NodeCallback]) -> dict:
+        """Run the graph from ``state`` (or from the last checkpoint when None)"""
+        graph_input = state
+        attempt = 0
+        while True:
+            try:
+                result = self._invoke(graph_input, config, on_node)
+                result.pop("resume_at", None)
+                return result
+            except Exception as e:
+                if not self._can_resume(e, attempt):
+                    return self._handle_graph_error(self._last_state(state, config), e)
+                # Completed nodes are not re-run: the graph continues from its last checkpoint
+                logger.warning(f"Graph failed ({type(e).__name__}); resuming from last checkpoint")
+                graph_input = None
+                attempt += 1
+
+    def _invoke(self, graph_input: Optional[dict], config: Optional[RunnableConfig],
+                on_node: Optional[NodeCallback]) -> dict:
+        if on_node is None:
+            return self.graph.invoke(graph_input, config)
+        # Nodes return the full state, so each update is the state after that node
+        result = graph_input
+        for update in self.graph.stream(graph_input, config, stream_mode="updates"):
+            for node, result in update.items():
+                on_node(node, result)
+        return result
+
+    async def aprocess_ticket(self, ticket: dict, config: Optional[RunnableConfig] = None) -> dict:
+        """Async variant of process_ticket built on graph.ainvoke"""
+        initial_state = self._initial_state(ticket)
+        if initial_state["escalated"]:
+            self._escalate(initial_state)
+            return initial_state
+        reused = self._reuse_duplicate(initial_state)
+        if reused is not None:
+            return reused
+        
+        with self._claimed_thread(initial_state, config) as config:
+            graph_input = None
+            if not await self._ahas_pending_checkpoint(config):
+                self._start_trace(initial_state)
+                graph_input = {**initial_state, "resume_at": None}
+            attempt = 0
+            while True:
+                try:
+                    result = await self.graph.ainvoke(graph_input, config)
+                    result.pop("resume_at", None)
+                    break
+                except Exception as e:
+                    if not self._can_resume(e, attempt):
+                        result = self._handle_graph_error(self._last_state(initial_state, config), e)
+                        break
+                    logger.warning(f"Graph failed ({type(e).__name__}); resuming from last checkpoint")
+                    graph_input = None
+                    attempt += 1
+        return self._finish(result)
+
+    def _start_trace(self, state: dict) -> None:
+        if self.instrumentation is not None:
+            state["trace"] = self.instrumentation.start_trace()
+
+    def _reuse_duplicate(self, state: dict) -> Optional[dict]:
+        """Final state built from a recently approved near-duplicate, or None to run the graph"""
+        if self.duplicate_index is None:
+            return None
+        try:
+            match = self.duplicate_index.find(self._analysis(state))
+        except Exception as e:
+            logger.error(f"Duplicate lookup failed: {str(e)}")
+            return None
+        if match is None:
+            return None
+        category = match["classification"].get("category")
+        # A ticket that itself needs escalation (breach, legal threat) is never answered from another
+        if policy_engine.check_ticket(category, state["ticket"]):
+            return None
+        logger.info(f"Reusing approved response (similarity {match['similarity']}) for near-duplicate ticket")
+        return {
+            **state,
+            "classification": match["classification"],
+            "context": {"category": category, "documents": match["draft"].get("context_used", [])},
+            "draft": match["draft"],
+            "review": {
+                "approved": True,
+                "feedback": "Reused the approved response to a near-duplicate ticket",
+                "violations": []
+            },
+            "reused": {"fingerprint": match["fingerprint"], "similarity": match["similarity"]}
+        }
+
+    def _remember(self, state: dict) -> dict:
+        """Index an approved, fully processed ticket for reuse by its near-duplicates"""
+        if (self.duplicate_index is not None and state.get("analysis") and state.get("classification")
+                and (state.get("review") or {}).get("approved") and not state.get("escalated")
+                and state.get("draft") and not state["draft"].get("aborted")):
+            self.duplicate_index.add(state["analysis"], state["classification"], state["draft"])
+        return state
+
+    def _finish(self, state: dict) -> dict:
+        return self._remember(self._finish_trace(state))
+
+    def _finish_trace(self, state: dict) -> dict:
+        if self.instrumentation is not None:
+            return self.instrumentation.finish_trace(state)
+        return state
+
+    def _initial_state(self, ticket: dict) -> dict:
+        """Validate the raw ticket and build the graph's starting state"""
         # Validate input
         if not isinstance(ticket, dict):
             ticket = {"subject": "INVALID", "description": str(ticket)}
@@ -136,7 +560,7 @@ class SupportAgent:
         
         # Immediate escalation for empty tickets
         if not subject and not description:
-            error_state = {
+            return {
                 "ticket": {"subject": "(empty)", "description": "(empty)"},
                 "classification": {"category": "General", "confidence": 0.0},
                 "context": None,
@@ -146,12 +570,12 @@ class SupportAgent:
                 "escalated": True,
                 "error": "Empty ticket content"
             }
-            self._escalate(error_state)
-            return error_state
         
-        # Normal processing
-        initial_state = {
-            "ticket": {"subject": subject, "description": description},
+        # Normal processing; the ticket's ID is kept to key its checkpoints on resume
+        ids = {key: ticket[key] for key in ("ticket_id", "id") if ticket.get(key) not in (None, "")}
+        return {
+            "ticket": {**ids, "subject": subject, "description": description},
+            "analysis": None,
             "classification": None,
             "context": None,
             "draft": None,
@@ -159,18 +583,18 @@ class SupportAgent:
             "attempt": 0,
             "escalated": False
         }
-        
-        try:
-            result = self.graph.invoke(initial_state)
-            return result
-        except Exception as e:
-            error_state = {
-                **initial_state,
-                "error": str(e),
-                "escalated": True
-            }
-            self._escalate(error_state)
-            return error_state
+
+    def _handle_graph_error(self, initial_state: dict, error: Exception) -> dict:
+        error_state = {
+            **initial_state,
+            "error": str(error),
+            # A transient provider failure: callers with a retry of their own (the job
+            # queue) run the ticket again instead of keeping the escalation
+            "retryable": is_retryable(error),
+            "escalated": True
+        }
+        self._escalate(error_state)
+        return error_state
 
     def _handle_invalid_ticket(self, ticket: dict) -> dict:
         """Handle completely invalid ticket structure"""
@@ -0,0 +1,338 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+ExecutionMode = Literal["threads", "processes", "asyncio"]
+EXECUTION_MODES = ("threads", "processes", "asyncio")
+
+
+def iter_tickets(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Lazily yield (line_number, ticket) pairs from a JSONL file"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, {"subject": "", "description": "", "error": f"Invalid JSON: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield line_no, {"subject": "", "description": str(record)}
+                continue
+            yield line_no, record
+
+
+class LatencyRecorder:
+    """Fixed-size latency summary: exact count/sum/min/max plus a reservoir sample for percentiles"""
+
+    def __init__(self, capacity: int = 10000, seed: int = 0):
+        self.capacity = capacity
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self._sample: List[float] = []
+        self._rng = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._sample) < self.capacity:
+            self._sample.append(value)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < self.capacity:
+                self._sample[slot] = value
+
+    def percentile(self, pct: float) -> float:
+        if not self._sample:
+            return 0.0
+        ordered = sorted(self._sample)
+        idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+        return ordered[idx]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class BatchStats:
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+    processed: int = 0
+    escalated: int = 0
+    approved: int = 0
+    reused: int = 0  # answered from a near-duplicate without running the graph
+    latency: LatencyRecorder = field(default_factory=LatencyRecorder)
+    attempts: Counter = field(default_factory=Counter)
+
+    def record(self, result: Dict[str, Any], elapsed: float) -> None:
+        self.processed += 1
+        self.latency.add(elapsed)
+        self.attempts[result.get("attempt", 0)] += 1
+        if result.get("escalated"):
+            self.escalated += 1
+        elif (result.get("review") or {}).get("approved"):
+            self.approved += 1
+        if result.get("reused"):
+            self.reused += 1
+
+    @property
+    def wall_time(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.processed / self.wall_time if self.wall_time > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "approved": self.approved,
+            "escalated": self.escalated,
+            "reused": self.reused,
+            "wall_time_s": round(self.wall_time, 3),
+            "tickets_per_s": round(self.throughput, 3),
+            "attempts": {
+                "mean": round(sum(k * v for k, v in self.attempts.items()) / self.processed, 3)
+                if self.processed else 0.0,
+                "distribution": {str(k): v for k, v in sorted(self.attempts.items())},
+            },
+            "latency_s": {
+                "mean": round(self.latency.mean, 3),
+                "min": round(self.latency.min if self.latency.count else 0.0, 3),
+                "p50": round(self.latency.percentile(50), 3),
+                "p95": round(self.latency.percentile(95), 3),
+                "p99": round(self.latency.percentile(99), 3),
+                "max": round(self.latency.max, 3),
+            },
+        }
+
+
+def _timed_process(agent, ticket: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    result = agent.process_ticket(ticket)
+    return result, time.perf_counter() - start
+
+
+def run_batch(
+    agent,
+    tickets: Iterable[Tuple[int, Dict[str, Any]]],
+    concurrency: Optional[int] = None,
+    stats: Optional[BatchStats] = None,
+) -> Iterator[Tuple[int, Dict[str, Any], float]]:
+    """Run tickets through one shared agent, yielding (index, result, latency) as they complete.
+
+    At most ``concurrency`` tickets are in flight at once and the input iterable is
+    consumed lazily, so memory stays flat regardless of the size of the input.
+    """
+    concurrency = max(1, concurrency or settings.BATCH_CONCURRENCY)
+    ticket_iter = iter(tickets)
+    pending = {}
+
+    def submit_next(executor) -> bool:
+        try:
+            index, ticket = next(ticket_iter)
+        except StopIteration:
+            return False
+        pending[executor.submit(_timed_process, agent, ticket)] = index
+        return True
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while len(pending) < concurrency and submit_next(executor):
+            pass
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                result, elapsed = future.result()
+                if stats is not None:
+                    stats.record(result, elapsed)
+                yield index, result, elapsed
+                submit_next(executor)
+
+    if stats is not None:
+        stats.finished = time.perf_counter()
+
+
+def run_batch_async(
+    agent,
+    tickets: Iterable[Tuple[Any, Dict[str, Any]]],
+    concurrency: Optional[int] = None,
+) -> Iterator[Tuple[Any, Dict[str, Any], float]]:
+    """Like run_batch, but tickets run as asyncio tasks on ``aprocess_ticket`` in one thread"""
+    concurrency = max(1, concurrency or settings.BATCH_CONCURRENCY)
+    ticket_iter = iter(tickets)
+    pending = {}
+    loop = asyncio.new_event_loop()
+
+    async def timed(ticket: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        start = time.perf_counter()
+        result = await agent.aprocess_ticket(ticket)
+        return result, time.perf_counter() - start
+
+    def submit_next() -> bool:
+        try:
+            index, ticket = next(ticket_iter)
+        except StopIteration:
+            return False
+        pending[loop.create_task(timed(ticket))] = index
+        return True
+
+    try:
+        while len(pending) < concurrency and submit_next():
+            pass
+        while pending:
+            done, _ = loop.run_until_complete(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+            for task in done:
+                index = pending.pop(task)
+                result, elapsed = task.result()
+                yield index, result, elapsed
+                submit_next()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
+
+
+# One agent per worker process, built by the pool initializer and reused for every shard
+_worker_agent = None
+
+def _init_shard_worker() -> None:
+    global _worker_agent
+    from src.core import SupportAgent
+    from src.core.llm_service import llm_service
+
+    _worker_agent = SupportAgent()
+    try:
+        for purpose in ("classification", "draft", "review"):
+            llm_service.get_llm(purpose)
+    except Exception as e:
+        # Tickets will surface the same error; don't break the pool over it
+        logger.warning(f"Worker {os.getpid()} could not build LLM clients: {str(e)}")
+
+def _process_shard(shard: List[Tuple[Any, Dict[str, Any]]], concurrency: int) -> List[Tuple[Any, Dict[str, Any], float]]:
+    from src.core.escalation import get_escalation_sink
+
+    results = list(run_batch(_worker_agent, shard, concurrency))
+    # Pool workers exit without running atexit hooks, so push buffered escalations to the
+    # shared (lock-protected) log before handing the shard back
+    get_escalation_sink().flush()
+    return results
+
+def _shards(tickets: Iterable[Tuple[Any, Dict[str, Any]]], size: int) -> Iterator[List[Tuple[Any, Dict[str, Any]]]]:
+    ticket_iter = iter(tickets)
+    while True:
+        shard = list(islice(ticket_iter, size))
+        if not shard:
+            return
+        yield shard
+
+
+def run_batch_processes(
+    tickets: Iterable[Tuple[Any, Dict[str, Any]]],
+    workers: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    shard_size: Optional[int] = None,
+) -> Iterator[Tuple[Any, Dict[str, Any], float]]:
+    """Shard tickets across worker processes, each running ``concurrency`` tickets at a time.
+
+    Each worker builds its own SupportAgent and LLM clients once. At most two shards per
+    worker are outstanding, so the input is still consumed lazily.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    concurrency = max(1, concurrency or settings.BATCH_CONCURRENCY)
+    shards = _shards(tickets, shard_size or settings.SHARD_SIZE)
+    context = multiprocessing.get_context(settings.SHARD_START_METHOD)
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_shard_worker) as executor:
+        def submit_next() -> bool:
+            shard = next(shards, None)
+            if shard is None:
+                return False
+            pending.add(executor.submit(_process_shard, shard, concurrency))
+            return True
+
+        while len(pending) < workers * 2 and submit_next():
+            pass
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                yield from future.result()
+                submit_next()
+
+
+def reorder(items: Iterable[Tuple[int, Any]]) -> Iterator[Any]:
+    """Yield items tagged with 0-based sequence numbers in sequence order, buffering early arrivals"""
+    buffered: Dict[int, Any] = {}
+    next_seq = 0
+    for seq, item in items:
+        buffered[seq] = item
+        while next_seq in buffered:
+            yield buffered.pop(next_seq)
+            next_seq += 1
+
+
+def run_sharded(
+    tickets: Iterable[Tuple[int, Dict[str, Any]]],
+    mode: ExecutionMode = "threads",
+    concurrency: Optional[int] = None,
+    workers: Optional[int] = None,
+    ordered: bool = False,
+    stats: Optional[BatchStats] = None,
+    agent=None,
+) -> Iterator[Tuple[int, Dict[str, Any], float]]:
+    """Run tickets with the chosen execution model, yielding (index, result, latency).
+
+    - ``threads``: one shared agent, ``concurrency`` tickets in flight (I/O-bound default)
+    - ``asyncio``: one shared agent on an event loop, ``concurrency`` tasks in flight
+    - ``processes``: ``workers`` processes, each with its own agent and ``concurrency`` threads,
+      for when prompt rendering, parsing and retrieval saturate one core
+
+    Results stream as they complete, or in input order when ``ordered`` is set.
+    """
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode '{mode}', expected one of {list(EXECUTION_MODES)}")
+    # Tag each ticket with its input position so results can be put back in order
+    sequenced = (((seq, index), ticket) for seq, (index, ticket) in enumerate(tickets))
+    if mode == "processes":
+        results = run_batch_processes(sequenced, workers, concurrency)
+    else:
+        if agent is None:
+            from src.core import SupportAgent
+            agent = SupportAgent()
+        runner = run_batch_async if mode == "asyncio" else run_batch
+        results = runner(agent, sequenced, concurrency)
+
+    tagged = ((seq, (index, result, elapsed)) for (seq, index), result, elapsed in results)
+    stream = reorder(tagged) if ordered else (item for _, item in tagged)
+    for index, result, elapsed in stream:
+        if stats is not None:
+            stats.record(result, elapsed)
+        yield index, result, elapsed
+
+    if stats is not None:
+        stats.finished = time.perf_counter()
@@ -0,0 +1,127 @@
+"""LangGraph checkpointers for resuming tickets after transient failures.
+
+With a checkpointer the compiled graph saves ``AgentState`` after every node under a
+thread keyed by the ticket ID. A ticket whose run failed part-way (e.g. the review call
+timed out on attempt 2) resumes from its last checkpoint instead of re-running
+classification and drafting. A run that completes deletes its thread.
+
+A pending checkpoint looks the same whether its run failed or is still going, so a run
+claims its thread first (``claim_thread``). A second submission of a ticket whose run is
+in progress in this process gets a thread of its own instead of taking the first one
+over. Across processes, the job queue's leases keep two workers off the same ticket.
+Tickets without an ID get a fresh thread per run: they resume within the run, but a
+resubmission starts over.
+
+- ``memory``: ``InMemorySaver``, for a single long-running process (e.g. ``src.server``)
+- ``sqlite``: ``SqliteSaver`` (``pip install langgraph-checkpoint-sqlite``), survives restarts
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from src.config import settings
+
+
+def ticket_thread_id(ticket: Dict[str, Any]) -> Optional[str]:
+    """Checkpoint thread for a ticket: its own ID, or None when it has none"""
+    for key in ("ticket_id", "id"):
+        if ticket.get(key) not in (None, ""):
+            return str(ticket[key])
+    return None
+
+
+def run_thread_id(thread_id: Optional[str] = None) -> str:
+    """A thread no other run uses, derived from ``thread_id`` when given"""
+    return f"{thread_id or 'run'}:{uuid.uuid4().hex}"
+
+
+_claimed: Set[str] = set()
+_claimed_lock = threading.Lock()
+
+def claim_thread(thread_id: str) -> bool:
+    """Mark the thread as having a run in progress; False if another run holds it"""
+    with _claimed_lock:
+        if thread_id in _claimed:
+            return False
+        _claimed.add(thread_id)
+        return True
+
+def release_thread(thread_id: str) -> None:
+    with _claimed_lock:
+        _claimed.discard(thread_id)
+
+
+def _require_sqlite_saver():
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError(
+            "The sqlite checkpointer requires langgraph-checkpoint-sqlite: "
+            "pip install langgraph-checkpoint-sqlite"
+        ) from e
+    return SqliteSaver
+
+
+def _threaded_sqlite_saver(conn: sqlite3.Connection):
+    SqliteSaver = _require_sqlite_saver()
+
+    class ThreadedSqliteSaver(SqliteSaver):
+        """SqliteSaver whose async methods run the sync ones in a worker thread,
+        so the same checkpointer serves both process_ticket and aprocess_ticket"""
+
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[Any]:
+            items = await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+            )
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id):
+            await asyncio.to_thread(self.delete_thread, thread_id)
+
+    return ThreadedSqliteSaver(conn)
+
+
+def create_checkpointer(kind: str, path: Optional[str] = None):
+    """Build a checkpointer for ``kind`` ('none', 'memory' or 'sqlite')"""
+    if kind in (None, "", "none"):
+        return None
+    if kind == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+        return InMemorySaver()
+    if kind == "sqlite":
+        path = path or settings.CHECKPOINT_SQLITE_PATH
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return _threaded_sqlite_saver(conn)
+    raise ValueError(f"Unknown checkpoint backend '{kind}', expected one of ['memory', 'none', 'sqlite']")
+
+
+_checkpointer: Any = None
+_checkpointer_lock = threading.Lock()
+
+def get_checkpointer():
+    """Process-wide checkpointer from settings, or None when checkpointing is off"""
+    global _checkpointer
+    if settings.CHECKPOINT_BACKEND in (None, "", "none"):
+        return None
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                _checkpointer = create_checkpointer(settings.CHECKPOINT_BACKEND, settings.CHECKPOINT_SQLITE_PATH)
+    return _checkpointer
@@ -0,0 +1,186 @@
+"""Near-duplicate ticket detection for reusing recently approved responses.
+
+Each approved ticket's normalized text (see ``src.services.ticket_analysis``) is reduced
+to a MinHash signature over word 3-gram shingles and filed in an LSH index of
+``bands`` x ``rows`` buckets. A new ticket is only compared with the entries it shares a
+bucket with; when the estimated Jaccard similarity of the best candidate reaches the
+threshold, its classification and approved draft are reused and the classify, retrieve,
+draft and review steps are skipped.
+
+Memory is bounded: entries expire after ``ttl_seconds`` and the least recently used are
+evicted beyond ``max_entries``.
+"""
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.config import settings
+from src.services.retrieval_engine import tokenize
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """MinHash signatures of word-shingle sets using universal hashing"""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                        for _ in range(num_perm)]
+
+    def shingles(self, text: str) -> Set[int]:
+        terms = tokenize(text)
+        size = min(self.shingle_size, len(terms)) or 1
+        grams = (" ".join(terms[i:i + size]) for i in range(max(1, len(terms) - size + 1)))
+        return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "big") for g in grams}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        shingles = self.shingles(text)
+        return tuple(
+            min(((a * s + b) % _MERSENNE_PRIME) & _MAX_HASH for s in shingles)
+            for a, b in self._params
+        )
+
+
+def estimate_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Share of equal MinHash slots, an unbiased estimate of the shingle Jaccard similarity"""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "signature", "classification", "draft", "expires_at")
+
+    def __init__(self, fingerprint: str, signature: Tuple[int, ...], classification: Dict[str, Any],
+                 draft: Dict[str, Any], expires_at: Optional[float]):
+        self.fingerprint = fingerprint
+        self.signature = signature
+        self.classification = classification
+        self.draft = draft
+        self.expires_at = expires_at
+
+
+class DuplicateIndex:
+    """Bounded MinHash/LSH index of approved ticket responses"""
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 5000, ttl_seconds: Optional[float] = 86400,
+                 num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [defaultdict(set) for _ in range(bands)]
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _remove(self, fingerprint: str) -> None:
+        entry = self._entries.pop(fingerprint)
+        for band, key in self._band_keys(entry.signature):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _expire(self, now: float) -> None:
+        # Entries are kept in last-use order, so expired ones are mostly at the front; any
+        # that a hit moved back are dropped when they next come up as a candidate
+        while self._entries:
+            fingerprint, entry = next(iter(self._entries.items()))
+            if entry.expires_at is None or entry.expires_at > now:
+                break
+            self._remove(fingerprint)
+
+    def add(self, analysis: Dict[str, Any], classification: Dict[str, Any], draft: Dict[str, Any]) -> None:
+        """Remember an approved response for the ticket described by ``analysis``"""
+        signature = self.hasher.signature(analysis["text"])
+        fingerprint = analysis["fingerprint"]
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if fingerprint in self._entries:
+                self._remove(fingerprint)
+            self._entries[fingerprint] = _Entry(fingerprint, signature, classification, draft, expires_at)
+            for band, key in self._band_keys(signature):
+                self._buckets[band][key].add(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def find(self, analysis: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Best stored match at or above the threshold, or None"""
+        signature = self.hasher.signature(analysis["text"])
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            self._expire(now)
+            exact = self._entries.get(analysis["fingerprint"])
+            if exact is not None and (exact.expires_at is None or exact.expires_at > now):
+                best, similarity = exact, 1.0
+            else:
+                candidates = set()
+                for band, key in self._band_keys(signature):
+                    candidates.update(self._buckets[band].get(key, ()))
+                best, similarity = None, 0.0
+                for fingerprint in candidates:
+                    entry = self._entries[fingerprint]
+                    if entry.expires_at is not None and entry.expires_at <= now:
+                        self._remove(fingerprint)
+                        continue
+                    score = estimate_similarity(signature, entry.signature)
+                    if score > similarity:
+                        best, similarity = entry, score
+                if best is None or similarity < self.threshold:
+                    return None
+            self._entries.move_to_end(best.fingerprint)
+            self.hits += 1
+            return {
+                "fingerprint": best.fingerprint,
+                "similarity": round(similarity, 4),
+                "classification": dict(best.classification),
+                "draft": dict(best.draft)
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                # Every hit is a ticket that skipped the full classify/retrieve/draft/review run
+                "avoided_runs": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0
+            }
+
+
+_index: Optional[DuplicateIndex] = None
+_index_lock = threading.Lock()
+
+def get_duplicate_index() -> Optional[DuplicateIndex]:
+    """Process-wide index from settings, or None when reuse is disabled"""
+    global _index
+    if not settings.DUPLICATE_REUSE_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DuplicateIndex(
+                    threshold=settings.DUPLICATE_SIMILARITY_THRESHOLD,
+                    max_entries=settings.DUPLICATE_INDEX_MAX_ENTRIES,
+                    ttl_seconds=settings.DUPLICATE_INDEX_TTL_SECONDS,
+                    num_perm=settings.DUPLICATE_MINHASH_PERMUTATIONS,
+                    bands=settings.DUPLICATE_LSH_BANDS
+                )
+    return _index
@@ -0,0 +1,194 @@
+"""Buffered, append-only escalation sink.
+
+Escalation records are queued in memory and written in batches by a background flush
+thread through a pluggable backend (CSV, JSONL or SQLite). File backends hold an
+exclusive OS-level lock while appending so several worker processes can share one log.
+"""
+import atexit
+import csv
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from src.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ESCALATION_FIELDS = ["timestamp", "subject", "description", "category", "attempts", "draft", "feedback"]
+
+
+@contextmanager
+def locked_append(path: str, newline: Optional[str] = None):
+    """Open path for appending while holding an exclusive lock across processes"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8", newline=newline) as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            f.seek(0, os.SEEK_END)
+            yield f
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EscalationBackend(ABC):
+    """Storage for batches of escalation records"""
+
+    @abstractmethod
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Durably append the records"""
+
+    def close(self) -> None:
+        pass
+
+
+class CSVBackend(EscalationBackend):
+    def __init__(self, path: str):
+        self.path = path
+
+    def _existing_header(self) -> Optional[List[str]]:
+        try:
+            with open(self.path, "r", encoding="utf-8", newline="") as f:
+                return next(csv.reader(f), None)
+        except FileNotFoundError:
+            return None
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        with locked_append(self.path, newline="") as f:
+            # Checked under the lock so concurrent writers agree on who writes the header
+            header = self._existing_header() if f.tell() > 0 else None
+            writer = csv.DictWriter(f, fieldnames=header or ESCALATION_FIELDS, extrasaction="ignore")
+            if header is None:
+                writer.writeheader()
+            writer.writerows(records)
+
+
+class JSONLBackend(EscalationBackend):
+    def __init__(self, path: str):
+        self.path = path
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        with locked_append(self.path) as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+
+
+class SQLiteBackend(EscalationBackend):
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        columns = ", ".join(f"{name} TEXT" for name in ESCALATION_FIELDS)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS escalations ({columns})")
+        self._conn.commit()
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        placeholders = ", ".join("?" for _ in ESCALATION_FIELDS)
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO escalations ({', '.join(ESCALATION_FIELDS)}) VALUES ({placeholders})",
+                [tuple(str(record.get(name, "")) for name in ESCALATION_FIELDS) for record in records]
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+BACKENDS = {
+    "csv": CSVBackend,
+    "jsonl": JSONLBackend,
+    "sqlite": SQLiteBackend
+}
+
+def create_backend(kind: str, path: str) -> EscalationBackend:
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown escalation backend '{kind}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[kind](path)
+
+
+class EscalationSink:
+    """Queues escalation records and flushes them in batches from a background thread"""
+
+    def __init__(self, backend: EscalationBackend, batch_size: int = 50, flush_interval: float = 1.0):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="escalation-sink", daemon=True)
+                self._thread.start()
+        if self._closed:
+            self.flush()
+        elif full:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            try:
+                self.backend.write_batch(batch)
+            except Exception as e:
+                # Never lose records silently: surface them on stdout like the old fallback
+                for record in batch:
+                    print(f"ESCALATION RECORD FAILED: {record}\nError: {str(e)}")
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        self.backend.close()
+
+
+_sink: Optional[EscalationSink] = None
+_sink_lock = threading.Lock()
+
+def get_escalation_sink() -> EscalationSink:
+    """Process-wide sink built from settings on first use and flushed at exit"""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = EscalationSink(
+                    create_backend(settings.ESCALATION_SINK_BACKEND, settings.ESCALATION_LOG_PATH),
+                    batch_size=settings.ESCALATION_BATCH_SIZE,
+                    flush_interval=settings.ESCALATION_FLUSH_INTERVAL
+                )
+                atexit.register(_sink.close)
+    return _sink
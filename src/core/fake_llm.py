@@ -0,0 +1,220 @@
+"""Offline chat models for tests, load tests and benchmarks.
+
+- ``ReplayChatModel`` serves recorded responses from a JSON fixture keyed by prompt hash,
+  optionally recording misses from a live model.
+- ``SyntheticChatModel`` fabricates schema-valid outputs for each purpose (a category
+  name, or a JSON object of them for a batched classification; a policy-clean draft;
+  review JSON) after a sampled latency. Both the output and the latency are derived
+  from a hash of the prompt, so runs are deterministic.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr, model_validator
+
+from src.core.utils import estimate_tokens
+
+SYNTHETIC_CATEGORIES = ("Billing", "Technical", "Security", "General")
+
+_SUBJECT_RE = re.compile(r"Subject:\s*(.+)")
+_BATCH_ID_RE = re.compile(r"^\[(t\d+)\]$", re.MULTILINE)  # ticket headers of a batched classification
+
+
+def prompt_hash(messages: List[BaseMessage]) -> str:
+    """Stable hash of the message roles and contents"""
+    payload = json.dumps([[m.type, str(m.content)] for m in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _usage(messages: List[BaseMessage], text: str) -> Dict[str, int]:
+    prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+    completion_tokens = estimate_tokens(text)
+    return {
+        "input_tokens": prompt_tokens,
+        "output_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+class LatencyModel:
+    """Samples call latencies (seconds) from a configured distribution"""
+
+    def __init__(self, distribution: str = "constant", mean_ms: float = 0.0,
+                 spread: float = 0.0, scale: float = 1.0):
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.spread = spread
+        self.scale = scale
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], scale: float = 1.0) -> "LatencyModel":
+        return cls(config.get("distribution", "constant"), config.get("mean_ms", 0.0),
+                   config.get("spread", 0.0), scale)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.mean_ms <= 0 or self.scale <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            ms = rng.uniform(self.mean_ms * (1 - self.spread), self.mean_ms * (1 + self.spread))
+        elif self.distribution == "normal":
+            ms = rng.gauss(self.mean_ms, self.mean_ms * self.spread)
+        elif self.distribution == "lognormal":
+            # Parameterised so the distribution mean equals mean_ms; spread is sigma
+            mu = math.log(self.mean_ms) - self.spread ** 2 / 2
+            ms = rng.lognormvariate(mu, self.spread)
+        else:
+            ms = self.mean_ms
+        return max(0.0, ms) * self.scale / 1000
+
+
+class SyntheticChatModel(BaseChatModel):
+    """Returns plausible, schema-valid responses for one purpose without any network"""
+
+    purpose: str
+    temperature: float = 0.0
+    seed: int = 0
+    approval_rate: float = 0.8
+    latency: Any = None  # LatencyModel
+
+    @property
+    def _llm_type(self) -> str:
+        return "synthetic"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"purpose": self.purpose, "temperature": self.temperature, "seed": self.seed}
+
+    def _rng(self, messages: List[BaseMessage]) -> random.Random:
+        return random.Random(f"{self.seed}:{self.purpose}:{prompt_hash(messages)}")
+
+    def _respond(self, messages: List[BaseMessage], rng: random.Random) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        if self.purpose == "classification":
+            batch_ids = _BATCH_ID_RE.findall(prompt)
+            if batch_ids:
+                return json.dumps({ticket_id: rng.choice(SYNTHETIC_CATEGORIES) for ticket_id in batch_ids})
+            return rng.choice(SYNTHETIC_CATEGORIES)
+        if self.purpose == "review":
+            if rng.random() < self.approval_rate:
+                return json.dumps({"approved": True, "feedback": "Clear, professional and on-policy.",
+                                   "violations": []})
+            return json.dumps({"approved": False, "feedback": "Provide clear next steps for the customer.",
+                               "violations": []})
+        subject_match = _SUBJECT_RE.search(prompt)
+        subject = subject_match.group(1).strip() if subject_match else "your request"
+        return (
+            f"Hello,\n\nThank you for contacting us about \"{subject}\". We're sorry for the trouble. "
+            "Based on our documentation, please review the steps in your account settings, and reply "
+            "with any error messages you see so our team can investigate further.\n\n"
+            "Best regards,\nSupport Team"
+        )
+
+    def _prepare(self, messages: List[BaseMessage]):
+        rng = self._rng(messages)
+        delay = self.latency.sample(rng) if self.latency is not None else 0.0
+        text = self._respond(messages, rng)
+        return delay, AIMessage(content=text, usage_metadata=_usage(messages, text))
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        delay, message = self._prepare(messages)
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        delay, message = self._prepare(messages)
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        delay, message = self._prepare(messages)
+        words = re.findall(r"\S+\s*", str(message.content))
+        per_word = delay / len(words) if words else 0.0
+        for word in words:
+            if per_word:
+                time.sleep(per_word)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+
+class ReplayChatModel(BaseChatModel):
+    """Serves recorded responses from a fixture file of {prompt_hash: response_text}"""
+
+    fixture_path: str
+    fallback: Optional[BaseChatModel] = None
+    record: bool = False
+    responses: Dict[str, str] = {}
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @model_validator(mode="after")
+    def _load_fixture(self) -> "ReplayChatModel":
+        path = Path(self.fixture_path)
+        if path.exists():
+            self.responses = json.loads(path.read_text(encoding="utf-8"))
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"fixture_path": self.fixture_path}
+
+    def _lookup(self, messages: List[BaseMessage]) -> tuple:
+        key = prompt_hash(messages)
+        return key, self.responses.get(key)
+
+    def _store(self, key: str, text: str) -> None:
+        if not self.record:
+            return
+        with self._lock:
+            self.responses[key] = text
+            path = Path(self.fixture_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.responses, indent=2, sort_keys=True), encoding="utf-8")
+
+    def _miss(self, key: str) -> KeyError:
+        return KeyError(f"No recorded response for prompt hash {key} in {self.fixture_path}")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        key, text = self._lookup(messages)
+        if text is None:
+            if self.fallback is None:
+                raise self._miss(key)
+            text = str(self.fallback.invoke(messages, stop=stop, **kwargs).content)
+            self._store(key, text)
+        message = AIMessage(content=text, usage_metadata=_usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        key, text = self._lookup(messages)
+        if text is None:
+            if self.fallback is None:
+                raise self._miss(key)
+            text = str((await self.fallback.ainvoke(messages, stop=stop, **kwargs)).content)
+            self._store(key, text)
+        message = AIMessage(content=text, usage_metadata=_usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,356 @@
+"""Per-node tracing and metrics for the support agent graph.
+
+When enabled, every graph node is wrapped in a span that records wall time, LLM calls,
+prompt/completion tokens, cache hits and an outcome. The spans of one ticket form a
+trace that is attached to the returned state under ``state["trace"]`` and handed to the
+configured exporters:
+
+- ``PrometheusExporter`` aggregates counters and a duration histogram and renders them
+  in the Prometheus text exposition format (optionally to a node-exporter textfile).
+- ``SpanFileExporter`` appends OpenTelemetry-style span JSON (OTLP field names) to a
+  local JSONL file for collectors or offline analysis.
+
+When disabled, ``SupportAgent`` adds its nodes unwrapped and the hooks called from the
+provider router and response cache reduce to a single context-variable lookup.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import settings
+from src.core.escalation import locked_append
+
+_current_span: contextvars.ContextVar[Optional["NodeSpan"]] = contextvars.ContextVar(
+    "support_agent_span", default=None
+)
+
+
+class NodeSpan:
+    """Measurements for one execution of one graph node"""
+
+    __slots__ = ("trace_id", "span_id", "name", "start_ns", "duration", "llm_calls",
+                 "prompt_tokens", "completion_tokens", "cache_hits", "outcome", "error")
+
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.duration = 0.0
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hits = 0
+        self.outcome = "ok"
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def record_llm_call(message: Any) -> None:
+    """Count one provider call (and its token usage) against the running node"""
+    span = _current_span.get()
+    if span is None:
+        return
+    usage = getattr(message, "usage_metadata", None) or {}
+    span.llm_calls += 1
+    span.prompt_tokens += usage.get("input_tokens", 0)
+    span.completion_tokens += usage.get("output_tokens", 0)
+
+def record_cache_hit() -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.cache_hits += 1
+
+def record_error(error: BaseException) -> None:
+    """Mark the running node as having fallen back after an error it handled itself"""
+    span = _current_span.get()
+    if span is not None:
+        span.outcome = "error"
+        span.error = f"{type(error).__name__}: {error}"
+
+
+def _node_outcome(name: str, state: Dict[str, Any]) -> str:
+    if name == "review":
+        review = state.get("review") or {}
+        if state.get("escalated"):
+            return "escalated"
+        return "approved" if review.get("approved") else "rejected"
+    if name == "escalate":
+        return "escalated"
+    return "ok"
+
+
+class TraceExporter(ABC):
+    """Receives each finished ticket trace"""
+
+    @abstractmethod
+    def export(self, trace: Dict[str, Any]) -> None:
+        """Consume one trace: {"trace_id", "start_ns", "duration", "outcome", "spans"}"""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryExporter(TraceExporter):
+    """Keeps finished traces in a list; handy in tests and notebooks"""
+
+    def __init__(self):
+        self.traces: List[Dict[str, Any]] = []
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        self.traces.append(trace)
+
+
+class PrometheusExporter(TraceExporter):
+    """Aggregates traces into Prometheus counters and a node duration histogram"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, namespace: str = "support_agent", textfile_path: Optional[str] = None):
+        self.namespace = namespace
+        self.textfile_path = textfile_path
+        self._lock = threading.Lock()
+        self._tickets: Dict[str, int] = defaultdict(int)
+        self._node_runs: Dict[tuple, int] = defaultdict(int)
+        self._node_seconds: Dict[str, float] = defaultdict(float)
+        self._node_buckets: Dict[str, List[int]] = defaultdict(lambda: [0] * len(self.BUCKETS))
+        self._llm_calls: Dict[str, int] = defaultdict(int)
+        self._tokens: Dict[tuple, int] = defaultdict(int)
+        self._cache_hits: Dict[str, int] = defaultdict(int)
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        with self._lock:
+            self._tickets[trace["outcome"]] += 1
+            for span in trace["spans"]:
+                node = span["name"]
+                self._node_runs[(node, span["outcome"])] += 1
+                self._node_seconds[node] += span["duration"]
+                buckets = self._node_buckets[node]
+                for i, bound in enumerate(self.BUCKETS):
+                    if span["duration"] <= bound:
+                        buckets[i] += 1
+                self._llm_calls[node] += span["llm_calls"]
+                self._tokens[(node, "prompt")] += span["prompt_tokens"]
+                self._tokens[(node, "completion")] += span["completion_tokens"]
+                self._cache_hits[node] += span["cache_hits"]
+
+    def render(self) -> str:
+        """Current metrics in the Prometheus text exposition format"""
+        ns = self.namespace
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} {kind}")
+
+        with self._lock:
+            family("tickets_total", "counter", "Tickets processed by final outcome")
+            for outcome, value in sorted(self._tickets.items()):
+                lines.append(f'{ns}_tickets_total{{outcome="{outcome}"}} {value}')
+
+            family("node_runs_total", "counter", "Graph node executions by outcome")
+            for (node, outcome), value in sorted(self._node_runs.items()):
+                lines.append(f'{ns}_node_runs_total{{node="{node}",outcome="{outcome}"}} {value}')
+
+            family("node_duration_seconds", "histogram", "Wall time spent in each graph node")
+            for node, buckets in sorted(self._node_buckets.items()):
+                for bound, count in zip(self.BUCKETS, buckets):
+                    lines.append(f'{ns}_node_duration_seconds_bucket{{node="{node}",le="{bound}"}} {count}')
+                total = sum(v for (n, _), v in self._node_runs.items() if n == node)
+                lines.append(f'{ns}_node_duration_seconds_bucket{{node="{node}",le="+Inf"}} {total}')
+                lines.append(f'{ns}_node_duration_seconds_sum{{node="{node}"}} {self._node_seconds[node]:.6f}')
+                lines.append(f'{ns}_node_duration_seconds_count{{node="{node}"}} {total}')
+
+            family("llm_calls_total", "counter", "Provider LLM calls made by each node")
+            for node, value in sorted(self._llm_calls.items()):
+                lines.append(f'{ns}_llm_calls_total{{node="{node}"}} {value}')
+
+            family("llm_tokens_total", "counter", "LLM tokens used by each node")
+            for (node, kind), value in sorted(self._tokens.items()):
+                lines.append(f'{ns}_llm_tokens_total{{node="{node}",kind="{kind}"}} {value}')
+
+            family("llm_cache_hits_total", "counter", "LLM response cache hits by node")
+            for node, value in sorted(self._cache_hits.items()):
+                lines.append(f'{ns}_llm_cache_hits_total{{node="{node}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Optional[str] = None) -> None:
+        """Atomically write the metrics for node-exporter's textfile collector"""
+        path = path or self.textfile_path
+        if not path:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def close(self) -> None:
+        self.write_textfile()
+
+
+class SpanFileExporter(TraceExporter):
+    """Appends OpenTelemetry-style spans (one root span per ticket) to a JSONL file"""
+
+    def __init__(self, path: str, service_name: str = "support-agent"):
+        self.path = path
+        self.service_name = service_name
+
+    def _span(self, trace_id: str, span_id: str, parent_id: Optional[str], name: str,
+              start_ns: int, duration: float, status: str, attributes: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "traceId": trace_id,
+            "spanId": span_id,
+            "parentSpanId": parent_id,
+            "name": name,
+            "startTimeUnixNano": start_ns,
+            "endTimeUnixNano": start_ns + int(duration * 1e9),
+            "status": {"code": "STATUS_CODE_ERROR" if status == "error" else "STATUS_CODE_OK"},
+            "attributes": {"service.name": self.service_name, **attributes}
+        }
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        root_id = trace["span_id"]
+        spans = [self._span(trace["trace_id"], root_id, None, "process_ticket", trace["start_ns"],
+                            trace["duration"], trace["outcome"], {"ticket.outcome": trace["outcome"]})]
+        for span in trace["spans"]:
+            spans.append(self._span(
+                trace["trace_id"], span["span_id"], root_id, f"node.{span['name']}", span["start_ns"],
+                span["duration"], span["outcome"], {
+                    "node.outcome": span["outcome"],
+                    "llm.calls": span["llm_calls"],
+                    "llm.usage.prompt_tokens": span["prompt_tokens"],
+                    "llm.usage.completion_tokens": span["completion_tokens"],
+                    "llm.cache_hits": span["cache_hits"],
+                    **({"error.message": span["error"]} if span["error"] else {})
+                }
+            ))
+        with locked_append(self.path) as f:
+            f.writelines(json.dumps(span) + "\n" for span in spans)
+
+
+class Instrumentation:
+    """Wraps graph nodes in spans and exports each ticket's trace"""
+
+    def __init__(self, exporters: Optional[List[TraceExporter]] = None):
+        self.exporters = list(exporters or [])
+
+    def exporter(self, kind: type) -> Optional[TraceExporter]:
+        return next((e for e in self.exporters if isinstance(e, kind)), None)
+
+    def start_trace(self) -> Dict[str, Any]:
+        return {
+            "trace_id": uuid.uuid4().hex,
+            "span_id": uuid.uuid4().hex[:16],
+            "start_ns": time.time_ns(),
+            "spans": []
+        }
+
+    def resume_trace(self, state: Dict[str, Any]) -> None:
+        """Continue a saved trace, possibly in another process; its duration spans the gap"""
+        if not state.get("trace"):
+            state["trace"] = self.start_trace()
+
+    def finish_trace(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarise the trace on the final state and hand it to the exporters"""
+        trace = state.get("trace")
+        if not trace:
+            return state
+        spans = trace["spans"]
+        # Wall clock rather than perf_counter so traces resumed in another process stay valid
+        trace["duration"] = (time.time_ns() - trace["start_ns"]) / 1e9
+        trace["outcome"] = "escalated" if state.get("escalated") else "resolved"
+        trace["llm_calls"] = sum(s["llm_calls"] for s in spans)
+        trace["prompt_tokens"] = sum(s["prompt_tokens"] for s in spans)
+        trace["completion_tokens"] = sum(s["completion_tokens"] for s in spans)
+        trace["cache_hits"] = sum(s["cache_hits"] for s in spans)
+        for exporter in self.exporters:
+            exporter.export(trace)
+        return state
+
+    def _open(self, name: str, state: Dict[str, Any]):
+        trace = state.get("trace") or {}
+        span = NodeSpan(trace.get("trace_id", ""), name)
+        return span, _current_span.set(span), time.perf_counter()
+
+    @staticmethod
+    def _close(span: NodeSpan, token, started: float, state: Any, error: Optional[BaseException]) -> None:
+        _current_span.reset(token)
+        span.duration = time.perf_counter() - started
+        if error is not None:
+            span.outcome = "error"
+            span.error = f"{type(error).__name__}: {error}"
+        elif span.outcome == "ok" and isinstance(state, dict):
+            span.outcome = _node_outcome(span.name, state)
+        trace = state.get("trace") if isinstance(state, dict) else None
+        if trace is not None:
+            trace["spans"].append(span.to_dict())
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def node(state):
+            span, token, started = self._open(name, state)
+            try:
+                result = func(state)
+            except BaseException as e:
+                self._close(span, token, started, state, e)
+                raise
+            self._close(span, token, started, result, None)
+            return result
+        return node
+
+    def awrap(self, name: str, afunc: Callable) -> Callable:
+        @functools.wraps(afunc)
+        async def node(state):
+            span, token, started = self._open(name, state)
+            try:
+                result = await afunc(state)
+            except BaseException as e:
+                self._close(span, token, started, state, e)
+                raise
+            self._close(span, token, started, result, None)
+            return result
+        return node
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            exporter.close()
+
+
+EXPORTERS = {
+    "prometheus": lambda: PrometheusExporter(textfile_path=settings.PROMETHEUS_TEXTFILE_PATH),
+    "otel": lambda: SpanFileExporter(settings.TRACE_SPANS_PATH),
+    "memory": InMemoryExporter
+}
+
+_instrumentation: Optional[Instrumentation] = None
+_instrumentation_lock = threading.Lock()
+
+def get_instrumentation() -> Optional[Instrumentation]:
+    """Process-wide instrumentation built from settings, or None when disabled"""
+    global _instrumentation
+    if not settings.INSTRUMENTATION_ENABLED:
+        return None
+    if _instrumentation is None:
+        with _instrumentation_lock:
+            if _instrumentation is None:
+                unknown = [name for name in settings.INSTRUMENTATION_EXPORTERS if name not in EXPORTERS]
+                if unknown:
+                    raise ValueError(f"Unknown trace exporter(s) {unknown}, expected {sorted(EXPORTERS)}")
+                _instrumentation = Instrumentation(
+                    [EXPORTERS[name]() for name in settings.INSTRUMENTATION_EXPORTERS]
+                )
+                atexit.register(_instrumentation.close)
+    return _instrumentation
@@ -0,0 +1,329 @@
+"""Durable SQLite work queue for resumable ticket backlogs.
+
+Tickets are enqueued once and pulled by any number of worker processes on the same
+machine. A worker takes a time-limited lease on a job; the lease is extended every time a
+graph node completes, and the state after that node is saved with it. If the worker dies,
+the lease expires and another worker picks the job up, resuming at the node after the
+last completed one instead of re-running classification and drafting.
+
+    python -m src.core.job_queue enqueue tickets.jsonl
+    python -m src.core.job_queue work --processes 4
+    python -m src.core.job_queue stats
+    python -m src.core.job_queue export responses.jsonl
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+@dataclass
+class Job:
+    id: int
+    ticket: Dict[str, Any]
+    attempts: int
+    state: Optional[Dict[str, Any]] = None
+    last_node: Optional[str] = None
+
+
+class JobQueue:
+    """SQLite-backed queue with lease/visibility-timeout semantics"""
+
+    def __init__(self, path: str, lease_seconds: float = 120.0, max_attempts: int = 3,
+                 retry_backoff_base: float = 5.0, retry_backoff_max: float = 300.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_max = retry_backoff_max
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; writes that must be atomic use explicit BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " ticket TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " state TEXT,"
+            " last_node TEXT,"
+            " lease_owner TEXT,"
+            " lease_expires REAL,"
+            " enqueued_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)")
+
+    def enqueue(self, ticket: Dict[str, Any]) -> int:
+        return self.enqueue_many([ticket])[0]
+
+    def enqueue_many(self, tickets: Iterable[Dict[str, Any]]) -> List[int]:
+        now = time.time()
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for ticket in tickets:
+                    cursor = self._conn.execute(
+                        "INSERT INTO jobs (ticket, status, enqueued_at) VALUES (?, ?, ?)",
+                        (json.dumps(ticket), QUEUED, now)
+                    )
+                    ids.append(cursor.lastrowid)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def lease(self, worker_id: str) -> Optional[Job]:
+        """Claim the oldest queued job, or one whose previous lease has expired.
+
+        A requeued job keeps its not-before time in ``lease_expires`` and is skipped until then.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, ticket, attempts, state, last_node FROM jobs"
+                    " WHERE (status = ? AND (lease_expires IS NULL OR lease_expires <= ?))"
+                    " OR (status = ? AND lease_expires < ?)"
+                    " ORDER BY id LIMIT 1",
+                    (QUEUED, now, LEASED, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?,"
+                    " attempts = attempts + 1, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (LEASED, worker_id, now + self.lease_seconds, now, row[0])
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(
+            id=row[0],
+            ticket=json.loads(row[1]),
+            attempts=row[2] + 1,
+            state=json.loads(row[3]) if row[3] else None,
+            last_node=row[4]
+        )
+
+    def _update_leased(self, sql: str, params: tuple, job_id: int, worker_id: str) -> bool:
+        # Only the current lease holder may write; a worker whose lease expired and was
+        # taken over must not clobber the new owner's progress
+        with self._lock:
+            cursor = self._conn.execute(
+                f"{sql} WHERE id = ? AND status = ? AND lease_owner = ?",
+                (*params, job_id, LEASED, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def checkpoint(self, job_id: int, worker_id: str, node: str, state: Dict[str, Any]) -> bool:
+        """Save the state after ``node`` and extend the lease; False if the lease was lost"""
+        return self._update_leased(
+            "UPDATE jobs SET state = ?, last_node = ?, lease_expires = ?",
+            (json.dumps(state, default=str), node, time.time() + self.lease_seconds), job_id, worker_id
+        )
+
+    def complete(self, job_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._update_leased(
+            "UPDATE jobs SET status = ?, result = ?, finished_at = ?, lease_owner = NULL, lease_expires = NULL",
+            (DONE, json.dumps(result, default=str), time.time()), job_id, worker_id
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds a job waits before its next lease after ``attempts`` failed ones"""
+        return min(self.retry_backoff_max, self.retry_backoff_base * (2 ** max(0, attempts - 1)))
+
+    def fail(self, job_id: int, worker_id: str, error: str, attempts: int) -> bool:
+        """Release the job for another attempt after a backoff, or park it as failed once attempts run out"""
+        now = time.time()
+        if attempts >= self.max_attempts:
+            status, not_before = FAILED, None
+        else:
+            # Without the delay a provider outage would use up every attempt within seconds
+            status, not_before = QUEUED, now + self.retry_delay(attempts)
+        return self._update_leased(
+            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = ?,"
+            " finished_at = CASE WHEN ? = 'failed' THEN ? ELSE NULL END",
+            (status, error, not_before, status, now), job_id, worker_id
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth by status plus processing lag"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest_waiting, expired = self._conn.execute(
+                "SELECT MIN(enqueued_at), SUM(CASE WHEN status = ? AND lease_expires < ? THEN 1 ELSE 0 END)"
+                " FROM jobs WHERE status IN (?, ?)",
+                (LEASED, now, QUEUED, LEASED)
+            ).fetchone()
+            wait, turnaround = self._conn.execute(
+                "SELECT AVG(started_at - enqueued_at), AVG(finished_at - enqueued_at) FROM jobs WHERE status = ?",
+                (DONE,)
+            ).fetchone()
+        return {
+            "queued": counts.get(QUEUED, 0),
+            "leased": counts.get(LEASED, 0),
+            "expired_leases": expired or 0,
+            "done": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "depth": counts.get(QUEUED, 0) + counts.get(LEASED, 0),
+            # Age of the oldest unfinished job: how far processing is behind the backlog
+            "lag_s": round(now - oldest_waiting, 3) if oldest_waiting else 0.0,
+            "mean_wait_s": round(wait or 0.0, 3),
+            "mean_turnaround_s": round(turnaround or 0.0, 3)
+        }
+
+    def results(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, result FROM jobs WHERE status = ? ORDER BY id", (DONE,)
+            ).fetchall()
+        for job_id, result in rows:
+            yield {"job": job_id, **json.loads(result)}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def process_job(agent: Any, queue: JobQueue, job: Job, worker_id: str) -> Optional[Dict[str, Any]]:
+    """Run (or resume) one leased job, checkpointing after every node"""
+    def on_node(node: str, state: Dict[str, Any]) -> None:
+        if not queue.checkpoint(job.id, worker_id, node, state):
+            logger.warning(f"Lease on job {job.id} lost after node '{node}'")
+
+    try:
+        if job.state and job.last_node:
+            logger.info(f"Resuming job {job.id} after node '{job.last_node}' (attempt {job.attempts})")
+            result = agent.resume_ticket(job.state, job.last_node, on_node=on_node)
+        else:
+            result = agent.process_ticket(job.ticket, on_node=on_node)
+    except Exception as e:
+        logger.error(f"Job {job.id} failed: {str(e)}")
+        queue.fail(job.id, worker_id, str(e), job.attempts)
+        return None
+    if result.get("retryable"):
+        # The agent escalated on a transient provider error; requeue instead of completing
+        logger.error(f"Job {job.id} failed: {result.get('error')}")
+        queue.fail(job.id, worker_id, str(result.get("error")), job.attempts)
+        return None
+    queue.complete(job.id, worker_id, result)
+    return result
+
+
+def run_worker(queue: JobQueue, agent: Any = None, worker_id: Optional[str] = None,
+               poll_interval: float = 0.5, exit_when_empty: bool = True,
+               stop: Optional[threading.Event] = None) -> int:
+    """Pull and process jobs until the queue is drained (or ``stop`` is set); returns jobs done"""
+    if agent is None:
+        from src.core import SupportAgent
+        agent = SupportAgent()
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    while stop is None or not stop.is_set():
+        job = queue.lease(worker_id)
+        if job is None:
+            if exit_when_empty and queue.stats()["depth"] == 0:
+                break
+            # Jobs leased by others may still come back if their worker dies
+            time.sleep(poll_interval)
+            continue
+        if job.attempts > queue.max_attempts:
+            queue.fail(job.id, worker_id, "Exceeded max attempts", job.attempts)
+            continue
+        if process_job(agent, queue, job, worker_id) is not None:
+            processed += 1
+    return processed
+
+
+def open_queue(path: str) -> JobQueue:
+    return JobQueue(path, settings.QUEUE_LEASE_SECONDS, settings.QUEUE_MAX_ATTEMPTS,
+                    settings.QUEUE_RETRY_BACKOFF_BASE, settings.QUEUE_RETRY_BACKOFF_MAX)
+
+
+def _worker_process(path: str) -> int:
+    from src.core.escalation import get_escalation_sink
+
+    logging.basicConfig(level=logging.INFO)
+    queue = open_queue(path)
+    try:
+        return run_worker(queue, poll_interval=settings.QUEUE_POLL_INTERVAL)
+    finally:
+        # Pool workers exit without running atexit hooks, so push buffered escalations to
+        # the shared (lock-protected) log before the jobs' DONE status is all that is left
+        get_escalation_sink().flush()
+        queue.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Durable ticket queue")
+    parser.add_argument('--db', default=settings.QUEUE_PATH, help='SQLite queue database')
+    commands = parser.add_subparsers(dest='command', required=True)
+    enqueue = commands.add_parser('enqueue', help='Add tickets from a JSONL file')
+    enqueue.add_argument('path')
+    work = commands.add_parser('work', help='Process jobs until the queue is drained')
+    work.add_argument('--processes', type=int, default=1, help='Worker processes to run')
+    commands.add_parser('stats', help='Print queue depth and lag')
+    export = commands.add_parser('export', help='Write completed results to JSONL')
+    export.add_argument('path')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    queue = open_queue(args.db)
+    if args.command == 'enqueue':
+        from src.core.batch import iter_tickets
+
+        ids = queue.enqueue_many(ticket for _, ticket in iter_tickets(args.path))
+        print(f"Enqueued {len(ids)} tickets into {args.db}")
+    elif args.command == 'work':
+        if args.processes <= 1:
+            processed = run_worker(queue, poll_interval=settings.QUEUE_POLL_INTERVAL)
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                processed = sum(pool.map(_worker_process, [args.db] * args.processes))
+        print(f"Processed {processed} tickets")
+        print(json.dumps(queue.stats()))
+    elif args.command == 'stats':
+        print(json.dumps(queue.stats(), indent=2))
+    else:
+        with open(args.path, 'w', encoding='utf-8') as out:
+            count = 0
+            for record in queue.results():
+                out.write(json.dumps(record) + "\n")
+                count += 1
+        print(f"Wrote {count} results to {args.path}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
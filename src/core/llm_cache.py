@@ -0,0 +1,155 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.core.instrumentation import record_cache_hit
+
+_ESCAPED_WHITESPACE_RE = re.compile(r"(\\[nrt])+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so trivially different prompts share a cache entry.
+
+    Case is kept: prompts that differ in case can legitimately warrant different answers.
+    """
+    prompt = _ESCAPED_WHITESPACE_RE.sub(" ", prompt)
+    return _WHITESPACE_RE.sub(" ", prompt).strip()
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Key on the normalized prompt messages plus the model/temperature parameters"""
+    payload = f"{normalize_prompt(prompt)}\x00{llm_string}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def cached_reply(llm: BaseChatModel, messages: List[BaseMessage]) -> Optional[str]:
+    """Content ``llm`` has cached for ``messages``, looked up under the key its own call would use"""
+    if not isinstance(llm.cache, BaseCache):
+        return None
+    generations = llm.cache.lookup(dumps(messages), llm._get_llm_string())
+    return generations[0].text if generations else None
+
+def cache_reply(llm: BaseChatModel, messages: List[BaseMessage], content: str) -> None:
+    """Record ``content`` as ``llm``'s reply to ``messages``, as if the call had been made"""
+    if isinstance(llm.cache, BaseCache):
+        llm.cache.update(dumps(messages), llm._get_llm_string(),
+                         [ChatGeneration(message=AIMessage(content=content))])
+
+
+class LLMResponseCache(BaseCache):
+    """Two-tier LLM response cache: in-memory LRU with TTL, plus an optional SQLite tier.
+
+    Plugged into chat models via their ``cache`` field, so LangChain handles the
+    lookup/update around each call and only misses reach the provider.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = 3600,
+                 sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self.purge_expired()
+
+    def _expiry(self) -> Optional[float]:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    record_cache_hit()
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and (row[1] is None or row[1] > now):
+                    value = loads(row[0], allowed_objects="core")
+                    self._store_memory(key, value, row[1])
+                    self.hits += 1
+                    record_cache_hit()
+                    return value
+                if row is not None:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string)
+        expires_at = self._expiry()
+        with self._lock:
+            self._store_memory(key, return_val, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, dumps(list(return_val)), expires_at)
+                )
+                self._db.commit()
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # Lookups are in-process and short; skip the default executor hop
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    def _store_memory(self, key: str, value: Sequence, expires_at: Optional[float]) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the SQLite tier; returns how many were removed"""
+        if self._db is None:
+            return 0
+        cursor = self._db.execute(
+            "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+        self._db.commit()
+        return cursor.rowcount
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._memory)
+            }
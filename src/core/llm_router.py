@@ -0,0 +1,296 @@
+"""Provider router: rate limiting, failover and jittered backoff across chat models.
+
+``RouterChatModel`` is itself a LangChain chat model, so prompts pipe into it exactly as
+they did into ``ChatGroq``/``ChatOpenAI`` and response caching keeps working. Each call
+is admitted by the route's token buckets (requests/min and tokens/min), sent to the
+highest-priority provider, and failed over to the next one on 429/5xx/connection
+errors. When every provider has failed in a round, the router backs off with full
+jitter and tries again, up to ``max_retries`` rounds.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.core.instrumentation import record_llm_call
+from src.core.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_ERROR_NAMES = {
+    "RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError",
+    "ServiceUnavailableError", "ConnectError", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError"
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for throttling, server-side and transport failures worth retrying elsewhere"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens, returning how long the caller must wait before using them"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def debit(self, amount: float) -> None:
+        """Charge extra usage discovered after the fact (may drive the balance negative)"""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one provider"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        return wait
+
+    def acquire(self, estimated_tokens: int) -> None:
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, estimated_tokens: int) -> None:
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        if self.tokens is not None and actual_tokens and actual_tokens > estimated_tokens:
+            self.tokens.debit(actual_tokens - estimated_tokens)
+
+
+@dataclass
+class ProviderRoute:
+    name: str
+    model: Any  # BaseChatModel, or a Runnable bound from one (e.g. via bind_tools)
+    limiter: ProviderRateLimiter = field(default_factory=ProviderRateLimiter)
+
+
+def _route_params(model: Any) -> Dict[str, Any]:
+    """Model name and temperature of a route, so cache keys change when either does"""
+    params = dict(getattr(model, "_identifying_params", None) or {})
+    try:
+        ls_params = model._get_ls_params()
+    except Exception:
+        ls_params = {}
+    params.update({k: ls_params[k] for k in ("ls_model_name", "ls_temperature") if k in ls_params})
+    return params
+
+def _tool_spec(tool: Any) -> Any:
+    try:
+        return convert_to_openai_tool(tool)
+    except Exception:
+        return repr(tool)
+
+def _child_config(run_manager) -> Dict[str, Any]:
+    # The router run is the logical LLM call that callbacks see; provider calls made on
+    # its behalf are not re-reported, so handlers counting calls/tokens don't double count
+    return {"callbacks": []}
+
+def _estimate_prompt_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(estimate_tokens(str(m.content)) for m in messages)
+
+def _usage_tokens(message: BaseMessage) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+class RouterChatModel(BaseChatModel):
+    """Chat model that routes each call across prioritized provider routes"""
+
+    routes: List[ProviderRoute]
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    sleep: Callable[[float], None] = time.sleep
+    # Tools and tool_choice bound by bind_tools; part of the cache key, since the routes'
+    # own identifying params do not include what was bound to them
+    bound_tools: Optional[Dict[str, Any]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "provider-router"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "routes": [
+                {"provider": route.name, **_route_params(route.model)}
+                for route in self.routes
+            ]
+        }
+        if self.bound_tools:
+            params["bound_tools"] = self.bound_tools
+        return params
+
+    def _backoff(self, round_number: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^round)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** round_number)))
+
+    def _attempts(self) -> Iterator[tuple]:
+        for round_number in range(self.max_retries + 1):
+            for position, route in enumerate(self.routes):
+                yield round_number, position == len(self.routes) - 1, route
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        estimated = _estimate_prompt_tokens(messages)
+        last_error: Optional[BaseException] = None
+        for round_number, last_in_round, route in self._attempts():
+            route.limiter.acquire(estimated)
+            try:
+                message = route.model.invoke(messages, _child_config(run_manager), stop=stop, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                logger.warning(f"LLM provider '{route.name}' failed ({type(e).__name__}); failing over")
+                if last_in_round and round_number < self.max_retries:
+                    self.sleep(self._backoff(round_number))
+                continue
+            route.limiter.settle(estimated, _usage_tokens(message))
+            record_llm_call(message)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise last_error
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        estimated = _estimate_prompt_tokens(messages)
+        last_error: Optional[BaseException] = None
+        for round_number, last_in_round, route in self._attempts():
+            await route.limiter.aacquire(estimated)
+            try:
+                message = await route.model.ainvoke(messages, _child_config(run_manager), stop=stop, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                logger.warning(f"LLM provider '{route.name}' failed ({type(e).__name__}); failing over")
+                if last_in_round and round_number < self.max_retries:
+                    await asyncio.sleep(self._backoff(round_number))
+                continue
+            route.limiter.settle(estimated, _usage_tokens(message))
+            record_llm_call(message)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise last_error
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        # Failover is only possible until the first chunk has been handed to the caller
+        estimated = _estimate_prompt_tokens(messages)
+        last_error: Optional[BaseException] = None
+        for round_number, last_in_round, route in self._attempts():
+            route.limiter.acquire(estimated)
+            started = False
+            try:
+                for chunk in route.model.stream(messages, _child_config(run_manager), stop=stop, **kwargs):
+                    started = True
+                    if run_manager:
+                        run_manager.on_llm_new_token(str(chunk.content), chunk=chunk)
+                    yield ChatGenerationChunk(message=chunk)
+                record_llm_call(None)
+                return
+            except GeneratorExit:
+                # The caller stopped reading (e.g. a streamed draft aborted on a policy match)
+                record_llm_call(None)
+                raise
+            except Exception as e:
+                if started or not is_retryable(e):
+                    raise
+                last_error = e
+                logger.warning(f"LLM provider '{route.name}' failed ({type(e).__name__}); failing over")
+                if last_in_round and round_number < self.max_retries:
+                    self.sleep(self._backoff(round_number))
+        raise last_error
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        estimated = _estimate_prompt_tokens(messages)
+        last_error: Optional[BaseException] = None
+        for round_number, last_in_round, route in self._attempts():
+            await route.limiter.aacquire(estimated)
+            started = False
+            try:
+                async for chunk in route.model.astream(messages, _child_config(run_manager), stop=stop,
+                                                       **kwargs):
+                    started = True
+                    if run_manager:
+                        await run_manager.on_llm_new_token(str(chunk.content), chunk=chunk)
+                    yield ChatGenerationChunk(message=chunk)
+                record_llm_call(None)
+                return
+            except GeneratorExit:
+                # The caller stopped reading (e.g. a streamed draft aborted on a policy match)
+                record_llm_call(None)
+                raise
+            except Exception as e:
+                if started or not is_retryable(e):
+                    raise
+                last_error = e
+                logger.warning(f"LLM provider '{route.name}' failed ({type(e).__name__}); failing over")
+                if last_in_round and round_number < self.max_retries:
+                    await asyncio.sleep(self._backoff(round_number))
+        raise last_error
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "RouterChatModel":
+        """Bind tools on every route that supports them, keeping failover and rate limits"""
+        routes = []
+        for route in self.routes:
+            try:
+                bound = route.model.bind_tools(tools, **kwargs)
+            except (AttributeError, NotImplementedError):
+                continue
+            routes.append(ProviderRoute(route.name, bound, route.limiter))
+        if not routes:
+            raise NotImplementedError("No configured provider supports tool calling")
+        bound_tools = {"tools": [_tool_spec(tool) for tool in tools], **kwargs}
+        return self.model_copy(update={"routes": routes, "bound_tools": bound_tools})
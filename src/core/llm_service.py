@@ -1,15 +1,54 @@
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
+import logging
+import threading
+from langchain_core.language_models import BaseChatModel
 from src.config import settings
-from typing import Literal
+from src.core.llm_cache import LLMResponseCache
+from src.core.llm_router import ProviderRateLimiter, ProviderRoute, RouterChatModel
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional
+
+# Provider SDKs (and httpx) are imported inside their factories so only the
+# providers actually selected by LLM_PROVIDER/LLM_FALLBACK_PROVIDERS get loaded
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+    from langchain_openai import ChatOpenAI
+    from src.core.fake_llm import ReplayChatModel, SyntheticChatModel
 
 Purpose = Literal["classification", "draft", "review"]
 
+# (purpose, temperature, shared HTTP clients) -> provider chat model
+ProviderFactory = Callable[[Purpose, float, Dict[str, Any]], BaseChatModel]
+
+# Providers that talk HTTP and get pooled clients; offline providers receive none
+HTTP_PROVIDERS = {"groq", "openai"}
+
+logger = logging.getLogger(__name__)
+
 class LLMService:
     def __init__(self):
         self._llm_instances = {}
+        self._lock = threading.Lock()
+        self._http_clients: Dict[str, Dict[str, Any]] = {}
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+        self._factories: Dict[str, ProviderFactory] = {
+            "groq": self._create_groq,
+            "openai": self._create_openai,
+            "replay": self._create_replay,
+            "synthetic": self._create_synthetic
+        }
+        self.cache: Optional[LLMResponseCache] = None
+        if settings.LLM_CACHE_ENABLED:
+            self.cache = LLMResponseCache(
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                sqlite_path=settings.LLM_CACHE_SQLITE_PATH
+            )
 
-    def get_llm(self, purpose: Purpose) -> ChatGroq | ChatOpenAI:
+    def register_provider(self, name: str, factory: ProviderFactory) -> None:
+        """Add or replace a provider factory (e.g. a stub model in tests)"""
+        self._factories[name] = factory
+        self._llm_instances.clear()
+
+    def get_llm(self, purpose: Purpose) -> BaseChatModel:
         """Get configured LLM instance for specific purpose."""
         if purpose in self._llm_instances:
             return self._llm_instances[purpose]
@@ -20,26 +59,136 @@ class LLMService:
             "review": settings.REVIEW_TEMPERATURE
         }
 
-        llm = self._create_llm(
-            provider=settings.LLM_PROVIDER,
-            temperature=temperature_map[purpose]
+        with self._lock:
+            if purpose not in self._llm_instances:
+                self._llm_instances[purpose] = self._create_llm(
+                    purpose=purpose,
+                    temperature=temperature_map[purpose],
+                    cache=self._cache_for(purpose)
+                )
+        return self._llm_instances[purpose]
+
+    def _cache_for(self, purpose: Purpose) -> LLMResponseCache | bool:
+        """Purposes listed in LLM_CACHE_PURPOSES share the response cache; others bypass it"""
+        if self.cache is not None and purpose in settings.LLM_CACHE_PURPOSES:
+            return self.cache
+        return False
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def provider_order(self) -> List[str]:
+        """Primary provider first, then configured fallbacks (deduplicated)"""
+        return list(dict.fromkeys([settings.LLM_PROVIDER, *settings.LLM_FALLBACK_PROVIDERS]))
+
+    def _create_llm(self, purpose: Purpose, temperature: float,
+                    cache: LLMResponseCache | bool = False) -> RouterChatModel:
+        """Build a router over every available provider for this purpose."""
+        routes = []
+        for provider in self.provider_order():
+            factory = self._factories.get(provider)
+            if factory is None:
+                raise ValueError(f"Unknown LLM provider '{provider}'")
+            try:
+                clients = self._clients_for(provider) if provider in HTTP_PROVIDERS else {}
+                model = factory(purpose, temperature, clients)
+            except ValueError:
+                if provider == settings.LLM_PROVIDER:
+                    raise
+                # Fallbacks without credentials are skipped rather than failing startup
+                logger.info(f"Skipping fallback LLM provider '{provider}': not configured")
+                continue
+            routes.append(ProviderRoute(provider, model, self._limiter_for(provider)))
+
+        return RouterChatModel(
+            routes=routes,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base=settings.LLM_BACKOFF_BASE,
+            backoff_max=settings.LLM_BACKOFF_MAX,
+            cache=cache
         )
-        self._llm_instances[purpose] = llm
-        return llm
-
-    def _create_llm(self, provider: str, temperature: float) -> ChatGroq | ChatOpenAI:
-        """Instantiate the LLM based on provider."""
-        if provider == "groq":
-            return ChatGroq(
-                model_name=settings.GROQ_MODEL,
-                temperature=temperature,
-                api_key=settings.groq_api_key
+
+    def _limiter_for(self, provider: str) -> ProviderRateLimiter:
+        """One limiter per provider, shared by every purpose that routes to it"""
+        if provider not in self._limiters:
+            limits = settings.PROVIDER_RATE_LIMITS.get(provider, {})
+            self._limiters[provider] = ProviderRateLimiter(
+                requests_per_minute=limits.get("requests_per_minute"),
+                tokens_per_minute=limits.get("tokens_per_minute")
+            )
+        return self._limiters[provider]
+
+    def _clients_for(self, provider: str) -> Dict[str, Any]:
+        """Pooled sync/async HTTP clients shared by every model of one provider"""
+        if provider not in self._http_clients:
+            import httpx
+
+            limits = httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE
             )
+            timeout = httpx.Timeout(settings.LLM_HTTP_TIMEOUT)
+            self._http_clients[provider] = {
+                "http_client": httpx.Client(limits=limits, timeout=timeout),
+                "http_async_client": httpx.AsyncClient(limits=limits, timeout=timeout)
+            }
+        return self._http_clients[provider]
+
+    def _create_groq(self, purpose: Purpose, temperature: float, clients: Dict[str, Any]) -> "ChatGroq":
+        api_key = self._require_key(settings.groq_api_key, "GROQ_API_KEY")
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            model_name=settings.GROQ_MODEL,
+            temperature=temperature,
+            api_key=api_key,
+            max_retries=0,  # retries and failover are handled by the router
+            **clients
+        )
+
+    def _create_openai(self, purpose: Purpose, temperature: float, clients: Dict[str, Any]) -> "ChatOpenAI":
+        api_key = self._require_key(settings.openai_api_key, "OPENAI_API_KEY")
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model_name=settings.OPENAI_MODEL,
             temperature=temperature,
-            api_key=settings.openai_api_key
+            api_key=api_key,
+            max_retries=0,
+            **clients
         )
 
+    def _create_replay(self, purpose: Purpose, temperature: float, clients: Dict[str, Any]) -> "ReplayChatModel":
+        from src.core.fake_llm import ReplayChatModel
+
+        fallback = None
+        source = settings.LLM_REPLAY_RECORD_FROM
+        if source:
+            fallback = self._factories[source](purpose, temperature, self._clients_for(source))
+        return ReplayChatModel(
+            fixture_path=settings.LLM_REPLAY_FIXTURE_PATH,
+            fallback=fallback,
+            record=fallback is not None
+        )
+
+    def _create_synthetic(self, purpose: Purpose, temperature: float, clients: Dict[str, Any]) -> "SyntheticChatModel":
+        from src.core.fake_llm import LatencyModel, SyntheticChatModel
+
+        return SyntheticChatModel(
+            purpose=purpose,
+            temperature=temperature,
+            seed=settings.SYNTHETIC_SEED,
+            approval_rate=settings.SYNTHETIC_APPROVAL_RATE,
+            latency=LatencyModel.from_config(
+                settings.SYNTHETIC_LATENCY_MS.get(purpose, {}), scale=settings.SYNTHETIC_LATENCY_SCALE
+            )
+        )
+
+    @staticmethod
+    def _require_key(key: Optional[str], name: str) -> str:
+        if not key:
+            raise ValueError(f"{name} not found in environment variables")
+        return key
+
 # Singleton instance
-llm_service = LLMService()
\ No newline at end of file
+llm_service = LLMService()
@@ -1,35 +1,231 @@
-from typing import Dict, List
-from dataclasses import dataclass
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.config import settings
 from src.core.schemas import Ticket
 
-@dataclass
+
+class Turn:
+    __slots__ = ("role", "content", "created_at")
+
+    def __init__(self, role: str, content: str, created_at: float):
+        self.role = role
+        self.content = content
+        self.created_at = created_at
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+
 class Conversation:
-    ticket: Ticket
-    history: List[Dict[str, str]]
-    
+    __slots__ = ("ticket_id", "ticket", "history", "expires_at", "version")
+
+    def __init__(self, ticket_id: str, ticket: Ticket, history: Optional[List[Turn]] = None,
+                 expires_at: Optional[float] = None, version: int = 0):
+        self.ticket_id = ticket_id
+        self.ticket = ticket
+        self.history = history if history is not None else []
+        self.expires_at = expires_at
+        self.version = version  # id of the last persisted turn held in history (SQLite tier only)
+
+    def messages(self) -> List[Dict[str, str]]:
+        return [turn.to_dict() for turn in self.history]
+
+
 class AgentMemory:
-    def __init__(self):
-        self.conversations: Dict[str, Conversation] = {}
-    
-    def add_interaction(self, ticket_id: str, role: str, content: str):
-        if ticket_id not in self.conversations:
-            raise ValueError("Ticket not initialized")
-        self.conversations[ticket_id].history.append({
-            "role": role,
-            "content": content
-        })
-    
-    def get_conversation(self, ticket_id: str) -> Conversation:
-        return self.conversations.get(ticket_id)
-    
-    def initialize_conversation(self, ticket: Ticket) -> str:
-        import uuid
-        ticket_id = str(uuid.uuid4())
-        self.conversations[ticket_id] = Conversation(
-            ticket=ticket,
-            history=[]
-        )
+    """Multi-turn conversations keyed by ticket ID: in-memory LRU with TTL, plus an optional SQLite tier.
+
+    The in-memory tier holds at most ``max_conversations``; the least recently used are
+    evicted and, with ``sqlite_path`` set, reloaded from SQLite on their next lookup, so a
+    conversation can be continued by another process or after a restart. With SQLite,
+    it is the source of truth: every lookup checks the last persisted turn and reloads a
+    cached conversation that another process has extended. Conversations expire
+    ``ttl_seconds`` after their last turn in both tiers.
+    """
+
+    def __init__(self, max_conversations: int = 1000, ttl_seconds: Optional[float] = 86400,
+                 sqlite_path: Optional[str] = None):
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=30)
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS memory_conversations "
+                "(ticket_id TEXT PRIMARY KEY, ticket TEXT NOT NULL, expires_at REAL);"
+                "CREATE TABLE IF NOT EXISTS memory_turns "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, ticket_id TEXT NOT NULL, role TEXT NOT NULL, "
+                "content TEXT NOT NULL, created_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS memory_turns_ticket ON memory_turns (ticket_id, id);"
+            )
+            self._db.commit()
+
+    def _expiry(self, now: float) -> Optional[float]:
+        return now + self.ttl_seconds if self.ttl_seconds else None
+
+    def initialize_conversation(self, ticket: Ticket, ticket_id: Optional[str] = None) -> str:
+        ticket_id = ticket_id or str(uuid.uuid4())
+        expires_at = self._expiry(time.time())
+        with self._lock:
+            self._store_memory(Conversation(ticket_id, ticket, [], expires_at))
+            if self._db is not None:
+                self._db.execute("DELETE FROM memory_turns WHERE ticket_id = ?", (ticket_id,))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO memory_conversations (ticket_id, ticket, expires_at) VALUES (?, ?, ?)",
+                    (ticket_id, json.dumps(ticket), expires_at)
+                )
+                self._db.commit()
         return ticket_id
 
+    def add_interaction(self, ticket_id: str, role: str, content: str):
+        now = time.time()
+        with self._lock:
+            if self._db is not None:
+                # Hold the write lock from the lookup to the insert, so a turn another
+                # process appends in between cannot be missing from the cached history
+                self._db.execute("BEGIN IMMEDIATE")
+            try:
+                conversation = self._lookup(ticket_id, now)
+                if conversation is None:
+                    raise ValueError("Ticket not initialized")
+                conversation.history.append(Turn(role, content, now))
+                conversation.expires_at = self._expiry(now)
+                if self._db is not None:
+                    cursor = self._db.execute(
+                        "INSERT INTO memory_turns (ticket_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                        (ticket_id, role, content, now)
+                    )
+                    conversation.version = cursor.lastrowid
+                    self._db.execute(
+                        "UPDATE memory_conversations SET expires_at = ? WHERE ticket_id = ?",
+                        (conversation.expires_at, ticket_id)
+                    )
+                    self._db.commit()
+            except BaseException:
+                if self._db is not None and self._db.in_transaction:
+                    self._db.rollback()
+                raise
+
+    def get_conversation(self, ticket_id: str) -> Optional[Conversation]:
+        with self._lock:
+            return self._lookup(ticket_id, time.time())
+
+    def _lookup(self, ticket_id: str, now: float) -> Optional[Conversation]:
+        if self._db is not None:
+            return self._lookup_persisted(ticket_id, now)
+        conversation = self.conversations.get(ticket_id)
+        if conversation is not None:
+            if conversation.expires_at is None or conversation.expires_at > now:
+                self.conversations.move_to_end(ticket_id)
+                self.hits += 1
+                return conversation
+            del self.conversations[ticket_id]
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def _lookup_persisted(self, ticket_id: str, now: float) -> Optional[Conversation]:
+        """The SQLite conversation, served from memory while no other process has changed it"""
+        cached = self.conversations.pop(ticket_id, None)
+        row = self._db.execute(
+            "SELECT ticket, expires_at, (SELECT COALESCE(MAX(id), 0) FROM memory_turns WHERE ticket_id = ?)"
+            " FROM memory_conversations WHERE ticket_id = ?",
+            (ticket_id, ticket_id)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        ticket, expires_at, version = row
+        if expires_at is not None and expires_at <= now:
+            self._delete_persisted(ticket_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if cached is None or cached.version != version:
+            turns = self._db.execute(
+                "SELECT role, content, created_at FROM memory_turns WHERE ticket_id = ? ORDER BY id",
+                (ticket_id,)
+            ).fetchall()
+            cached = Conversation(ticket_id, json.loads(ticket), [Turn(*t) for t in turns], expires_at, version)
+        else:
+            cached.ticket = json.loads(ticket)
+            cached.expires_at = expires_at
+        self._store_memory(cached)
+        self.hits += 1
+        return cached
+
+    def _store_memory(self, conversation: Conversation) -> None:
+        self.conversations[conversation.ticket_id] = conversation
+        self.conversations.move_to_end(conversation.ticket_id)
+        while len(self.conversations) > self.max_conversations:
+            # Evicted conversations stay in the SQLite tier, if any
+            self.conversations.popitem(last=False)
+            self.evictions += 1
+
+    def _delete_persisted(self, ticket_id: str) -> None:
+        self._db.execute("DELETE FROM memory_turns WHERE ticket_id = ?", (ticket_id,))
+        self._db.execute("DELETE FROM memory_conversations WHERE ticket_id = ?", (ticket_id,))
+        self._db.commit()
+
+    def purge_expired(self) -> int:
+        """Drop expired conversations from both tiers; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [tid for tid, c in self.conversations.items()
+                       if c.expires_at is not None and c.expires_at <= now]
+            for ticket_id in expired:
+                del self.conversations[ticket_id]
+            removed = set(expired)
+            if self._db is not None:
+                rows = self._db.execute(
+                    "SELECT ticket_id FROM memory_conversations WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (now,)
+                ).fetchall()
+                for (ticket_id,) in rows:
+                    self._db.execute("DELETE FROM memory_turns WHERE ticket_id = ?", (ticket_id,))
+                    removed.add(ticket_id)
+                self._db.execute(
+                    "DELETE FROM memory_conversations WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+                )
+                self._db.commit()
+            self.expirations += len(removed)
+            return len(removed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "entries": len(self.conversations),
+                "capacity": self.max_conversations,
+                "occupancy": len(self.conversations) / self.max_conversations if self.max_conversations else 0.0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+            if self._db is not None:
+                stats["persisted"] = self._db.execute("SELECT COUNT(*) FROM memory_conversations").fetchone()[0]
+            return stats
+
 # Singleton instance
-memory = AgentMemory()
\ No newline at end of file
+memory = AgentMemory(
+    max_conversations=settings.MEMORY_MAX_CONVERSATIONS,
+    ttl_seconds=settings.MEMORY_TTL_SECONDS,
+    sqlite_path=settings.MEMORY_SQLITE_PATH
+)
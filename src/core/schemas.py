@@ -1,13 +1,24 @@
-from typing import TypedDict, List, Literal, Optional
+from typing import Any, Dict, TypedDict, List, Literal, Optional
 from dataclasses import dataclass
 
 class Ticket(TypedDict):
     subject: str
     description: str
+    # Optionally "id" or "ticket_id", which keys the ticket's checkpoints
+
+class TicketAnalysis(TypedDict):
+    subject: str  # normalized
+    description: str
+    text: str  # "subject\ndescription"
+    fingerprint: str
+    language: str
+    keywords: List[str]
+    embedding: Optional[List[float]]  # retrieval query vector, None for engines without one
 
 class Classification(TypedDict):
     category: Literal["Billing", "Technical", "Security", "General"]
     confidence: float
+    source: Literal["local", "llm"]  # which classifier set the label; missing on error fallbacks
 
 class Context(TypedDict):
     category: str
@@ -16,6 +27,9 @@ class Context(TypedDict):
 class Draft(TypedDict):
     content: str
     context_used: List[str]
+    tokens: Dict[str, Any]  # context/prompt token counts and packing stats from the context packer
+    aborted: bool  # streamed draft stopped on a policy violation (see stream_draft)
+    violations: List[str]
 
 class Review(TypedDict):
     approved: bool
@@ -23,12 +37,17 @@ class Review(TypedDict):
 
 class AgentState(TypedDict):
     ticket: Ticket
+    analysis: Optional[TicketAnalysis]  # computed once by the classify node, reused on retries
     classification: Optional[Classification]
     context: Optional[Context]
     draft: Optional[Draft]
     review: Optional[Review]
     attempt: int
     escalated: bool
+    trace: Optional[Dict[str, Any]]  # per-node spans, present when instrumentation is enabled
+    resume_at: Optional[str]  # node to enter at when resuming a partially processed ticket
+    reused: Optional[Dict[str, Any]]  # set when the response was reused from a near-duplicate ticket
+    speculation: Optional[Dict[str, Any]]  # last speculative drafting round: stats, attempt and winning review
 
 @dataclass
 class RetrySignal:
@@ -1,46 +1,76 @@
 import json
-from typing import Any, Dict
+import re
+from typing import Any, Dict, Sequence
 from pathlib import Path
-import pandas as pd
 from src.config import settings
+from src.core.escalation import ESCALATION_FIELDS, get_escalation_sink
 from datetime import datetime
-def validate_json_output(output: str, expected_keys: list) -> Dict[str, Any]:
-    """More robust JSON validation with fallback"""
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_PYTHON_LITERAL_RE = re.compile(r"\b(True|False|None)\b")
+
+def _loosen_json(text: str) -> str:
+    """Common LLM slips: trailing commas and Python literals"""
+    text = _TRAILING_COMMA_RE.sub(r"\1", text)
+    return _PYTHON_LITERAL_RE.sub(lambda m: _PYTHON_LITERALS[m.group(1)], text)
+
+def extract_json_object(output: str) -> Dict[str, Any]:
+    """First JSON object in LLM output, whether fenced in markdown or surrounded by prose.
+
+    Each ``{`` is tried in turn with an incremental decoder, first as is and then with
+    trailing commas and Python literals fixed. Raises ValueError when there is none.
+    """
+    decoder = json.JSONDecoder()
+    sources = [m.group(1) for m in _FENCE_RE.finditer(output)] + [output]
+    for source in sources:
+        for text in (source, _loosen_json(source)):
+            start = text.find("{")
+            while start != -1:
+                try:
+                    value, _ = decoder.raw_decode(text, start)
+                except ValueError:
+                    value = None
+                if isinstance(value, dict):
+                    return value
+                start = text.find("{", start + 1)
+    raise ValueError("No JSON object found in output")
+
+def validate_json_output(output: str, expected_keys: list, required: Sequence[str] = ()) -> Dict[str, Any]:
+    """More robust JSON validation with fallback.
+
+    Returns ``expected_keys`` from the first JSON object in ``output``, with missing keys
+    set to False. Without ``required``, output that has no JSON object gives all-False.
+    With ``required``, that output raises ValueError instead, as does a missing required key.
+    """
     try:
-        # Handle cases where LLM wraps JSON in markdown
-        cleaned = output.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
-        
-        # Parse JSON with fallback
-        data = json.loads(cleaned) if cleaned.startswith('{') else {}
-        return {k: data.get(k, False) for k in expected_keys}
-    except:
+        data = extract_json_object(output)
+    except ValueError:
+        if required:
+            raise
         return {k: False for k in expected_keys}
+    missing = [k for k in required if k not in data]
+    if missing:
+        raise ValueError(f"Missing required keys: {', '.join(missing)}")
+    return {k: data.get(k, False) for k in expected_keys}
+
 def log_escalation(data: Dict[str, Any]) -> None:
-    """Log escalations with guaranteed success"""
+    """Queue an escalation record on the buffered escalation sink"""
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        **{k: data.get(k, "") for k in ESCALATION_FIELDS if k != "timestamp"}
+    }
     try:
-        
-        if data.get("error") or data.get("attempt", 0) >= 1:  # Only log real issues
-            record = {
-                "timestamp": datetime.now().isoformat(),
-                "subject": data["ticket"]["subject"],
-                "description": data["ticket"]["description"],
-                "category": data.get("classification", {}).get("category", "UNKNOWN"),
-                "reason": data.get("error") or data.get("review", {}).get("feedback", "Policy violation")
-            }
-        
-        # Write to CSV
-        df = pd.DataFrame([record])
-        header = not Path(settings.ESCALATION_LOG_PATH).exists()
-        df.to_csv(settings.ESCALATION_LOG_PATH, mode='a', header=header, index=False)
+        get_escalation_sink().write(record)
     except Exception as e:
-        # Fallback to print if CSV fails
+        # Fallback to print if the sink is unavailable
         print(f"ESCALATION RECORD FAILED: {record}\nError: {str(e)}")
 
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for budgeting prompt context"""
+    return max(1, len(text) // 4)
+
 def prepare_retry_signal(state: Dict[str, Any]) -> Dict[str, Any]:
     """Prepare retry signal based on current state."""
     if state['attempt'] >= settings.MAX_RETRY_ATTEMPTS:
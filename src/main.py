@@ -1,17 +1,120 @@
 import argparse
+import importlib
 import json
+import logging
 import os
-from src.core import SupportAgent
+import time
 from src.core.schemas import Ticket
 
+# SupportAgent and the LLM stack are imported where they are used, so that
+# `--help` and argument errors return without loading langgraph/langchain
+
+# Provider SDKs reported by --import-profile when they end up loaded
+_PROVIDER_SDKS = ("langchain_groq", "langchain_openai", "groq", "openai")
+
+def print_import_profile() -> None:
+    """Time each cold-start stage (imports, graph compile, LLM clients) in load order"""
+    import sys
+
+    stages = []
+
+    def stage(label, func):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            label = f"{label} (failed: {e})"
+        stages.append((label, time.perf_counter() - start))
+
+    stage("settings + .env", lambda: importlib.import_module("src.config"))
+    stage("langchain_core", lambda: importlib.import_module("langchain_core.runnables"))
+    stage("langgraph", lambda: importlib.import_module("langgraph.graph"))
+    stage("services + llm router", lambda: importlib.import_module("src.core.agent"))
+    agent_cls = importlib.import_module("src.core.agent").SupportAgent
+    stage("graph compile", agent_cls)
+    llm_service = importlib.import_module("src.core.llm_service").llm_service
+    # The first client per provider includes importing that provider's SDK
+    for purpose in ("classification", "draft", "review"):
+        stage(f"llm client: {purpose}", lambda p=purpose: llm_service.get_llm(p))
+
+    total = sum(seconds for _, seconds in stages)
+    print(f"Startup profile (ms, in load order) for providers {llm_service.provider_order()}:")
+    for label, seconds in stages:
+        print(f"  {seconds * 1000:9.1f}  {label}")
+    print(f"  {total * 1000:9.1f}  total")
+    loaded = [name for name in _PROVIDER_SDKS if name in sys.modules]
+    print(f"Provider SDKs loaded: {', '.join(loaded) or 'none'}")
+
+def stream_printer():
+    """Draft token callback that prints policy-checked text, marking each revised draft"""
+    shown = {"attempt": 0}
+
+    def on_token(attempt: int, text: str) -> None:
+        if attempt != shown["attempt"]:
+            shown["attempt"] = attempt
+            print(f"\n\n--- revised draft (attempt {attempt + 1}) ---\n", flush=True)
+        print(text, end="", flush=True)
+
+    return on_token
+
+def run_batch_mode(input_path: str, output_path: str, concurrency: int, mode: str = "threads",
+                   workers: int = None, ordered: bool = False) -> None:
+    """Stream a JSONL ticket file through the chosen execution model into a JSONL result file"""
+    if not os.path.exists(input_path):
+        print(f"❌ Batch file '{input_path}' does not exist.")
+        return
+
+    from src.core.batch import BatchStats, iter_tickets, run_sharded
+
+    stats = BatchStats()
+    results = run_sharded(iter_tickets(input_path), mode, concurrency, workers, ordered, stats)
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for index, result, elapsed in results:
+            out.write(json.dumps({"line": index, "latency_s": round(elapsed, 3), **result}) + "\n")
+
+    summary = stats.summary()
+    latency = summary["latency_s"]
+    print(f"✅ Batch complete ({mode}). {summary['processed']} tickets written to {output_path}")
+    print(f"   approved={summary['approved']} escalated={summary['escalated']} "
+          f"reused={summary['reused']} wall={summary['wall_time_s']}s throughput={summary['tickets_per_s']} tickets/s")
+    print(f"   latency mean={latency['mean']}s p50={latency['p50']}s "
+          f"p95={latency['p95']}s p99={latency['p99']}s max={latency['max']}s")
+    print(f"   attempts mean={summary['attempts']['mean']} "
+          f"distribution={summary['attempts']['distribution']}")
+
 def main():
     parser = argparse.ArgumentParser(description="Support Ticket Resolution Agent")
     parser.add_argument('--subject', help='Ticket subject')
     parser.add_argument('--description', help='Ticket description')
     parser.add_argument('--input', help='Path to input JSON file')
-    parser.add_argument('--output', default='response.json', help='Output file path')
+    parser.add_argument('--output', help='Output file path (default: response.json, or responses.jsonl with --batch)')
+    parser.add_argument('--batch', help='Path to input JSONL file with one ticket per line')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Maximum tickets in flight in batch mode (per worker with --mode processes)')
+    parser.add_argument('--mode', choices=['threads', 'processes', 'asyncio'], default='threads',
+                        help='Batch execution model')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for --mode processes (default: CPU count)')
+    parser.add_argument('--ordered', action='store_true',
+                        help='Write batch results in input order instead of as they complete')
+    parser.add_argument('--stream', action='store_true',
+                        help='Print the draft to stdout as it is generated and policy-checked')
+    parser.add_argument('--import-profile', action='store_true',
+                        help='Report time spent on imports, graph compile and LLM clients, then exit')
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.import_profile:
+        print_import_profile()
+        return
+
+    if args.batch:
+        run_batch_mode(args.batch, args.output or 'responses.jsonl', args.concurrency,
+                       args.mode, args.workers, args.ordered)
+        return
+
+    args.output = args.output or 'response.json'
 
     ticket_data = None
 
@@ -46,8 +149,13 @@ def main():
         return
 
     # Process the ticket
-    agent = SupportAgent()
+    from src.core import SupportAgent
+
+    agent = SupportAgent(on_draft_token=stream_printer() if args.stream else None)
     result = agent.process_ticket(ticket_data)
+    if args.stream:
+        approved = (result.get('review') or {}).get('approved') and not result.get('escalated')
+        print("\n" + ("--- approved ---" if approved else "--- not approved ---"))
 
     # Save result only if not escalated or has retry attempts
     if not result.get('escalated') or result.get('attempt', 0) > 0:
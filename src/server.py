@@ -0,0 +1,335 @@
+"""Long-running HTTP service around one warm, shared SupportAgent.
+
+    python -m src.server --port 8080 --concurrency 8 --max-queue 64
+
+Endpoints:
+    POST /tickets        one ticket {"subject", "description"} -> agent result
+    POST /tickets/batch  {"tickets": [...]} (or a bare list) -> {"results": [...]} in input order
+    GET  /metrics        Prometheus text format (server, LLM cache and, when enabled, per-node metrics)
+    GET  /healthz        liveness
+
+Tickets run on a fixed pool of ``concurrency`` workers. At most ``max_queue`` more may
+wait for a worker; anything beyond that is rejected with 429 and a Retry-After header
+instead of piling up, so clients back off while the LLM providers are saturated.
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.core import SupportAgent
+from src.core.batch import LatencyRecorder
+from src.core.instrumentation import PrometheusExporter
+from src.core.llm_service import llm_service
+from src.services.classification import get_classification_batcher
+from src.services.review_output import review_parse_stats
+
+logger = logging.getLogger(__name__)
+
+# Request paths reported as metric labels; anything else is counted as "other" so that
+# clients cannot create unbounded label values
+ROUTES = ("/tickets", "/tickets/batch", "/metrics", "/healthz")
+
+
+class QueueFull(Exception):
+    """Raised when admitting more tickets would exceed workers + queue capacity"""
+
+
+class TicketService:
+    """Runs tickets on a bounded worker pool with admission control"""
+
+    def __init__(self, agent: SupportAgent, concurrency: int, max_queue: int):
+        self.agent = agent
+        self.concurrency = concurrency
+        self.capacity = concurrency + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ticket-worker")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.latency = LatencyRecorder()
+        self.tickets: Dict[str, int] = defaultdict(int)
+        self.rejected = 0
+
+    def _admit(self, count: int) -> None:
+        with self._lock:
+            if self._pending + count > self.capacity:
+                self.rejected += count
+                raise QueueFull(f"{self._pending} tickets pending, capacity {self.capacity}")
+            self._pending += count
+
+    def _run(self, ticket: Any) -> Dict[str, Any]:
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            result = self.agent.process_ticket(ticket)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self.latency.add(elapsed)
+        with self._lock:
+            self.tickets["escalated" if result.get("escalated") else "resolved"] += 1
+        return result
+
+    def process(self, ticket: Any) -> Dict[str, Any]:
+        self._admit(1)
+        return self._executor.submit(self._run, ticket).result()
+
+    def process_batch(self, tickets: List[Any]) -> List[Dict[str, Any]]:
+        """All-or-nothing admission, so a batch is never half-processed on overload"""
+        self._admit(len(tickets))
+        futures = [self._executor.submit(self._run, ticket) for ticket in tickets]
+        return [future.result() for future in futures]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "rejected": self.rejected,
+                "tickets": dict(self.tickets)
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class ServerMetrics:
+    """Request counters rendered alongside the service and per-node metrics"""
+
+    def __init__(self, service: TicketService, node_metrics: Optional[PrometheusExporter] = None):
+        self.service = service
+        self.node_metrics = node_metrics
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, int], int] = defaultdict(int)
+
+    def observe(self, path: str, status: int) -> None:
+        label = path if path in ROUTES else "other"
+        with self._lock:
+            self._requests[(label, status)] += 1
+
+    def render(self) -> str:
+        snapshot = self.service.snapshot()
+        lines = [
+            "# HELP support_agent_http_requests_total HTTP requests by path and status",
+            "# TYPE support_agent_http_requests_total counter",
+        ]
+        with self._lock:
+            for (path, status), value in sorted(self._requests.items()):
+                lines.append(f'support_agent_http_requests_total{{path="{path}",status="{status}"}} {value}')
+        lines += [
+            "# HELP support_agent_tickets_in_flight Tickets currently being processed",
+            "# TYPE support_agent_tickets_in_flight gauge",
+            f"support_agent_tickets_in_flight {snapshot['running']}",
+            "# HELP support_agent_tickets_queued Tickets admitted and waiting for a worker",
+            "# TYPE support_agent_tickets_queued gauge",
+            f"support_agent_tickets_queued {snapshot['queued']}",
+            "# HELP support_agent_tickets_rejected_total Tickets rejected with 429 because the queue was full",
+            "# TYPE support_agent_tickets_rejected_total counter",
+            f"support_agent_tickets_rejected_total {snapshot['rejected']}",
+            "# HELP support_agent_ticket_results_total Processed tickets by result",
+            "# TYPE support_agent_ticket_results_total counter",
+        ]
+        for outcome, value in sorted(snapshot["tickets"].items()):
+            lines.append(f'support_agent_ticket_results_total{{outcome="{outcome}"}} {value}')
+        latency = self.service.latency
+        lines += [
+            "# HELP support_agent_ticket_latency_seconds End-to-end ticket latency",
+            "# TYPE support_agent_ticket_latency_seconds summary",
+        ]
+        for quantile in (0.5, 0.95, 0.99):
+            lines.append(f'support_agent_ticket_latency_seconds{{quantile="{quantile}"}} '
+                         f'{latency.percentile(quantile * 100):.6f}')
+        lines += [
+            f"support_agent_ticket_latency_seconds_sum {latency.total:.6f}",
+            f"support_agent_ticket_latency_seconds_count {latency.count}",
+        ]
+        cache = llm_service.cache_stats()
+        if cache:
+            lines += [
+                "# HELP support_agent_llm_response_cache_lookups_total LLM response cache lookups",
+                "# TYPE support_agent_llm_response_cache_lookups_total counter",
+                f'support_agent_llm_response_cache_lookups_total{{result="hit"}} {cache["hits"]}',
+                f'support_agent_llm_response_cache_lookups_total{{result="miss"}} {cache["misses"]}',
+            ]
+        lines += [
+            "# HELP support_agent_review_outputs_total LLM review outputs by how they were parsed",
+            "# TYPE support_agent_review_outputs_total counter",
+        ]
+        for outcome, value in review_parse_stats().items():
+            lines.append(f'support_agent_review_outputs_total{{result="{outcome}"}} {value}')
+        batcher = get_classification_batcher()
+        if batcher is not None:
+            batching = batcher.stats()
+            lines += [
+                "# HELP support_agent_classification_batches_total Batched LLM classification calls",
+                "# TYPE support_agent_classification_batches_total counter",
+                f"support_agent_classification_batches_total {batching['batches']}",
+                "# HELP support_agent_classification_batched_tickets_total Tickets classified through the micro-batcher",
+                "# TYPE support_agent_classification_batched_tickets_total counter",
+                f"support_agent_classification_batched_tickets_total {batching['items']}",
+                "# HELP support_agent_classification_batch_fallbacks_total Tickets re-classified one by one after an unusable batched reply",
+                "# TYPE support_agent_classification_batch_fallbacks_total counter",
+                f"support_agent_classification_batch_fallbacks_total {batching['fallbacks']}",
+            ]
+        index = getattr(self.service.agent, "duplicate_index", None)
+        if index is not None:
+            duplicates = index.stats()
+            lines += [
+                "# HELP support_agent_duplicate_lookups_total Near-duplicate index lookups",
+                "# TYPE support_agent_duplicate_lookups_total counter",
+                f"support_agent_duplicate_lookups_total {duplicates['lookups']}",
+                "# HELP support_agent_pipeline_runs_avoided_total Tickets answered by reusing a near-duplicate's approved response",
+                "# TYPE support_agent_pipeline_runs_avoided_total counter",
+                f"support_agent_pipeline_runs_avoided_total {duplicates['avoided_runs']}",
+                "# HELP support_agent_duplicate_index_entries Approved responses held for reuse",
+                "# TYPE support_agent_duplicate_index_entries gauge",
+                f"support_agent_duplicate_index_entries {duplicates['entries']}",
+            ]
+        text = "\n".join(lines) + "\n"
+        if self.node_metrics is not None:
+            text += self.node_metrics.render()
+        return text
+
+
+class TicketRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SupportAgent/1.0"
+    protocol_version = "HTTP/1.1"
+
+    # Set on the server instance by create_server
+    @property
+    def service(self) -> TicketService:
+        return self.server.ticket_service
+
+    @property
+    def metrics(self) -> ServerMetrics:
+        return self.server.metrics
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: Any, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        payload = body if isinstance(body, bytes) else (
+            body.encode("utf-8") if isinstance(body, str) else json.dumps(body, default=str).encode("utf-8")
+        )
+        # Counted before the body is written so a client's next /metrics scrape includes it
+        self.metrics.observe(self.path.split("?")[0], status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, {"error": message}, headers=headers)
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            self._send(HTTPStatus.OK, self.metrics.render(), "text/plain; version=0.0.4")
+        elif path == "/healthz":
+            self._send(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f"No route for GET {path}")
+
+    def do_POST(self) -> None:
+        path = self.path.split("?")[0]
+        if path not in ("/tickets", "/tickets/batch"):
+            self._error(HTTPStatus.NOT_FOUND, f"No route for POST {path}")
+            return
+        try:
+            body = self._read_json()
+        except (ValueError, json.JSONDecodeError) as e:
+            self._error(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+            return
+
+        try:
+            if path == "/tickets":
+                if not isinstance(body, dict):
+                    self._error(HTTPStatus.BAD_REQUEST, "Expected a JSON object with 'subject' and 'description'")
+                    return
+                self._send(HTTPStatus.OK, self.service.process(body))
+                return
+
+            tickets = body.get("tickets") if isinstance(body, dict) else body
+            if not isinstance(tickets, list):
+                self._error(HTTPStatus.BAD_REQUEST, "Expected {\"tickets\": [...]} or a JSON list")
+                return
+            # A batch above the admission capacity would get 429 even on an idle server
+            max_batch = min(settings.SERVER_MAX_BATCH, self.service.capacity)
+            if len(tickets) > max_batch:
+                self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"Batch of {len(tickets)} exceeds the maximum of {max_batch} tickets")
+                return
+            self._send(HTTPStatus.OK, {"results": self.service.process_batch(tickets)})
+        except QueueFull as e:
+            self._error(HTTPStatus.TOO_MANY_REQUESTS, f"Server busy: {e}",
+                        headers={"Retry-After": str(settings.SERVER_RETRY_AFTER_SECONDS)})
+        except Exception as e:
+            logger.exception("Ticket processing failed")
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+
+def warm_up() -> None:
+    """Build the LLM clients (and their HTTP pools) before the first request arrives"""
+    for purpose in ("classification", "draft", "review"):
+        llm_service.get_llm(purpose)
+
+
+def create_server(host: str, port: int, concurrency: int, max_queue: int,
+                  agent: Optional[SupportAgent] = None) -> ThreadingHTTPServer:
+    agent = agent or SupportAgent()
+    warm_up()
+    service = TicketService(agent, concurrency, max_queue)
+    node_metrics = None
+    if agent.instrumentation is not None:
+        node_metrics = agent.instrumentation.exporter(PrometheusExporter)
+
+    server = ThreadingHTTPServer((host, port), TicketRequestHandler)
+    server.daemon_threads = True
+    server.ticket_service = service
+    server.metrics = ServerMetrics(service, node_metrics)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Support Ticket Resolution Agent HTTP service")
+    parser.add_argument('--host', default=settings.SERVER_HOST, help='Interface to bind')
+    parser.add_argument('--port', type=int, default=settings.SERVER_PORT, help='Port to listen on')
+    parser.add_argument('--concurrency', type=int, default=settings.SERVER_CONCURRENCY,
+                        help='Tickets processed in parallel')
+    parser.add_argument('--max-queue', type=int, default=settings.SERVER_MAX_QUEUE,
+                        help='Tickets allowed to wait for a worker before returning 429')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = create_server(args.host, args.port, args.concurrency, args.max_queue)
+    logger.info(f"Serving on http://{args.host}:{args.port} "
+                f"(concurrency={args.concurrency}, max_queue={args.max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.ticket_service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
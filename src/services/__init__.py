@@ -1,11 +1,25 @@
-from .classification import classify_ticket
-from .context_retrieval import retrieve_context
-from .draft_generation import generate_draft
-from .review import review_draft
+import importlib
 
-__all__ = [
-    "classify_ticket",
-    "retrieve_context",
-    "generate_draft",
-    "review_draft"
-]
\ No newline at end of file
+# Service functions are resolved on first access so importing a light submodule
+# (e.g. src.services.local_classifier) doesn't load the LLM stack
+_EXPORTS = {
+    "analyze_ticket": ".ticket_analysis",
+    "classify_ticket": ".classification",
+    "aclassify_ticket": ".classification",
+    "retrieve_context": ".context_retrieval",
+    "generate_draft": ".draft_generation",
+    "agenerate_draft": ".draft_generation",
+    "stream_draft": ".draft_generation",
+    "astream_draft": ".draft_generation",
+    "speculative_draft": ".speculative_drafting",
+    "aspeculative_draft": ".speculative_drafting",
+    "review_draft": ".review",
+    "areview_draft": ".review"
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
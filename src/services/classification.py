@@ -1,29 +1,128 @@
+import threading
 from langchain_core.prompts import ChatPromptTemplate
-from src.core.schemas import Ticket, Classification
+from typing import Optional
+from src.core.schemas import Ticket, Classification, TicketAnalysis
 from src.config import settings
 from src.core.llm_service import llm_service
+from src.services.local_classifier import CATEGORIES, get_local_classifier
+from src.services.classification_batcher import ClassificationBatcher
 
-def classify_ticket(ticket: Ticket) -> Classification:
-    """Classify ticket with empty input handling"""
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Classify this ticket into one category:
+    - Billing
+    - Technical  
+    - Security
+    - General
+    Return ONLY the category name"""),
+    ("human", "Subject: {subject}\nDescription: {description}")
+])
+
+def _prompt_inputs(ticket: Ticket, analysis: Optional[TicketAnalysis] = None) -> dict:
+    # The normalized text makes near-identical tickets render the same (cacheable) prompt
+    source = analysis or ticket
+    return {
+        "subject": source["subject"] or "(No subject)",
+        "description": source["description"] or "(No description)"
+    }
+
+def _normalize_category(raw: str):
+    """Map free-text LLM output onto one of the known categories"""
+    cleaned = raw.strip().strip(".\"'*").lower()
+    for category in CATEGORIES:
+        if cleaned == category.lower():
+            return category
+    for category in CATEGORIES:
+        if category.lower() in cleaned:
+            return category
+    return None
+
+def _local_classification(ticket: Ticket, analysis: Optional[TicketAnalysis] = None):
+    """Run the local classifier; returns (classification, probabilities, confident)"""
+    text = analysis["text"] if analysis else None
+    category, confidence, probs = get_local_classifier().predict(ticket, text)
+    result = {"category": category, "confidence": round(confidence, 4), "source": "local"}
+    # The keyword rules and trained models are English; other languages always go to the LLM
+    covered = not analysis or analysis["language"] in settings.LOCAL_CLASSIFIER_LANGUAGES
+    return result, probs, covered and confidence >= settings.CLASSIFIER_CONFIDENCE_THRESHOLD
+
+def _combined_confidence(category: str, probs: dict) -> float:
+    """Posterior of the LLM's label, with the local scores as the prior.
+
+    The LLM is treated as a labeler that is right with probability CLASSIFIER_LLM_ACCURACY
+    and otherwise picks one of the other labels uniformly. An LLM label the local model
+    rated low still ends up near the LLM's own accuracy, not at the local score.
+    """
+    accuracy = settings.CLASSIFIER_LLM_ACCURACY
+    agree = probs.get(category, 0.0) * accuracy
+    disagree = sum(p for c, p in probs.items() if c != category) * (1 - accuracy) / (len(CATEGORIES) - 1)
+    total = agree + disagree
+    return agree / total if total else accuracy
+
+def _merge_llm_label(raw: str, local: Classification, probs: dict) -> Classification:
+    """The LLM picks the label; confidence combines its accuracy with the local scores"""
+    category = _normalize_category(raw)
+    if category is None:
+        return local
+    return {"category": category, "confidence": round(_combined_confidence(category, probs), 4), "source": "llm"}
+
+def _llm_label(inputs: dict) -> str:
+    chain = _PROMPT | llm_service.get_llm("classification")
+    return chain.invoke(inputs).content
+
+_batcher: Optional[ClassificationBatcher] = None
+_batcher_lock = threading.Lock()
+
+def get_classification_batcher() -> Optional[ClassificationBatcher]:
+    """Process-wide micro-batcher for LLM classification, or None when batching is disabled"""
+    global _batcher
+    if not settings.CLASSIFICATION_BATCHING:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = ClassificationBatcher(
+                    _llm_label,
+                    max_batch_size=settings.CLASSIFICATION_BATCH_SIZE,
+                    max_wait_ms=settings.CLASSIFICATION_BATCH_WAIT_MS,
+                    max_in_flight=settings.CLASSIFICATION_BATCH_IN_FLIGHT,
+                    prompt=_PROMPT
+                )
+    return _batcher
+
+def classify_ticket(ticket: Ticket, analysis: Optional[TicketAnalysis] = None) -> Classification:
+    """Classify ticket locally, falling back to the LLM below the confidence threshold"""
+    if not ticket["subject"] and not ticket["description"]:
+        return {"category": "General", "confidence": 0.0}
+    
+    local, probs, confident = _local_classification(ticket, analysis)
+    if confident:
+        return local
+    
+    try:
+        batcher = get_classification_batcher()
+        inputs = _prompt_inputs(ticket, analysis)
+        raw = batcher.classify(inputs) if batcher is not None else _llm_label(inputs)
+        return _merge_llm_label(raw, local, probs)
+    except:
+        return local
+
+async def aclassify_ticket(ticket: Ticket, analysis: Optional[TicketAnalysis] = None) -> Classification:
+    """Async variant of classify_ticket built on chain.ainvoke"""
     if not ticket["subject"] and not ticket["description"]:
         return {"category": "General", "confidence": 0.0}
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """Classify this ticket into one category:
-        - Billing
-        - Technical  
-        - Security
-        - General
-        Return ONLY the category name"""),
-        ("human", "Subject: {subject}\nDescription: {description}")
-    ])
+    local, probs, confident = _local_classification(ticket, analysis)
+    if confident:
+        return local
     
     try:
-        chain = prompt | llm_service.get_llm("classification")
-        category = chain.invoke({
-            "subject": ticket["subject"] or "(No subject)",
-            "description": ticket["description"] or "(No description)"
-        }).content.strip()
-        return {"category": category, "confidence": 1.0}
+        batcher = get_classification_batcher()
+        inputs = _prompt_inputs(ticket, analysis)
+        if batcher is not None:
+            raw = await batcher.aclassify(inputs)
+        else:
+            chain = _PROMPT | llm_service.get_llm("classification")
+            raw = (await chain.ainvoke(inputs)).content
+        return _merge_llm_label(raw, local, probs)
     except:
-        return {"category": "General", "confidence": 0.0}
\ No newline at end of file
+        return local
@@ -0,0 +1,199 @@
+"""Micro-batching of LLM classification calls across concurrent tickets.
+
+Tickets the local pre-classifier is unsure about are queued here rather than each sending
+its own prompt. A collector thread closes a batch at ``max_batch_size`` tickets or
+``max_wait_ms`` after the first one arrived, whichever comes first. The batch is then
+classified in one LLM call that returns a JSON object of ``{ticket_id: category}``, and
+each waiting caller gets its own label back. Tickets missing from the reply, or given
+an unknown label, fall back to a single-ticket call. So does every ticket in a reply
+that cannot be parsed.
+
+Given the single-ticket ``prompt``, the batcher shares that call's response cache: a
+ticket whose single-ticket reply is cached resolves at once and never joins a batch,
+and batched labels are cached under the single-ticket key for later lookups.
+
+Several batches can be in flight at once (``max_in_flight``), so a slow provider call
+does not hold up the next batch. Callers wait on a future: threads block on it, and
+coroutines await it without blocking the event loop.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.core.llm_cache import cache_reply, cached_reply
+from src.core.llm_service import llm_service
+from src.services.local_classifier import CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+# Prompt inputs ({"subject", "description"}) -> raw label from a single-ticket LLM call
+SingleClassifier = Callable[[Dict[str, str]], str]
+
+_BATCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Classify each ticket into one category:
+    - Billing
+    - Technical
+    - Security
+    - General
+    Return ONLY a JSON object mapping every ticket ID to its category name, e.g.
+    {{"t1": "Billing", "t2": "Technical"}}"""),
+    ("human", "{tickets}")
+])
+
+
+def render_batch(items: Iterable[Tuple[str, Dict[str, str]]]) -> str:
+    return "\n\n".join(
+        f"[{ticket_id}]\nSubject: {inputs['subject']}\nDescription: {inputs['description']}"
+        for ticket_id, inputs in items
+    )
+
+
+def parse_batch_labels(raw: str, ticket_ids: List[str]) -> Dict[str, str]:
+    """Known categories per ticket ID from the batched reply; unparseable output gives {}"""
+    try:
+        mapping = json.loads(raw[raw.find("{"):raw.rfind("}") + 1])
+    except ValueError:
+        return {}
+    if not isinstance(mapping, dict):
+        return {}
+    known = {category.lower(): category for category in CATEGORIES}
+    labels = {}
+    for ticket_id in ticket_ids:
+        value = mapping.get(ticket_id)
+        label = value.strip().strip(".\"'*").lower() if isinstance(value, str) else None
+        if label in known:
+            labels[ticket_id] = known[label]
+    return labels
+
+
+class ClassificationBatcher:
+    """Collects classification requests into batched LLM calls"""
+
+    def __init__(self, classify_one: SingleClassifier, max_batch_size: int = 16,
+                 max_wait_ms: float = 20, max_in_flight: int = 4,
+                 prompt: Optional[ChatPromptTemplate] = None):
+        self.classify_one = classify_one
+        self.prompt = prompt  # the single-ticket prompt, whose cache entries are shared
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[Dict[str, str], Future]] = []
+        self._cond = threading.Condition()
+        self._collector: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix="classify-batch")
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    def submit(self, inputs: Dict[str, str]) -> Future:
+        """Queue one ticket's prompt inputs; the future resolves to its category label"""
+        future: Future = Future()
+        cached = self._cached_label(inputs)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+        with self._cond:
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, name="classify-batch-collector", daemon=True)
+                self._collector.start()
+            self._pending.append((inputs, future))
+            self._cond.notify()
+        return future
+
+    def classify(self, inputs: Dict[str, str]) -> str:
+        return self.submit(inputs).result()
+
+    async def aclassify(self, inputs: Dict[str, str]) -> str:
+        return await asyncio.wrap_future(self.submit(inputs))
+
+    def _collect(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.max_wait_ms / 1000
+                while len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+            self._executor.submit(self._dispatch, batch)
+
+    def _cached_label(self, inputs: Dict[str, str]) -> Optional[str]:
+        if self.prompt is None:
+            return None
+        return cached_reply(llm_service.get_llm("classification"), self.prompt.format_messages(**inputs))
+
+    def _dispatch(self, batch: List[Tuple[Dict[str, str], Future]]) -> None:
+        """Classify a batch in one LLM call.
+
+        This runs on the batcher's threads, outside every caller's context, so neither
+        the batched call nor a single-ticket fallback is attributed to any ticket's
+        classify span. Only cache hits, resolved in ``submit``, are.
+        """
+        with self._stats_lock:
+            self.batches += 1
+            self.items += len(batch)
+        if len(batch) == 1:
+            self._classify_singly(batch)
+            return
+
+        items = [(f"t{i}", inputs, future) for i, (inputs, future) in enumerate(batch, start=1)]
+        try:
+            chain = _BATCH_PROMPT | llm_service.get_llm("classification")
+            raw = chain.invoke({"tickets": render_batch((tid, inputs) for tid, inputs, _ in items)}).content
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        labels = parse_batch_labels(str(raw), [tid for tid, _, _ in items])
+        missing = []
+        for ticket_id, inputs, future in items:
+            if ticket_id in labels:
+                future.set_result(labels[ticket_id])
+            else:
+                missing.append((inputs, future))
+        if missing:
+            logger.warning(f"Batched classification left {len(missing)}/{len(batch)} tickets unlabeled; "
+                           f"classifying them one by one")
+            with self._stats_lock:
+                self.fallbacks += len(missing)
+            for inputs, future in missing:
+                self._executor.submit(self._classify_singly, [(inputs, future)])
+        self._cache_labels([(inputs, labels[tid]) for tid, inputs, _ in items if tid in labels])
+
+    def _cache_labels(self, labeled: List[Tuple[Dict[str, str], str]]) -> None:
+        """Store batched labels under each ticket's single-ticket cache key"""
+        if self.prompt is None:
+            return
+        llm = llm_service.get_llm("classification")
+        try:
+            for inputs, label in labeled:
+                cache_reply(llm, self.prompt.format_messages(**inputs), label)
+        except Exception as e:
+            logger.warning(f"Caching batched classification labels failed: {str(e)}")
+
+    def _classify_singly(self, batch: List[Tuple[Dict[str, str], Future]]) -> None:
+        for inputs, future in batch:
+            try:
+                future.set_result(self.classify_one(inputs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "fallbacks": self.fallbacks,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0
+            }
@@ -0,0 +1,174 @@
+"""Token-aware packing of retrieved documents into a prompt's context budget.
+
+Documents are split into sentence-aligned chunks, ordered by how many of the ticket's
+terms they cover (retrieval rank breaks ties), and near-duplicate chunks are dropped.
+Chunks are then added until the budget for the prompt is spent; the chunk that crosses
+the budget is cut back to its last whole sentence that fits.
+
+Tokens are counted with tiktoken when its encoding is available locally and estimated at
+~4 characters per token otherwise (``CONTEXT_TOKENIZER=heuristic`` forces the estimate).
+"""
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, TypedDict
+
+from src.config import settings
+from src.core.utils import estimate_tokens
+from src.services.retrieval_engine import tokenize
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class HeuristicTokenizer:
+    """~4 characters per token, the same estimate the LLM router uses for rate limiting"""
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        return estimate_tokens(text) if text else 0
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        limit = max_tokens * 4
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+        space = cut.rfind(" ")
+        return cut[:space] if space > 0 else cut
+
+
+class TiktokenTokenizer:
+    """Exact BPE token counts from a tiktoken encoding"""
+
+    def __init__(self, encoding: Any):
+        self.encoding = encoding
+        self.name = encoding.name
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+def create_tokenizer(name: Optional[str] = None):
+    """tiktoken encoding ``name``, or the heuristic when tiktoken or the encoding is unavailable"""
+    name = name or settings.CONTEXT_TOKENIZER
+    if name in (None, "", "heuristic"):
+        return HeuristicTokenizer()
+    try:
+        import tiktoken
+        return TiktokenTokenizer(tiktoken.get_encoding(name))
+    except Exception as e:
+        # Missing package, or the encoding isn't cached and can't be downloaded
+        logger.warning(f"tiktoken encoding '{name}' unavailable ({str(e)}); estimating tokens instead")
+        return HeuristicTokenizer()
+
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+def get_tokenizer():
+    """Process-wide tokenizer, loaded on first use"""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = create_tokenizer()
+    return _tokenizer
+
+
+class PackedContext(TypedDict):
+    documents: List[str]
+    tokens: Dict[str, Any]
+
+
+def context_budget(purpose: str, prompt_tokens: int) -> int:
+    """Context tokens allowed for ``purpose``, capped by what the model window has left"""
+    window = settings.MAX_CONTEXT_LENGTH - settings.CONTEXT_TOKENS_RESERVED - prompt_tokens
+    return max(0, min(settings.CONTEXT_TOKEN_BUDGETS.get(purpose, window), window))
+
+
+def _split_chunks(document: str, tokenizer: Any, chunk_tokens: int) -> List[str]:
+    """Group whole sentences into chunks of at most ``chunk_tokens`` (longer sentences stand alone)"""
+    chunks, current, size = [], [], 0
+    for sentence in _SENTENCE_RE.split(document.strip()):
+        if not sentence:
+            continue
+        cost = tokenizer.count(sentence)
+        if current and size + cost > chunk_tokens:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.append(sentence)
+        size += cost
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _shingles(terms: List[str], size: int = 3) -> Set[Tuple[str, ...]]:
+    size = min(size, len(terms)) or 1
+    return {tuple(terms[i:i + size]) for i in range(max(1, len(terms) - size + 1))}
+
+
+def _is_duplicate(shingles: Set[Tuple[str, ...]], kept: List[Set[Tuple[str, ...]]], threshold: float) -> bool:
+    # Containment rather than Jaccard, so a chunk that repeats part of a longer kept chunk
+    # (the same paragraph quoted in two articles) is caught as well as exact copies
+    return any(len(shingles & other) / len(shingles) >= threshold for other in kept if shingles)
+
+
+def _truncate_to_sentence(text: str, max_tokens: int, tokenizer: Any) -> str:
+    cut = tokenizer.truncate(text, max_tokens)
+    end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    return cut[:end + 1] if end > 0 else cut
+
+
+def pack_context(documents: Sequence[str], query: str, budget: int, tokenizer: Any = None) -> PackedContext:
+    """Fit ranked ``documents`` into ``budget`` tokens, most query-relevant chunks first"""
+    tokenizer = tokenizer or get_tokenizer()
+    query_terms = set(tokenize(query))
+
+    candidates = []
+    for rank, document in enumerate(documents):
+        for index, chunk in enumerate(_split_chunks(document, tokenizer, settings.CONTEXT_CHUNK_TOKENS)):
+            terms = tokenize(chunk)
+            coverage = len(query_terms.intersection(terms)) / len(query_terms) if query_terms else 0.0
+            candidates.append((-coverage, rank, index, chunk, terms))
+    candidates.sort(key=lambda c: c[:3])
+
+    packed, kept_shingles = [], []
+    used = deduplicated = truncated = dropped = 0
+    for _, _, _, chunk, terms in candidates:
+        shingles = _shingles(terms)
+        if _is_duplicate(shingles, kept_shingles, settings.CONTEXT_DEDUP_THRESHOLD):
+            deduplicated += 1
+            continue
+        cost = tokenizer.count(chunk)
+        remaining = budget - used
+        if cost > remaining:
+            if remaining < settings.CONTEXT_MIN_CHUNK_TOKENS:
+                dropped += 1
+                continue
+            chunk = _truncate_to_sentence(chunk, remaining, tokenizer)
+            cost = tokenizer.count(chunk)
+            truncated += 1
+        packed.append(chunk)
+        kept_shingles.append(shingles)
+        used += cost
+
+    return {
+        "documents": packed,
+        "tokens": {
+            "context": tokenizer.count("\n".join(packed)),
+            "budget": budget,
+            "chunks": len(packed),
+            "deduplicated": deduplicated,
+            "truncated": truncated,
+            "dropped": dropped,
+            "tokenizer": tokenizer.name
+        }
+    }
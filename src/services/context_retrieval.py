@@ -1,9 +1,17 @@
-from typing import List
-from src.core.schemas import Context
+import threading
+from typing import Optional
+from src.core.schemas import Context, TicketAnalysis
 from src.config import settings
+from src.services.retrieval_engine import (
+    RetrievalEngine,
+    BM25Engine,
+    VectorEngine,
+    documents_from_mapping,
+    load_documents
+)
 import json
 
-# Mock knowledge base - replace with actual RAG implementation
+# Built-in knowledge base used when no KNOWLEDGE_BASE_PATH / vector index is configured
 _KNOWLEDGE_BASE = {
     "Billing": [
         "Refunds take 5-7 business days",
@@ -27,14 +35,39 @@ _KNOWLEDGE_BASE = {
     ]
 }
 
-def retrieve_context(category: str, query: str) -> Context:
-    """Retrieve relevant context for ticket category."""
-    # In production: 
-    # 1. Embed query
-    # 2. Query vector store
-    # 3. Return top N results
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> RetrievalEngine:
+    """Load the configured retrieval engine once per process"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if settings.RETRIEVAL_ENGINE == "vector":
+                    _engine = VectorEngine.load(settings.RETRIEVAL_INDEX_PATH)
+                elif settings.KNOWLEDGE_BASE_PATH:
+                    _engine = BM25Engine(load_documents(settings.KNOWLEDGE_BASE_PATH))
+                else:
+                    _engine = BM25Engine(documents_from_mapping(_KNOWLEDGE_BASE))
+    return _engine
+
+def retrieve_context(category: str, query: str, analysis: Optional[TicketAnalysis] = None,
+                     top_k: Optional[int] = None) -> Context:
+    """Retrieve the top-ranked documents for the query within the ticket category.
+
+    With the ticket's ``analysis`` its precomputed query embedding is reused when the
+    query is the ticket text. ``top_k`` defaults to ``RETRIEVAL_TOP_K``.
+    """
+    engine = get_engine()
+    top_k = top_k or settings.RETRIEVAL_TOP_K
+    embedding = analysis.get("embedding") if analysis and query == analysis["text"] else None
+    documents = engine.search(query, category, top_k, embedding=embedding)
+    if not documents:
+        # No lexical/semantic match: fall back to the category's leading articles
+        documents = engine.category_documents(category)[:top_k]
     
     return {
         "category": category,
-        "documents": _KNOWLEDGE_BASE.get(category, ["No relevant documentation found"])
-    }
\ No newline at end of file
+        "documents": documents or ["No relevant documentation found"]
+    }
@@ -1,31 +1,216 @@
 from langchain_core.prompts import ChatPromptTemplate
-from src.core.schemas import Ticket, Context, Draft
+from typing import Callable, List, Optional
+from src.config import settings
+from src.core.schemas import Ticket, Context, Draft, Review
 from src.core.llm_service import llm_service
+from src.services.context_packer import PackedContext, context_budget, get_tokenizer, pack_context
+from src.services.review import policy_engine
 
-def generate_draft(ticket: Ticket, context: Context) -> Draft:
-    """Generate support response draft."""
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a support agent. Draft a response using:
-        
-        Context:
-        {context}
-
-        Guidelines:
-        - Be professional and empathetic
-        - Only use verified information
-        - Never promise unavailable solutions
-        - Keep responses under 300 words"""),
-        ("human", "Ticket Subject: {subject}\nDescription: {description}")
-    ])
+# Receives streamed draft text once it has passed the incremental policy check
+TokenCallback = Callable[[str], None]
+
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a support agent. Draft a response using:
     
-    chain = prompt | llm_service.get_llm("draft")
-    response = chain.invoke({
-        "context": "\n".join(context["documents"]),
+    Context:
+    {context}
+
+    Guidelines:
+    - Be professional and empathetic
+    - Only use verified information
+    - Never promise unavailable solutions
+    - Keep responses under 300 words"""),
+    ("human", "Ticket Subject: {subject}\nDescription: {description}")
+])
+
+_REVISION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a support agent revising a draft that was rejected in review.
+    
+    Context:
+    {context}
+
+    Previous draft:
+    {previous_draft}
+
+    Reviewer feedback:
+    {feedback}
+
+    Policy violations to fix:
+    {violations}
+
+    Guidelines:
+    - Rewrite the full response so it resolves every issue above
+    - Keep what was already correct in the previous draft
+    - Be professional and empathetic
+    - Only use verified information
+    - Never promise unavailable solutions
+    - Keep responses under 300 words"""),
+    ("human", "Ticket Subject: {subject}\nDescription: {description}")
+])
+
+def _pack(prompt: ChatPromptTemplate, purpose: str, ticket: Ticket, context: Context,
+          inputs: dict) -> PackedContext:
+    """Pack retrieved documents into what the budget for ``purpose`` leaves after the rest of the prompt"""
+    tokenizer = get_tokenizer()
+    messages = prompt.format_messages(**inputs, context="")
+    prompt_tokens = sum(tokenizer.count(str(m.content)) for m in messages)
+    query = f"{ticket['subject']} {ticket['description']}"
+    packed = pack_context(context["documents"], query, context_budget(purpose, prompt_tokens), tokenizer)
+    packed["tokens"]["prompt"] = prompt_tokens + packed["tokens"]["context"]
+    return packed
+
+def _draft_llm(temperature: Optional[float] = None):
+    llm = llm_service.get_llm("draft")
+    return llm if temperature is None else llm.bind(temperature=temperature)
+
+def _select_prompt(ticket: Ticket, context: Context, previous_draft: Optional[Draft],
+                   review: Optional[Review]):
+    """Use the revision prompt when retrying with reviewer feedback, else the fresh-draft prompt"""
+    inputs = {
         "subject": ticket["subject"],
         "description": ticket["description"]
-    }).content
+    }
+    if previous_draft is None or review is None:
+        prompt, purpose = _PROMPT, "draft"
+    else:
+        violations = review.get("violations") or []
+        inputs.update({
+            "previous_draft": previous_draft["content"],
+            "feedback": review.get("feedback") or "No feedback provided",
+            "violations": "\n".join(f"- {v}" for v in violations) or "- None listed"
+        })
+        prompt, purpose = _REVISION_PROMPT, "revision"
+
+    packed = _pack(prompt, purpose, ticket, context, inputs)
+    inputs["context"] = "\n".join(packed["documents"])
+    return prompt, inputs, packed
+
+def generate_draft(ticket: Ticket, context: Context, previous_draft: Optional[Draft] = None,
+                   review: Optional[Review] = None) -> Draft:
+    """Generate support response draft, revising the previous draft when review feedback is given."""
+    prompt, inputs, packed = _select_prompt(ticket, context, previous_draft, review)
+    chain = prompt | llm_service.get_llm("draft")
+    response = chain.invoke(inputs).content
+    
+    return {
+        "content": response,
+        "context_used": packed["documents"],
+        "tokens": packed["tokens"]
+    }
+
+async def agenerate_draft(ticket: Ticket, context: Context, previous_draft: Optional[Draft] = None,
+                         review: Optional[Review] = None) -> Draft:
+    """Async variant of generate_draft built on chain.ainvoke"""
+    prompt, inputs, packed = _select_prompt(ticket, context, previous_draft, review)
+    chain = prompt | llm_service.get_llm("draft")
+    response = (await chain.ainvoke(inputs)).content
     
     return {
         "content": response,
-        "context_used": context["documents"]
-    }
\ No newline at end of file
+        "context_used": packed["documents"],
+        "tokens": packed["tokens"]
+    }
+
+
+def _last_boundary(text: str) -> int:
+    """Index just past the last sentence or line end in ``text`` (0 when there is none)"""
+    ends = [text.rfind(mark) for mark in (". ", "! ", "? ", "\n")]
+    end = max(ends)
+    return end + 1 if end >= 0 else 0
+
+class _PolicyGuard:
+    """Policy-checks a streamed draft at sentence ends and releases only text that passed"""
+
+    def __init__(self, category: str, on_token: Optional[TokenCallback]):
+        self.category = category
+        self.on_token = on_token
+        self.text = ""
+        self.checked = 0
+        self.released = 0
+        self.violations: List[str] = []
+
+    def feed(self, piece: str) -> bool:
+        """Add streamed text; False once a certain violation is found"""
+        self.text += piece
+        if "\n" not in piece and not any(mark in piece for mark in ".!?") \
+                and len(self.text) - self.checked < settings.DRAFT_STREAM_CHECK_CHARS:
+            return True
+        # Only finished sentences: "I will send you the refund" matches until "policy" arrives
+        self.checked = len(self.text)
+        return self._check(_last_boundary(self.text))
+
+    def finish(self) -> bool:
+        return self._check(len(self.text))
+
+    def _check(self, end: int) -> bool:
+        """Check and release the text up to ``end``"""
+        if end <= self.released:
+            return True
+        self.violations = policy_engine.check_draft(self.category, self.text[:end])
+        if self.violations:
+            return False
+        if self.on_token:
+            self.on_token(self.text[self.released:end])
+        self.released = end
+        return True
+
+    def draft(self, packed: PackedContext) -> Draft:
+        result = {
+            "content": self.text,
+            "context_used": packed["documents"],
+            "tokens": packed["tokens"]
+        }
+        if self.violations:
+            result.update({"aborted": True, "violations": self.violations})
+        return result
+
+def draft_prompt_tokens(ticket: Ticket, context: Context, previous_draft: Optional[Draft] = None,
+                        review: Optional[Review] = None) -> int:
+    """Tokens of the packed prompt a draft call for these inputs would send"""
+    return _select_prompt(ticket, context, previous_draft, review)[2]["tokens"]["prompt"]
+
+def stream_draft(ticket: Ticket, context: Context, previous_draft: Optional[Draft] = None,
+                 review: Optional[Review] = None, category: str = "General",
+                 on_token: Optional[TokenCallback] = None, temperature: Optional[float] = None,
+                 should_stop: Optional[Callable[[], bool]] = None) -> Draft:
+    """Streaming variant of generate_draft that stops the generation on a certain policy violation.
+
+    An aborted draft carries ``aborted`` and the matched ``violations`` so the review can
+    reject it without an LLM call. ``should_stop`` is polled between chunks so a caller
+    can cancel the generation from another thread; the partial draft is returned as is.
+    """
+    prompt, inputs, packed = _select_prompt(ticket, context, previous_draft, review)
+    chain = prompt | _draft_llm(temperature)
+    guard = _PolicyGuard(category, on_token)
+    stream = chain.stream(inputs)
+    try:
+        for chunk in stream:
+            if should_stop is not None and should_stop():
+                break
+            if not guard.feed(str(chunk.content)):
+                break
+        else:
+            guard.finish()
+    finally:
+        # Closing the stream drops the provider connection, ending generation early
+        stream.close()
+    return guard.draft(packed)
+
+async def astream_draft(ticket: Ticket, context: Context, previous_draft: Optional[Draft] = None,
+                        review: Optional[Review] = None, category: str = "General",
+                        on_token: Optional[TokenCallback] = None,
+                        temperature: Optional[float] = None) -> Draft:
+    """Async variant of stream_draft built on chain.astream; cancel the task to stop it"""
+    prompt, inputs, packed = _select_prompt(ticket, context, previous_draft, review)
+    chain = prompt | _draft_llm(temperature)
+    guard = _PolicyGuard(category, on_token)
+    stream = chain.astream(inputs)
+    try:
+        async for chunk in stream:
+            if not guard.feed(str(chunk.content)):
+                break
+        else:
+            guard.finish()
+    finally:
+        await stream.aclose()
+    return guard.draft(packed)
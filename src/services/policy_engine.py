@@ -0,0 +1,136 @@
+"""Deterministic policy pre-check that runs before the LLM reviewer.
+
+Rules from ``POLICY_RULES`` and ``Settings.POLICY_ESCALATION_TRIGGERS`` that can be
+detected with phrase matching are compiled once into regex matchers. A match is a
+certain violation, so the review can reject (or escalate) without an LLM call. A match
+in a negated clause ("we cannot guarantee this will fix it") is ambiguous:
+like no match at all, it is inconclusive and the LLM review still runs.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+from src.core.schemas import Ticket
+
+Target = Literal["draft", "ticket"]
+
+# "refund" as the thing promised, not "refund policy", "refund status" or "refund request"
+_REFUND = r"(a\s+|your\s+|the\s+)?(full\s+)?refund\b(?!s?\s+(policy|policies|status|requests?|forms?|process))"
+
+# A secret-looking value: quoted, or a token of 6+ characters with a digit or symbol in it
+_SECRET = r"(\"[^\"\s]{4,}\"|'[^'\s]{4,}'|`[^`\s]{4,}`|(?=[^\s.,;]*[\d@#$%^&*!_])[^\s.,;]{6,})"
+
+# Phrase matchers for the rules that pattern matching can decide with certainty.
+# "draft" matchers inspect the response text, "ticket" matchers the customer's message.
+RULE_PATTERNS: Dict[str, Dict[Target, List[str]]] = {
+    "Do not promise refunds": {"draft": [
+        r"\b(we|i)\s*('ll|will|shall|are going to)\s+(refund\b(?!s?\s+(policy|status|request))|"
+        r"(issue|process|give|send|provide)\s+(you\s+)?" + _REFUND + r")",
+        r"\byou\s*('ll|will)\s+(receive|get|be issued)\s+" + _REFUND,
+        r"\b(your\s+)?refund\s+(has been|is being)\s+(issued|approved|guaranteed)",
+    ]},
+    "Do not modify payment terms": {"draft": [
+        r"\b(we|i)\s*('ll|will|have|can|'ve)\s+(waive|waived|extend|extended|change|modify|defer)\w*\s+"
+        r"(your\s+|the\s+)?(payment|due date|billing terms|late fee|fees)",
+    ]},
+    "Do not share credentials": {"draft": [
+        r"\b(your|the)\s+(temporary\s+|new\s+|current\s+)?password\s*(is|:)\s*" + _SECRET,
+        r"\b(api[_ ]?key|secret|access token)\s*(is|:)\s*[A-Za-z0-9_\-]{8,}",
+    ]},
+    "Do not guarantee fixes": {"draft": [
+        r"\bguarantee[sd]?\b[^.]{0,40}\b(fix|resolve|work)",
+        r"\bwill\s+(definitely|certainly|100%)\s+(fix|resolve|work)",
+        r"\b100%\s+(fixed|guaranteed)",
+    ]},
+    "Escalate account breaches": {"ticket": [
+        r"\b(hacked|breach(ed)?|compromised)\b",
+        r"\bunauthori[sz]ed\s+(access|login|sign[- ]?in)",
+    ]},
+    "Escalate legal inquiries": {"ticket": [
+        r"\b(lawyer|attorney|lawsuit|legal action|subpoena|litigation)\b",
+        r"\b(i|we)\s*('ll|will)\s+sue\b",
+    ]},
+}
+
+# Negation earlier in the clause makes a match ambiguous
+_NEGATION_RE = re.compile(
+    r"\b(not|no|never|cannot|can\s?not|unable|without|nor)\b|n't\b",
+    re.IGNORECASE
+)
+_CLAUSE_BREAK_RE = re.compile(r"[.!?;:\n]|,\s*(but|however)\b|\bbut\b", re.IGNORECASE)
+
+
+def _clause_before(text: str, start: int) -> str:
+    """The text from the last clause break up to ``start``"""
+    breaks = [m.end() for m in _CLAUSE_BREAK_RE.finditer(text, 0, start)]
+    return text[breaks[-1] if breaks else 0:start]
+
+
+@dataclass
+class PolicyVerdict:
+    violations: List[str] = field(default_factory=list)
+    escalate: bool = False
+    # Rules matched only in a negated clause; left to the LLM review
+    ambiguous: List[str] = field(default_factory=list)
+
+    @property
+    def conclusive(self) -> bool:
+        return bool(self.violations)
+
+
+class PolicyEngine:
+    """Compiled per-category matchers over POLICY_RULES plus the escalation triggers"""
+
+    def __init__(self, policy_rules: Dict[str, List[str]], escalation_triggers: Iterable[str]):
+        self.escalation_triggers = set(escalation_triggers)
+        compiled = {
+            rule: {target: [re.compile(p, re.IGNORECASE) for p in patterns]
+                   for target, patterns in targets.items()}
+            for rule, targets in RULE_PATTERNS.items()
+        }
+        # Escalation triggers apply whatever the category; other rules only in their own
+        global_rules = [rule for rule in self.escalation_triggers if rule in compiled]
+        self._rules: Dict[str, Dict[str, Dict[Target, list]]] = {}
+        for category, rules in policy_rules.items():
+            applicable = [rule for rule in rules if rule in compiled] + global_rules
+            self._rules[category] = {rule: compiled[rule] for rule in dict.fromkeys(applicable)}
+        self._default = {rule: compiled[rule] for rule in global_rules}
+
+    def _matchers(self, category: Optional[str], target: Target):
+        for rule, targets in self._rules.get(category, self._default).items():
+            patterns = targets.get(target)
+            if patterns:
+                yield rule, patterns
+
+    def _scan(self, category: Optional[str], target: Target, text: str) -> Tuple[List[str], List[str]]:
+        """(certain, ambiguous) rules matched in the text"""
+        certain, ambiguous = [], []
+        for rule, patterns in self._matchers(category, target):
+            matches = [m for p in patterns for m in p.finditer(text)]
+            if any(not _NEGATION_RE.search(_clause_before(text, m.start())) for m in matches):
+                certain.append(rule)
+            elif matches:
+                ambiguous.append(rule)
+        return certain, ambiguous
+
+    @staticmethod
+    def _ticket_text(ticket: Ticket) -> str:
+        return f"{ticket.get('subject', '')}\n{ticket.get('description', '')}"
+
+    def check_draft(self, category: Optional[str], text: str) -> List[str]:
+        """Rules the (possibly partial) draft text certainly violates"""
+        return self._scan(category, "draft", text)[0]
+
+    def check_ticket(self, category: Optional[str], ticket: Ticket) -> List[str]:
+        """Escalation rules the customer's ticket itself certainly triggers"""
+        return self._scan(category, "ticket", self._ticket_text(ticket))[0]
+
+    def evaluate(self, category: Optional[str], ticket: Ticket, draft_text: str) -> PolicyVerdict:
+        ticket_certain, ticket_ambiguous = self._scan(category, "ticket", self._ticket_text(ticket))
+        draft_certain, draft_ambiguous = self._scan(category, "draft", draft_text)
+        violations = ticket_certain + draft_certain
+        return PolicyVerdict(
+            violations=violations,
+            escalate=any(v in self.escalation_triggers for v in violations),
+            ambiguous=ticket_ambiguous + draft_ambiguous
+        )
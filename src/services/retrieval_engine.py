@@ -0,0 +1,225 @@
+"""Pluggable retrieval engines backing retrieve_context.
+
+Two engines are provided:
+
+- ``BM25Engine``: an in-memory inverted index built from the knowledge base at startup.
+- ``VectorEngine``: hashed bag-of-words embeddings stored as a NumPy matrix. The index is
+  built offline (see ``build_vector_index`` or ``python -m src.services.retrieval_engine``)
+  and memory-mapped from disk when loaded, so large knowledge bases are paged in lazily.
+"""
+import argparse
+import json
+import math
+import re
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, TypedDict
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+class KnowledgeDocument(TypedDict):
+    category: str
+    text: str
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def load_documents(path: str) -> List[KnowledgeDocument]:
+    """Load knowledge base articles from a JSONL file of {"category", "text"} records"""
+    documents = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                documents.append({"category": record["category"], "text": record["text"]})
+    return documents
+
+def documents_from_mapping(knowledge_base: Dict[str, List[str]]) -> List[KnowledgeDocument]:
+    return [
+        {"category": category, "text": text}
+        for category, texts in knowledge_base.items()
+        for text in texts
+    ]
+
+
+class RetrievalEngine(ABC):
+    """Interface every retrieval backend implements"""
+
+    @abstractmethod
+    def search(self, query: str, category: Optional[str], top_k: int,
+               embedding: Optional[Sequence[float]] = None) -> List[str]:
+        """Return up to top_k document texts ranked by relevance to the query.
+
+        ``embedding`` is the query's precomputed ``embed_query`` vector, if any.
+        """
+
+    def embed_query(self, query: str) -> Optional[List[float]]:
+        """Query vector this engine searches with, or None when it doesn't use one"""
+        return None
+
+    @abstractmethod
+    def category_documents(self, category: str) -> List[str]:
+        """Return every document in a category in index order"""
+
+
+class BM25Engine(RetrievalEngine):
+    """Okapi BM25 over an in-memory inverted index"""
+
+    def __init__(self, documents: List[KnowledgeDocument], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents = documents
+        self._postings: Dict[str, List[tuple]] = defaultdict(list)
+        self._lengths: List[int] = []
+        self._by_category: Dict[str, List[int]] = defaultdict(list)
+
+        for doc_id, doc in enumerate(documents):
+            terms = Counter(tokenize(doc["text"]))
+            self._lengths.append(sum(terms.values()))
+            self._by_category[doc["category"]].append(doc_id)
+            for term, freq in terms.items():
+                self._postings[term].append((doc_id, freq))
+
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        n_docs = len(documents)
+        self._idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def search(self, query: str, category: Optional[str], top_k: int,
+               embedding: Optional[Sequence[float]] = None) -> List[str]:
+        allowed = set(self._by_category.get(category, [])) if category else None
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, freq in self._postings[term]:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / self._avg_length)
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [self.documents[doc_id]["text"] for doc_id, _ in ranked]
+
+    def category_documents(self, category: str) -> List[str]:
+        return [self.documents[doc_id]["text"] for doc_id in self._by_category.get(category, [])]
+
+
+class HashingEmbedder:
+    """Stateless local embedder: signed feature hashing of unigrams and bigrams, L2-normalised"""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> Iterable[str]:
+        tokens = tokenize(text)
+        yield from tokens
+        yield from (f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    def embed(self, texts: List[str]):
+        np = _require_numpy()
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                matrix[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class VectorEngine(RetrievalEngine):
+    """Dense top-k retrieval with vectorised dot products over a (memory-mapped) matrix"""
+
+    def __init__(self, vectors, documents: List[KnowledgeDocument], embedder: HashingEmbedder):
+        np = _require_numpy()
+        self.vectors = vectors
+        self.documents = documents
+        self.embedder = embedder
+        rows: Dict[str, List[int]] = defaultdict(list)
+        for doc_id, doc in enumerate(documents):
+            rows[doc["category"]].append(doc_id)
+        self._rows_by_category = {cat: np.asarray(ids, dtype=np.int64) for cat, ids in rows.items()}
+
+    @classmethod
+    def load(cls, index_dir: str) -> "VectorEngine":
+        np = _require_numpy()
+        index_path = Path(index_dir)
+        meta = json.loads((index_path / "meta.json").read_text(encoding="utf-8"))
+        vectors = np.load(index_path / "vectors.npy", mmap_mode="r")
+        documents = load_documents(str(index_path / "documents.jsonl"))
+        return cls(vectors, documents, HashingEmbedder(meta["dim"]))
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.embedder.embed([query])[0].tolist()
+
+    def search(self, query: str, category: Optional[str], top_k: int,
+               embedding: Optional[Sequence[float]] = None) -> List[str]:
+        np = _require_numpy()
+        if category:
+            rows = self._rows_by_category.get(category)
+            if rows is None or not len(rows):
+                return []
+            candidates = self.vectors[rows]
+        else:
+            rows = None
+            candidates = self.vectors
+
+        vector = self.embedder.embed([query])[0] if embedding is None else np.asarray(embedding, dtype=np.float32)
+        scores = candidates @ vector
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = [i for i in top if scores[i] > 0]
+        doc_ids = rows[top] if rows is not None else top
+        return [self.documents[int(doc_id)]["text"] for doc_id in doc_ids]
+
+    def category_documents(self, category: str) -> List[str]:
+        rows = self._rows_by_category.get(category, [])
+        return [self.documents[int(doc_id)]["text"] for doc_id in rows]
+
+
+def build_vector_index(documents: List[KnowledgeDocument], index_dir: str, dim: int = 512) -> None:
+    """Embed every document and write vectors.npy, documents.jsonl and meta.json to index_dir"""
+    np = _require_numpy()
+    index_path = Path(index_dir)
+    index_path.mkdir(parents=True, exist_ok=True)
+    vectors = HashingEmbedder(dim).embed([doc["text"] for doc in documents])
+    np.save(index_path / "vectors.npy", vectors)
+    with open(index_path / "documents.jsonl", "w", encoding="utf-8") as f:
+        for doc in documents:
+            f.write(json.dumps(doc) + "\n")
+    (index_path / "meta.json").write_text(
+        json.dumps({"dim": dim, "documents": len(documents)}), encoding="utf-8"
+    )
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("The vector retrieval engine requires numpy: pip install numpy") from e
+    return numpy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline vector retrieval index")
+    parser.add_argument('--source', required=True, help='JSONL file of {"category", "text"} articles')
+    parser.add_argument('--out', required=True, help='Output index directory')
+    parser.add_argument('--dim', type=int, default=512, help='Embedding dimension')
+    args = parser.parse_args()
+
+    documents = load_documents(args.source)
+    build_vector_index(documents, args.out, args.dim)
+    print(f"✅ Indexed {len(documents)} documents into {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,20 @@
 from langchain_core.prompts import ChatPromptTemplate
+from typing import Optional
+from src.config import settings
 from src.core.schemas import Ticket, Draft, Review
 from src.core.llm_service import llm_service
-from src.core.utils import validate_json_output
-import json
+from src.core.llm_router import is_retryable
+from src.services.policy_engine import PolicyEngine
+from src.services.review_output import (
+    aresolve_review,
+    areview_from_structured,
+    resolve_review,
+    review_from_structured,
+    structured_review_llm
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 POLICY_RULES = {
     "Billing": [
@@ -27,67 +39,125 @@ POLICY_RULES = {
     ]
 }
 
-def review_draft(ticket: Ticket, draft: Draft) -> Review:
+policy_engine = PolicyEngine(POLICY_RULES, settings.POLICY_ESCALATION_TRIGGERS)
+
+_PROMPT_TEMPLATE = """[INSTRUCTIONS]
+As a support policy enforcer, evaluate this response against {category} policies:
+{policy_rules}
+
+[TICKET]
+Subject: {subject}
+Description: {description}
+
+[DRAFT RESPONSE]
+{draft_content}
+
+[REQUIREMENTS]
+1. Check for policy violations
+2. Assess professionalism
+3. Verify context usage
+
+Return JSON with:
+- approved: boolean
+- feedback: string (if rejected)
+- violations: list (if any)
+
+[EXAMPLE RESPONSE]
+{{
+    "approved": false,
+    "feedback": "Violates policy rule 1",
+    "violations": ["Do not promise refunds"]
+}}"""
+
+_PROMPT = ChatPromptTemplate.from_template(_PROMPT_TEMPLATE)
+
+def _prompt_inputs(ticket: Ticket, draft: Draft, category: str) -> dict:
+    return {
+        "category": category,
+        "policy_rules": "\n- ".join(POLICY_RULES.get(category, [])),
+        "subject": ticket["subject"],
+        "description": ticket["description"],
+        "draft_content": draft["content"]
+    }
+
+def _system_failure(e: Exception) -> Review:
+    return {
+        "approved": False,
+        "feedback": f"Review system error: {str(e)}",
+        "violations": ["System failure"]
+    }
+
+def _resolve_category(ticket: Ticket, category: Optional[str]) -> str:
+    return category or ticket.get("classification", {}).get("category", "General")
+
+def _local_precheck(ticket: Ticket, draft: Draft, category: str) -> Optional[Review]:
+    """Reject without an LLM call when the local policy engine finds a certain violation"""
+    if draft.get("aborted"):
+        # Streamed draft already stopped on a policy match
+        return {
+            "approved": False,
+            "feedback": f"Draft stopped early by policy check: {'; '.join(draft['violations'])}",
+            "violations": draft["violations"]
+        }
+    if not settings.POLICY_PRECHECK_ENABLED:
+        return None
+    verdict = policy_engine.evaluate(category, ticket, draft["content"])
+    if not verdict.conclusive:
+        return None
+    return {
+        "approved": False,
+        "feedback": f"Local policy check failed: {'; '.join(verdict.violations)}",
+        "violations": verdict.violations
+    }
+
+def review_draft(ticket: Ticket, draft: Draft, category: Optional[str] = None) -> Review:
     """Strict policy-compliant review with category-specific rules"""
-    category = ticket.get("classification", {}).get("category", "General")
-    
-    prompt_template = """[INSTRUCTIONS]
-    As a support policy enforcer, evaluate this response against {category} policies:
-    {policy_rules}
-    
-    [TICKET]
-    Subject: {subject}
-    Description: {description}
-    
-    [DRAFT RESPONSE]
-    {draft_content}
-    
-    [REQUIREMENTS]
-    1. Check for policy violations
-    2. Assess professionalism
-    3. Verify context usage
-    
-    Return JSON with:
-    - approved: boolean
-    - feedback: string (if rejected)
-    - violations: list (if any)
-    
-    [EXAMPLE RESPONSE]
-    {{
-        "approved": false,
-        "feedback": "Violates policy rule 1",
-        "violations": ["Do not promise refunds"]
-    }}"""
+    category = _resolve_category(ticket, category)
+    local_review = _local_precheck(ticket, draft, category)
+    if local_review is not None:
+        return local_review
+    inputs = _prompt_inputs(ticket, draft, category)
+    structured = structured_review_llm()
+    chain = _PROMPT | llm_service.get_llm("review")
     
-    prompt = ChatPromptTemplate.from_template(prompt_template)
-    chain = prompt | llm_service.get_llm("review")
+    try:
+        if structured is not None:
+            try:
+                return review_from_structured((_PROMPT | structured).invoke(inputs))
+            except Exception as e:
+                if is_retryable(e):
+                    raise
+                logger.warning(f"Structured review failed ({str(e)}); retrying as plain text")
+        result = chain.invoke(inputs).content
+        return resolve_review(str(result))
+    except Exception as e:
+        if is_retryable(e):
+            # Provider outage: let the caller retry or resume rather than reject the draft
+            raise
+        return _system_failure(e)
+
+async def areview_draft(ticket: Ticket, draft: Draft, category: Optional[str] = None) -> Review:
+    """Async variant of review_draft built on chain.ainvoke"""
+    category = _resolve_category(ticket, category)
+    local_review = _local_precheck(ticket, draft, category)
+    if local_review is not None:
+        return local_review
+    inputs = _prompt_inputs(ticket, draft, category)
+    structured = structured_review_llm()
+    chain = _PROMPT | llm_service.get_llm("review")
     
     try:
-        result = chain.invoke({
-            "category": category,
-            "policy_rules": "\n- ".join(POLICY_RULES.get(category, [])),
-            "subject": ticket["subject"],
-            "description": ticket["description"],
-            "draft_content": draft["content"]
-        }).content
-        
-        # Extract JSON from response
-        json_str = result[result.find("{"):result.rfind("}")+1]
-        review = json.loads(json_str)
-        
-        # Auto-reject if any violations found
-        if review.get("violations"):
-            review["approved"] = False
-            
-        return {
-            "approved": review.get("approved", False),
-            "feedback": review.get("feedback", "Policy check completed"),
-            "violations": review.get("violations", [])
-        }
-        
+        if structured is not None:
+            try:
+                return await areview_from_structured(await (_PROMPT | structured).ainvoke(inputs))
+            except Exception as e:
+                if is_retryable(e):
+                    raise
+                logger.warning(f"Structured review failed ({str(e)}); retrying as plain text")
+        result = (await chain.ainvoke(inputs)).content
+        return await aresolve_review(str(result))
     except Exception as e:
-        return {
-            "approved": False,
-            "feedback": f"Review system error: {str(e)}",
-            "violations": ["System failure"]
-        }
\ No newline at end of file
+        if is_retryable(e):
+            # Provider outage: let the caller retry or resume rather than reject the draft
+            raise
+        return _system_failure(e)
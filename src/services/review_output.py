@@ -0,0 +1,217 @@
+"""Turning review-model output into a validated ``Review``.
+
+A review used to be rejected with a "System failure" violation whenever its JSON could not
+be parsed. That cost a full redraft and re-review, or an escalation, over nothing but
+formatting. The review output is now resolved in up to three steps, stopping at the first
+that succeeds:
+
+1. Structured output: providers that support tool calling return the review as
+   arguments for ``REVIEW_SCHEMA``. Routes without tool calling are dropped from the
+   structured chain. When no route supports it, the plain-text prompt is used.
+2. Tolerant parsing: the first JSON object in the text, found with an incremental decoder
+   that allows markdown fences, surrounding prose, trailing commas and Python literals. It
+   is then validated against the schema.
+3. One repair call (``REVIEW_OUTPUT_REPAIR``): a short prompt holding only the broken output
+   asks for the same verdict as bare JSON. It does not include the ticket or draft, and
+   does not review again.
+
+Output that survives none of them is rejected with an "Unparseable review" violation.
+``review_parse_stats()`` counts how each review was resolved.
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.config import settings
+from src.core.llm_service import llm_service
+from src.core.schemas import Review
+from src.core.utils import validate_json_output
+
+logger = logging.getLogger(__name__)
+
+REVIEW_KEYS = ["approved", "feedback", "violations"]
+
+REVIEW_SCHEMA = {
+    "title": "policy_review",
+    "description": "Verdict on a support response draft",
+    "type": "object",
+    "properties": {
+        "approved": {"type": "boolean", "description": "True if the draft can be sent as is"},
+        "feedback": {"type": "string", "description": "What to fix, if rejected"},
+        "violations": {"type": "array", "items": {"type": "string"},
+                       "description": "Policy rules the draft breaks"}
+    },
+    "required": ["approved"]
+}
+
+_REPAIR_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Rewrite the reviewer output below as ONLY a JSON object with keys:
+    - approved: boolean
+    - feedback: string
+    - violations: list of strings
+    Keep the reviewer's verdict exactly; do not review anything yourself."""),
+    ("human", "{output}")
+])
+
+_BOOLEAN_STRINGS = {"true": True, "yes": True, "false": False, "no": False}
+
+
+class ReviewParseStats:
+    """How review outputs were resolved: structured, parsed, repaired or failed"""
+
+    OUTCOMES = ("structured", "parsed", "repaired", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.OUTCOMES, 0)
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+_stats = ReviewParseStats()
+
+def review_parse_stats() -> Dict[str, int]:
+    return _stats.snapshot()
+
+
+def validate_review(data: Dict[str, Any]) -> Review:
+    """Check review fields against the schema, coercing harmless variations"""
+    approved = data.get("approved")
+    if isinstance(approved, str):
+        approved = _BOOLEAN_STRINGS.get(approved.strip().lower(), approved)
+    if not isinstance(approved, bool):
+        raise ValueError(f"'approved' must be a boolean, got {approved!r}")
+    violations = data.get("violations") or []
+    if isinstance(violations, str):
+        violations = [violations]
+    if not isinstance(violations, list):
+        raise ValueError(f"'violations' must be a list, got {type(violations).__name__}")
+    violations = [str(v).strip() for v in violations if str(v).strip()]
+    feedback = data.get("feedback")
+
+    return {
+        # Auto-reject if any violations found
+        "approved": approved and not violations,
+        "feedback": str(feedback) if feedback else "Policy check completed",
+        "violations": violations
+    }
+
+def parse_review(output: str) -> Review:
+    """Validated review from raw model text; raises ValueError when it cannot be read"""
+    return validate_review(validate_json_output(output, REVIEW_KEYS, required=["approved"]))
+
+def unparseable_review(error: Exception) -> Review:
+    return {
+        "approved": False,
+        "feedback": f"Review output could not be parsed: {str(error)}",
+        "violations": ["Unparseable review"]
+    }
+
+
+_structured_lock = threading.Lock()
+_structured = (None, None)  # (review model, its structured-output runnable or None)
+
+def structured_review_llm():
+    """The review model bound to REVIEW_SCHEMA via tool calling, or None where unsupported"""
+    global _structured
+    if not settings.REVIEW_STRUCTURED_OUTPUT:
+        return None
+    llm = llm_service.get_llm("review")
+    with _structured_lock:
+        if _structured[0] is not llm:
+            try:
+                runnable = llm.with_structured_output(REVIEW_SCHEMA, include_raw=True)
+            except NotImplementedError:
+                runnable = None
+            _structured = (llm, runnable)
+        return _structured[1]
+
+
+def _raw_text(result: Dict[str, Any]) -> str:
+    """The text to fall back on when the structured parser failed: content or tool arguments"""
+    raw = result.get("raw")
+    parts = [str(getattr(raw, "content", "") or "")]
+    parts += [str(call.get("args") or "") for call in getattr(raw, "invalid_tool_calls", None) or []]
+    if result.get("parsed") is not None:
+        parts.append(json.dumps(result["parsed"], default=str))
+    return "\n".join(p for p in parts if p)
+
+def _first_pass(output: str, outcome: str):
+    try:
+        review = parse_review(output)
+    except ValueError as e:
+        return None, e
+    _stats.record(outcome)
+    return review, None
+
+def _repaired(output: str, error: ValueError, repair: Optional[str]) -> Review:
+    if repair is not None:
+        try:
+            review = parse_review(repair)
+            _stats.record("repaired")
+            return review
+        except ValueError as e:
+            error = e
+    _stats.record("failed")
+    logger.warning(f"Unparseable review output ({str(error)}): {output[:200]!r}")
+    return unparseable_review(error)
+
+def _repair_inputs(output: str) -> Dict[str, str]:
+    return {"output": output[:settings.REVIEW_REPAIR_MAX_CHARS]}
+
+def resolve_review(output: str, structured: bool = False) -> Review:
+    """Parse review text, repairing it once with the LLM if needed"""
+    review, error = _first_pass(output, "structured" if structured else "parsed")
+    if review is not None:
+        return review
+    repair = None
+    if settings.REVIEW_OUTPUT_REPAIR:
+        try:
+            chain = _REPAIR_PROMPT | llm_service.get_llm("review")
+            repair = str(chain.invoke(_repair_inputs(output)).content)
+        except Exception as e:
+            logger.warning(f"Review repair call failed: {str(e)}")
+    return _repaired(output, error, repair)
+
+async def aresolve_review(output: str, structured: bool = False) -> Review:
+    """Async variant of resolve_review"""
+    review, error = _first_pass(output, "structured" if structured else "parsed")
+    if review is not None:
+        return review
+    repair = None
+    if settings.REVIEW_OUTPUT_REPAIR:
+        try:
+            chain = _REPAIR_PROMPT | llm_service.get_llm("review")
+            repair = str((await chain.ainvoke(_repair_inputs(output))).content)
+        except Exception as e:
+            logger.warning(f"Review repair call failed: {str(e)}")
+    return _repaired(output, error, repair)
+
+def _structured_review(result: Dict[str, Any]) -> Optional[Review]:
+    parsed = result.get("parsed")
+    if isinstance(parsed, dict):
+        try:
+            review = validate_review(parsed)
+        except ValueError:
+            return None
+        _stats.record("structured")
+        return review
+    return None
+
+def review_from_structured(result: Dict[str, Any]) -> Review:
+    """Review from a structured-output result ({"raw", "parsed", "parsing_error"})"""
+    review = _structured_review(result)
+    return review if review is not None else resolve_review(_raw_text(result), structured=True)
+
+async def areview_from_structured(result: Dict[str, Any]) -> Review:
+    review = _structured_review(result)
+    return review if review is not None else await aresolve_review(_raw_text(result), structured=True)
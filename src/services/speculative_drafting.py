@@ -0,0 +1,199 @@
+"""Speculative drafting: several candidate drafts per attempt, drafted and reviewed concurrently.
+
+A ticket that needs two retries takes roughly three sequential draft + review rounds.
+Here each round drafts ``K`` candidates at once instead. Candidate 0 is the regular
+draft. The others vary the sampling temperature (``SPECULATIVE_TEMPERATURES``) and
+leave one retrieved document out, so they tend to fail review for different reasons.
+Each candidate is reviewed as soon as it is drafted. The first approved one wins, and
+the others are cancelled: streamed generations stop at their next chunk, and queued
+candidates never start.
+
+``K`` (``SPECULATIVE_CANDIDATES``) and the total draft-prompt tokens a round may spend
+(``SPECULATIVE_TOKEN_BUDGETS``) are set per category. The first candidate always runs.
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+
+from src.config import settings
+from src.core.instrumentation import record_error
+from src.core.llm_router import is_retryable
+from src.core.schemas import Context, Draft, Review, Ticket
+from src.services.draft_generation import astream_draft, draft_prompt_tokens, stream_draft
+from src.services.review import areview_draft, review_draft
+
+logger = logging.getLogger(__name__)
+
+# (temperature or None for the configured one, context) per candidate
+Variant = Tuple[Optional[float], Context]
+
+
+class SpeculativeResult(TypedDict):
+    draft: Draft
+    review: Review
+    # candidates launched, winner index (None when all were rejected), cancelled, prompt tokens
+    stats: Dict[str, Any]
+
+
+def _per_category(limits: Dict[str, Any], category: str):
+    return limits.get(category, limits["General"])
+
+
+def _variants(context: Context, count: int) -> List[Variant]:
+    documents = context["documents"]
+    temperatures = settings.SPECULATIVE_TEMPERATURES
+    variants: List[Variant] = [(None, context)]
+    for i in range(1, count):
+        subset = documents
+        if len(documents) > 1:
+            left_out = (i - 1) % len(documents)
+            subset = documents[:left_out] + documents[left_out + 1:]
+        variants.append((temperatures[(i - 1) % len(temperatures)], {**context, "documents": subset}))
+    return variants
+
+
+def plan_candidates(ticket: Ticket, context: Context, category: str,
+                    previous_draft: Optional[Draft] = None, review: Optional[Review] = None) -> Tuple[List[Variant], int]:
+    """Candidates that fit the category's K and token budget, and their draft-prompt tokens"""
+    budget = _per_category(settings.SPECULATIVE_TOKEN_BUDGETS, category)
+    planned: List[Variant] = []
+    spent = 0
+    for variant in _variants(context, max(1, _per_category(settings.SPECULATIVE_CANDIDATES, category))):
+        tokens = draft_prompt_tokens(ticket, variant[1], previous_draft, review)
+        if planned and spent + tokens > budget:
+            break
+        planned.append(variant)
+        spent += tokens
+    return planned, spent
+
+
+def _pick_rejected(results: List[Tuple[int, Draft, Review]]) -> Tuple[int, Draft, Review]:
+    """With every candidate rejected, keep one that must escalate, else the regular draft's"""
+    results = sorted(results, key=lambda r: r[0])
+    for result in results:
+        if any(v in settings.POLICY_ESCALATION_TRIGGERS for v in result[2].get("violations", [])):
+            return result
+    return results[0]
+
+
+def _outcome(results: List[Tuple[int, Draft, Review]], launched: int, cancelled: int,
+             tokens: int) -> SpeculativeResult:
+    approved = [r for r in results if r[2]["approved"]]
+    index, draft, review = approved[0] if approved else _pick_rejected(results)
+    return {
+        "draft": draft,
+        "review": review,
+        "stats": {
+            "candidates": launched,
+            "winner": index if approved else None,
+            "cancelled": cancelled,
+            "prompt_tokens": tokens
+        }
+    }
+
+
+def _run_candidate(ticket: Ticket, context: Context, category: str, temperature: Optional[float],
+                   previous_draft: Optional[Draft], review: Optional[Review],
+                   stop: threading.Event) -> Optional[Tuple[Draft, Review]]:
+    draft = stream_draft(ticket, context, previous_draft, review, category=category,
+                         temperature=temperature, should_stop=stop.is_set)
+    if stop.is_set():
+        return None
+    return draft, review_draft(ticket, draft, category)
+
+
+def speculative_draft(ticket: Ticket, context: Context, category: str = "General",
+                      previous_draft: Optional[Draft] = None, review: Optional[Review] = None) -> SpeculativeResult:
+    """Draft and review candidates on threads; the first approved one wins"""
+    variants, tokens = plan_candidates(ticket, context, category, previous_draft, review)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(variants), thread_name_prefix="speculative-draft")
+    futures = {
+        # Each candidate runs in a copy of this context so its LLM calls count against the draft node
+        executor.submit(contextvars.copy_context().run, _run_candidate, ticket, variant_context, category,
+                        temperature, previous_draft, review, stop): index
+        for index, (temperature, variant_context) in enumerate(variants)
+    }
+    results: List[Tuple[int, Draft, Review]] = []
+    last_error: Optional[Exception] = None
+    retryable_error: Optional[Exception] = None
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Speculative draft {futures[future]} failed: {str(e)}")
+                    record_error(e)
+                    last_error = e
+                    if retryable_error is None and is_retryable(e):
+                        retryable_error = e
+                    continue
+                if result is not None:
+                    results.append((futures[future], *result))
+                    if result[1]["approved"]:
+                        return _outcome(results, len(variants), len(pending), tokens)
+    finally:
+        # Running candidates stop at their next streamed chunk; queued ones never start
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    # No candidate was approved: a rejected draft must not mask a transient failure
+    # the caller's retry policy would have retried
+    if retryable_error is not None:
+        raise retryable_error
+    if not results:
+        raise last_error
+    return _outcome(results, len(variants), 0, tokens)
+
+
+async def _arun_candidate(ticket: Ticket, context: Context, category: str, temperature: Optional[float],
+                          previous_draft: Optional[Draft], review: Optional[Review]) -> Tuple[Draft, Review]:
+    draft = await astream_draft(ticket, context, previous_draft, review, category=category, temperature=temperature)
+    return draft, await areview_draft(ticket, draft, category)
+
+
+async def aspeculative_draft(ticket: Ticket, context: Context, category: str = "General",
+                             previous_draft: Optional[Draft] = None,
+                             review: Optional[Review] = None) -> SpeculativeResult:
+    """Async variant of speculative_draft; losing candidates are cancelled as tasks"""
+    variants, tokens = plan_candidates(ticket, context, category, previous_draft, review)
+    tasks = {
+        asyncio.ensure_future(_arun_candidate(ticket, variant_context, category, temperature,
+                                              previous_draft, review)): index
+        for index, (temperature, variant_context) in enumerate(variants)
+    }
+    results: List[Tuple[int, Draft, Review]] = []
+    last_error: Optional[BaseException] = None
+    retryable_error: Optional[BaseException] = None
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logger.warning(f"Speculative draft {tasks[task]} failed: {str(task.exception())}")
+                    record_error(task.exception())
+                    last_error = task.exception()
+                    if retryable_error is None and is_retryable(last_error):
+                        retryable_error = last_error
+                    continue
+                results.append((tasks[task], *task.result()))
+                if task.result()[1]["approved"]:
+                    return _outcome(results, len(variants), len(pending), tokens)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    # No candidate was approved: a rejected draft must not mask a transient failure
+    # the caller's retry policy would have retried
+    if retryable_error is not None:
+        raise retryable_error
+    if not results:
+        raise last_error
+    return _outcome(results, len(variants), 0, tokens)
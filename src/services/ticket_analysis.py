@@ -0,0 +1,82 @@
+"""One-time analysis of a ticket's text, stored in ``AgentState["analysis"]``.
+
+Classification, retrieval, the response cache and duplicate detection all start from the
+same subject + description. The analysis normalizes that text once and derives what
+those steps need from it, so retries and resumed tickets reuse it instead of redoing it:
+
+- ``subject``/``description``/``text``: NFKC-normalized with whitespace collapsed, so
+  trivially different copies of a ticket render the same prompts (and hit the LLM cache)
+- ``fingerprint``: SHA-256 of the case-folded text
+- ``language``: ISO 639-1 guess from stopword hits, ``und`` when undecided. The local
+  classifier only decides tickets in ``LOCAL_CLASSIFIER_LANGUAGES``
+- ``keywords``: most frequent non-stopword terms, the base of the re-retrieval query
+- ``embedding``: query vector for the vector retrieval engine (None with BM25)
+"""
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, List
+
+from src.core.schemas import Ticket, TicketAnalysis
+from src.services.context_retrieval import get_engine
+from src.services.retrieval_engine import tokenize
+
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+STOPWORDS: Dict[str, FrozenSet[str]] = {
+    "en": frozenset("the a an and or is are was to of for in on my i it this that not can you "
+                    "your we with have has be do does how why what".split()),
+    "es": frozenset("el la los las de del que y en es no mi por para una un con se lo como "
+                    "pero mis su al".split()),
+    "fr": frozenset("le la les de des du et est je ne pas mon ma pour une un avec que qui sur "
+                    "mais au".split()),
+    "de": frozenset("der die das und ist ich nicht mein meine mit ein eine zu den von auf "
+                    "sich auch es".split()),
+    "pt": frozenset("o a os as de do da que e não meu minha para uma um com é por em".split()),
+    "it": frozenset("il lo la gli le di che e non mio mia per una un con è sono del della".split()),
+}
+_ALL_STOPWORDS = frozenset().union(*STOPWORDS.values())
+MIN_LANGUAGE_HITS = 2
+KEYWORD_COUNT = 8
+
+
+def normalize_field(value: str) -> str:
+    """NFKC, runs of spaces collapsed, lines trimmed and blank lines dropped"""
+    value = unicodedata.normalize("NFKC", str(value or ""))
+    lines = (_WHITESPACE_RE.sub(" ", line).strip() for line in value.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha256(text.casefold().encode("utf-8")).hexdigest()
+
+
+def detect_language(text: str) -> str:
+    words = _WORD_RE.findall(text.casefold())
+    hits = {lang: sum(1 for w in words if w in stopwords) for lang, stopwords in STOPWORDS.items()}
+    language, count = max(hits.items(), key=lambda item: item[1])
+    return language if count >= MIN_LANGUAGE_HITS else "und"
+
+
+def extract_keywords(terms: List[str], limit: int = KEYWORD_COUNT) -> List[str]:
+    counts = Counter(t for t in terms if t not in _ALL_STOPWORDS and len(t) > 2 and not t.isdigit())
+    # Most frequent first; ties keep first-occurrence order
+    return [term for term, _ in counts.most_common(limit)]
+
+
+def analyze_ticket(ticket: Ticket) -> TicketAnalysis:
+    """Normalize the ticket once and compute everything later steps derive from its text"""
+    subject = normalize_field(ticket.get("subject"))
+    description = normalize_field(ticket.get("description"))
+    text = f"{subject}\n{description}"
+    return {
+        "subject": subject,
+        "description": description,
+        "text": text,
+        "fingerprint": fingerprint(text),
+        "language": detect_language(text),
+        "keywords": extract_keywords(tokenize(text)),
+        "embedding": get_engine().embed_query(text)
+    }
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Run the suite offline against the deterministic synthetic LLM, without artificial latency
+os.environ.setdefault("LLM_PROVIDER", "synthetic")
+os.environ.setdefault("SYNTHETIC_LATENCY_SCALE", "0")
+# tiktoken downloads its encodings on first use; count tokens with the local estimate
+os.environ.setdefault("CONTEXT_TOKENIZER", "heuristic")
+# Tests process the same tickets repeatedly; reuse is exercised with explicit indexes
+os.environ.setdefault("DUPLICATE_REUSE_ENABLED", "false")
+
+# Keep escalations raised during tests out of the repository's data/ log
+os.environ.setdefault(
+    "ESCALATION_LOG_PATH", os.path.join(tempfile.mkdtemp(prefix="support-agent-tests-"), "escalations.csv")
+)
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 from pathlib import Path
@@ -5,6 +6,7 @@ import pytest
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core import SupportAgent
+from src.config.settings import Settings
 from src.core.schemas import Ticket
 
 @pytest.fixture
@@ -33,7 +35,7 @@ def test_agent_workflow(agent, technical_ticket):
 def test_agent_retry_mechanism(agent, mocker):
     # Mock services to test retry logic
     mocker.patch(
-        "src.services.review_draft",
+        "src.core.agent.review_draft",
         return_value={"approved": False, "feedback": "Needs improvement"}
     )
     
@@ -44,4 +46,89 @@ def test_agent_retry_mechanism(agent, mocker):
     result = agent.process_ticket(ticket)
     
     assert result["attempt"] == 2  # Initial + 1 retry
-    assert result["escalated"] is True
\ No newline at end of file
+    assert result["escalated"] is True
+
+def test_agent_async_pipeline(agent, mocker):
+    mocker.patch("src.core.agent.aclassify_ticket", mocker.AsyncMock(
+        return_value={"category": "Technical", "confidence": 1.0}))
+    mocker.patch("src.core.agent.agenerate_draft", mocker.AsyncMock(
+        return_value={"content": "Please clear your cache.", "context_used": []}))
+    mocker.patch("src.core.agent.areview_draft", mocker.AsyncMock(
+        return_value={"approved": True, "feedback": None, "violations": []}))
+
+    result = asyncio.run(agent.aprocess_ticket({
+        "subject": "Login issue",
+        "description": "Can't access my account"
+    }))
+
+    assert result["classification"]["category"] == "Technical"
+    assert result["review"]["approved"] is True
+    assert result["attempt"] == 1
+    assert result["escalated"] is False
+
+
+def test_retry_redrafts_with_feedback_without_reretrieving(agent, mocker):
+    mocker.patch("src.core.agent.classify_ticket",
+                 return_value={"category": "Billing", "confidence": 0.9})
+    retrieve = mocker.patch("src.core.agent.retrieve_context",
+                            return_value={"category": "Billing", "documents": ["Refunds take 5-7 business days"]})
+    draft = mocker.patch("src.core.agent.generate_draft",
+                         return_value={"content": "Draft", "context_used": []})
+    mocker.patch("src.core.agent.review_draft", side_effect=[
+        {"approved": False, "feedback": "Tone is too casual", "violations": ["Maintain professional tone"]},
+        {"approved": True, "feedback": None, "violations": []},
+    ])
+
+    result = agent.process_ticket({"subject": "Refund", "description": "Where is my refund?"})
+
+    assert result["review"]["approved"] is True
+    assert result["attempt"] == 2
+    assert retrieve.call_count == 1
+    revision_kwargs = draft.call_args_list[1].kwargs
+    assert revision_kwargs["review"]["violations"] == ["Maintain professional tone"]
+    assert revision_kwargs["previous_draft"]["content"] == "Draft"
+
+
+def test_reretrieval_widens_query_and_top_k(agent, mocker):
+    mocker.patch("src.core.agent.classify_ticket",
+                 return_value={"category": "Billing", "confidence": 0.9})
+    retrieve = mocker.patch("src.core.agent.retrieve_context",
+                            return_value={"category": "Billing", "documents": ["Refunds take 5-7 business days"]})
+    mocker.patch("src.core.agent.generate_draft", return_value={"content": "Draft", "context_used": []})
+    mocker.patch("src.core.agent.review_draft", side_effect=[
+        {"approved": False, "feedback": "Missing documentation on invoice downloads", "violations": []},
+        {"approved": True, "feedback": None, "violations": []},
+    ])
+
+    agent.process_ticket({"subject": "Refund", "description": "Where is my refund?"})
+
+    first, second = retrieve.call_args_list
+    assert first.kwargs["top_k"] == Settings.RETRIEVAL_TOP_K
+    assert second.kwargs["top_k"] > Settings.RETRIEVAL_TOP_K
+    assert "invoice" in second.args[1] and "invoice" not in first.args[1]
+
+
+def test_generic_feedback_redrafts_on_same_context(agent):
+    state = {
+        "context": {"category": "Billing", "documents": ["Refunds take 5-7 business days"]},
+        "review": {"approved": False, "feedback": "Please give more details and improve context usage",
+                   "violations": []}
+    }
+    assert agent._needs_more_context(state) is False
+    state["review"]["feedback"] = "The answer is not supported by the documentation"
+    assert agent._needs_more_context(state) is True
+
+
+def test_ticket_escalation_skips_drafting(agent, mocker):
+    mocker.patch("src.core.agent.classify_ticket",
+                 return_value={"category": "General", "confidence": 0.9})
+    draft = mocker.patch("src.core.agent.generate_draft")
+    review = mocker.patch("src.core.agent.review_draft")
+
+    result = agent.process_ticket({"subject": "Complaint",
+                                   "description": "My attorney will file a lawsuit over this."})
+
+    assert result["escalated"] is True
+    assert result["review"]["violations"] == ["Escalate legal inquiries"]
+    draft.assert_not_called()
+    review.assert_not_called()
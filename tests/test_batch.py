@@ -0,0 +1,88 @@
+import sys
+import asyncio
+import json
+import random
+import threading
+import time
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.batch import BatchStats, iter_tickets, reorder, run_batch, run_sharded
+
+class FakeAgent:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def process_ticket(self, ticket):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        return {"ticket": ticket, "review": {"approved": True}, "attempt": 1, "escalated": False}
+
+    async def aprocess_ticket(self, ticket):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(random.uniform(0, 0.01))
+        with self._lock:
+            self.in_flight -= 1
+        return {"ticket": ticket, "review": {"approved": True}, "attempt": 1, "escalated": False}
+
+@pytest.fixture
+def ticket_file(tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    lines = [json.dumps({"subject": f"Ticket {i}", "description": "Help"}) for i in range(20)]
+    lines.insert(5, "")
+    lines.append("{not json")
+    path.write_text("\n".join(lines))
+    return path
+
+def test_iter_tickets_skips_blank_and_flags_invalid(ticket_file):
+    tickets = list(iter_tickets(str(ticket_file)))
+    assert len(tickets) == 21
+    assert "error" in tickets[-1][1]
+
+def test_run_batch_respects_concurrency(ticket_file):
+    agent = FakeAgent()
+    stats = BatchStats()
+    results = list(run_batch(agent, iter_tickets(str(ticket_file)), concurrency=4, stats=stats))
+
+    assert len(results) == 21
+    assert agent.peak <= 4
+    assert stats.processed == 21
+    assert stats.approved == 21
+    assert stats.summary()["latency_s"]["p50"] > 0
+
+def test_reorder_buffers_until_sequence_is_contiguous():
+    assert list(reorder([(2, "c"), (0, "a"), (3, "d"), (1, "b")])) == ["a", "b", "c", "d"]
+
+def test_run_sharded_ordered_threads(ticket_file):
+    results = list(run_sharded(iter_tickets(str(ticket_file)), "threads", concurrency=4,
+                               ordered=True, agent=FakeAgent()))
+    indices = [index for index, _, _ in results]
+    assert indices == sorted(indices) and len(indices) == 21
+
+def test_run_sharded_asyncio_bounds_tasks(ticket_file):
+    agent = FakeAgent()
+    stats = BatchStats()
+    results = list(run_sharded(iter_tickets(str(ticket_file)), "asyncio", concurrency=3,
+                               stats=stats, agent=agent))
+    assert len(results) == 21
+    assert 1 < agent.peak <= 3
+    assert stats.processed == 21
+
+def test_run_sharded_processes_merges_in_order(ticket_file):
+    results = list(run_sharded(iter_tickets(str(ticket_file)), "processes", concurrency=2,
+                               workers=2, ordered=True))
+    assert [index for index, _, _ in results] == [index for index, _ in iter_tickets(str(ticket_file))]
+    assert all(result["ticket"]["subject"] for _, result, _ in results)
+
+def test_run_sharded_rejects_unknown_mode(ticket_file):
+    with pytest.raises(ValueError):
+        list(run_sharded(iter_tickets(str(ticket_file)), "gpu"))
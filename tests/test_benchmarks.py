@@ -0,0 +1,37 @@
+import sys
+import json
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_pipeline import compare, load_corpus, run_benchmark
+
+def test_load_corpus_maps_title_and_body(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"subject": "Refund", "description": "Charged twice"}),
+        "",
+        json.dumps({"request_id": "x", "title": "Slow login", "body": "Takes a minute"})
+    ]))
+    assert load_corpus(str(path)) == [
+        {"subject": "Refund", "description": "Charged twice"},
+        {"subject": "Slow login", "description": "Takes a minute"}
+    ]
+
+def test_run_benchmark_reports_node_breakdown():
+    tickets = [{"subject": "Password reset", "description": "The reset email never arrives"}] * 3
+    results = run_benchmark(tickets, concurrency=2)
+    assert results["meta"]["tickets"] == 3
+    assert results["llm_calls_per_ticket"]["mean"] >= 2
+    assert results["node_time_s"]["classify"]["total"] > 0
+    assert results["node_time_s"]["review"]["total"] > 0
+    assert sum(results["attempts"].values()) == 3
+
+def test_compare_flags_slower_runs():
+    baseline = {"latency_s": {"p50": 1.0, "p95": 2.0, "p99": 3.0},
+                "llm_calls_per_ticket": {"mean": 3.0}, "throughput_tickets_per_s": 10.0}
+    current = {"latency_s": {"p50": 1.5, "p95": 2.0, "p99": 3.0},
+               "llm_calls_per_ticket": {"mean": 3.0}, "throughput_tickets_per_s": 5.0}
+    changes = {name: change for name, _, _, change in compare(current, baseline)}
+    assert changes["latency_s.p50"] == 50.0
+    assert changes["throughput_tickets_per_s"] == 50.0
+    assert changes["latency_s.p95"] == 0.0
@@ -0,0 +1,110 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core import SupportAgent
+from src.core.checkpointing import claim_thread, create_checkpointer, release_thread, ticket_thread_id
+
+TICKET = {"id": "T-100", "subject": "Refund request", "description": "I was charged twice this month"}
+APPROVED = {"approved": True, "feedback": "ok", "violations": []}
+
+@pytest.fixture
+def services(mocker):
+    return {
+        "classify": mocker.patch("src.core.agent.classify_ticket",
+                                 return_value={"category": "Billing", "confidence": 0.9}),
+        "draft": mocker.patch("src.core.agent.generate_draft",
+                              return_value={"content": "We will look into the charge.", "context_used": []}),
+        "review": mocker.patch("src.core.agent.review_draft")
+    }
+
+def _threads(checkpointer):
+    return {c.config["configurable"]["thread_id"] for c in checkpointer.list(None)}
+
+def test_thread_id_is_the_ticket_id():
+    assert ticket_thread_id(TICKET) == "T-100"
+    # Identical text from different customers must not share a thread
+    assert ticket_thread_id({"subject": "Refund", "description": "Charged twice"}) is None
+
+def test_transient_failure_resumes_without_redoing_completed_nodes(services):
+    services["review"].side_effect = [TimeoutError("review timed out"), APPROVED]
+    agent = SupportAgent(checkpointer=create_checkpointer("memory"))
+
+    result = agent.process_ticket(TICKET)
+
+    assert result["review"]["approved"] is True
+    assert not result["escalated"]
+    services["classify"].assert_called_once()
+    services["draft"].assert_called_once()
+    assert services["review"].call_count == 2
+
+def test_sqlite_checkpoint_resumes_in_a_new_agent(services, tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    services["review"].side_effect = ValueError("malformed provider response")
+    first = SupportAgent(checkpointer=create_checkpointer("sqlite", path))
+    assert first.process_ticket(TICKET)["escalated"] is True
+
+    services["review"].side_effect = None
+    services["review"].return_value = APPROVED
+    second = SupportAgent(checkpointer=create_checkpointer("sqlite", path))
+    result = second.process_ticket(TICKET)
+
+    assert result["review"]["approved"] is True
+    services["classify"].assert_called_once()
+    services["draft"].assert_called_once()
+
+def test_finished_ticket_runs_fresh_on_resubmission(services):
+    services["review"].return_value = APPROVED
+    checkpointer = create_checkpointer("memory")
+    agent = SupportAgent(checkpointer=checkpointer)
+    agent.process_ticket(TICKET)
+    # A completed run deletes its checkpoints
+    assert _threads(checkpointer) == set()
+    agent.process_ticket(TICKET)
+    assert services["classify"].call_count == 2
+
+def test_failed_run_keeps_ticket_id_for_resume(services):
+    services["review"].side_effect = ValueError("malformed provider response")
+    checkpointer = create_checkpointer("memory")
+    result = SupportAgent(checkpointer=checkpointer).process_ticket(TICKET)
+    assert result["ticket"]["id"] == "T-100"
+    assert _threads(checkpointer) == {"T-100"}
+
+def test_run_in_progress_is_not_taken_over(services):
+    services["review"].side_effect = ValueError("malformed provider response")
+    checkpointer = create_checkpointer("memory")
+    agent = SupportAgent(checkpointer=checkpointer)
+    agent.process_ticket(TICKET)  # leaves a pending checkpoint under T-100
+
+    services["review"].side_effect = None
+    services["review"].return_value = APPROVED
+    assert claim_thread("T-100")  # as if that run were still going
+    try:
+        result = agent.process_ticket(TICKET)
+    finally:
+        release_thread("T-100")
+
+    # Ran from the start on its own thread, leaving the held one alone
+    assert result["review"]["approved"] is True
+    assert services["classify"].call_count == 2
+    assert _threads(checkpointer) == {"T-100"}
+
+def test_async_pipeline_with_sqlite_checkpointer(mocker, tmp_path):
+    mocker.patch("src.core.agent.aclassify_ticket", mocker.AsyncMock(
+        return_value={"category": "Billing", "confidence": 0.9}))
+    mocker.patch("src.core.agent.agenerate_draft", mocker.AsyncMock(
+        return_value={"content": "We will look into the charge.", "context_used": []}))
+    review = mocker.patch("src.core.agent.areview_draft", mocker.AsyncMock(
+        side_effect=[ConnectionError("reset"), APPROVED]))
+    agent = SupportAgent(checkpointer=create_checkpointer("sqlite", str(tmp_path / "cp.db")))
+
+    result = asyncio.run(agent.aprocess_ticket(TICKET))
+
+    assert result["review"]["approved"] is True
+    assert review.call_count == 2
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_checkpointer("redis")
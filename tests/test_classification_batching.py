@@ -0,0 +1,88 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import Mock
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from src.config import settings
+from src.core.llm_cache import LLMResponseCache
+from src.services import classification
+from src.services.classification_batcher import ClassificationBatcher, parse_batch_labels
+
+INPUTS = [
+    {"subject": "Invoice", "description": "Charged twice"},
+    {"subject": "Crash", "description": "App closes on start"},
+    {"subject": "Hacked", "description": "Someone logged into my account"},
+]
+
+def _batched_llm(mocker, *responses):
+    llm = FakeListChatModel(responses=list(responses))
+    mocker.patch("src.services.classification_batcher.llm_service.get_llm", return_value=llm)
+    return llm
+
+def test_parse_batch_labels_keeps_known_categories_only():
+    raw = 'Here you go: {"t1": "billing", "t2": "Technical.", "t3": "Refunds"}'
+    assert parse_batch_labels(raw, ["t1", "t2", "t3", "t4"]) == {"t1": "Billing", "t2": "Technical"}
+    assert parse_batch_labels("Billing", ["t1"]) == {}
+
+def test_concurrent_tickets_share_one_call(mocker):
+    _batched_llm(mocker, '{"t1": "Billing", "t2": "Technical", "t3": "Security"}')
+    classify_one = Mock(return_value="General")
+    batcher = ClassificationBatcher(classify_one, max_batch_size=3, max_wait_ms=5000)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(batcher.classify, inputs) for inputs in INPUTS]
+        labels = sorted(f.result(timeout=5) for f in futures)
+
+    assert labels == ["Billing", "Security", "Technical"]
+    assert batcher.stats() == {"batches": 1, "items": 3, "fallbacks": 0, "mean_batch_size": 3.0}
+    classify_one.assert_not_called()
+
+def test_unparseable_reply_falls_back_to_single_calls(mocker):
+    _batched_llm(mocker, "Sorry, I can only classify one ticket at a time.")
+    classify_one = Mock(return_value="General")
+    batcher = ClassificationBatcher(classify_one, max_batch_size=2, max_wait_ms=5000)
+
+    futures = [batcher.submit(inputs) for inputs in INPUTS[:2]]
+
+    assert [f.result(timeout=5) for f in futures] == ["General", "General"]
+    assert classify_one.call_count == 2
+    assert batcher.stats()["fallbacks"] == 2
+
+def test_async_callers_await_the_batch(mocker):
+    _batched_llm(mocker, '{"t1": "Billing", "t2": "Technical"}')
+    batcher = ClassificationBatcher(Mock(), max_batch_size=2, max_wait_ms=5000)
+
+    async def run():
+        return await asyncio.gather(*(batcher.aclassify(inputs) for inputs in INPUTS[:2]))
+
+    assert sorted(asyncio.run(run())) == ["Billing", "Technical"]
+
+def test_cached_tickets_skip_the_batch(mocker):
+    llm = FakeListChatModel(responses=["Billing", '{"t1": "Technical", "t2": "Security"}'],
+                            cache=LLMResponseCache(max_entries=10))
+    mocker.patch("src.services.classification_batcher.llm_service.get_llm", return_value=llm)
+    single = classification._PROMPT | llm
+    assert single.invoke(INPUTS[0]).content == "Billing"
+    batcher = ClassificationBatcher(Mock(), max_batch_size=2, max_wait_ms=5000, prompt=classification._PROMPT)
+
+    # The single-ticket cache entry answers at once; only the misses are batched
+    assert batcher.submit(INPUTS[0]).result(timeout=0) == "Billing"
+    futures = [batcher.submit(inputs) for inputs in INPUTS[1:]]
+    assert [f.result(timeout=5) for f in futures] == ["Technical", "Security"]
+    assert batcher.stats()["items"] == 2
+
+    # Batched labels are cached under the single-ticket key
+    assert single.invoke(INPUTS[2]).content == "Security"
+
+def test_classify_ticket_routes_uncertain_tickets_through_batcher(mocker, monkeypatch):
+    monkeypatch.setattr(settings, "CLASSIFIER_CONFIDENCE_THRESHOLD", 1.1)
+    batcher = Mock(classify=Mock(return_value="Security"))
+    mocker.patch.object(classification, "get_classification_batcher", return_value=batcher)
+
+    result = classification.classify_ticket({"subject": "Login", "description": "Strange sign-in alert"})
+
+    assert result["category"] == "Security"
+    batcher.classify.assert_called_once_with({"subject": "Login", "description": "Strange sign-in alert"})
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import settings
+from src.services import context_packer
+from src.services.context_packer import HeuristicTokenizer, context_budget, create_tokenizer, pack_context
+from src.services.draft_generation import generate_draft
+
+tokenizer = HeuristicTokenizer()
+
+def test_most_relevant_chunks_first():
+    documents = [
+        "Support hours are 9AM-5PM EST.",
+        "Clear cache and cookies to fix login issues."
+    ]
+    packed = pack_context(documents, "login issues after update", 500, tokenizer)
+    assert packed["documents"] == [documents[1], documents[0]]
+
+def test_overlapping_documents_are_deduplicated():
+    documents = [
+        "Refunds take 5-7 business days. Contact billing for invoice copies.",
+        "Refunds take 5-7 business days.",
+        "Refunds take 5-7 business days. Contact billing for invoice copies."
+    ]
+    packed = pack_context(documents, "refund", 500, tokenizer)
+    assert packed["documents"] == [documents[0]]
+    assert packed["tokens"]["deduplicated"] == 2
+
+def test_budget_truncates_at_sentence_boundary(monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_CHUNK_TOKENS", 1000)
+    monkeypatch.setattr(settings, "CONTEXT_MIN_CHUNK_TOKENS", 5)
+    document = " ".join(f"Step {i} of the reset procedure is documented here." for i in range(40))
+    packed = pack_context([document, "An unrelated short note."], "reset", 60, tokenizer)
+
+    assert packed["tokens"]["context"] <= 60
+    assert packed["tokens"]["truncated"] == 1
+    assert packed["documents"][0].endswith(".")
+
+def test_budget_is_capped_by_context_window(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_CONTEXT_LENGTH", 2000)
+    monkeypatch.setattr(settings, "CONTEXT_TOKENS_RESERVED", 500)
+    assert context_budget("draft", 100) == min(settings.CONTEXT_TOKEN_BUDGETS["draft"], 1400)
+    assert context_budget("draft", 5000) == 0
+
+def test_missing_encoding_falls_back_to_estimate(monkeypatch):
+    tiktoken = pytest.importorskip("tiktoken")
+    def unavailable(name):
+        raise ConnectionError("offline")
+    monkeypatch.setattr(tiktoken, "get_encoding", unavailable)
+    assert create_tokenizer("cl100k_base").name == "heuristic"
+
+def test_draft_reports_token_counts():
+    ticket = {"subject": "Login issues", "description": "I can't login after the update"}
+    context = {"category": "Technical", "documents": ["Clear cache/cookies for login issues"] * 2}
+    draft = generate_draft(ticket, context)
+
+    assert draft["context_used"] == ["Clear cache/cookies for login issues"]
+    tokens = draft["tokens"]
+    assert tokens["prompt"] > tokens["context"] > 0
+    assert tokens["deduplicated"] == 1
+    assert tokens["tokenizer"] == context_packer.get_tokenizer().name
@@ -0,0 +1,103 @@
+import asyncio
+import re
+import sys
+from pathlib import Path
+from typing import Any, Iterator, List
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.core import SupportAgent
+from src.core.llm_service import llm_service
+from src.services.draft_generation import astream_draft, stream_draft
+
+VIOLATING = ("We will refund you the full amount today. " + "Our team is reviewing every charge on the account. " * 20)
+CLEAN = "Thanks for reaching out. Please clear your cache and cookies, then sign in again."
+
+class WordStreamModel(BaseChatModel):
+    """Streams a fixed text word by word, recording how many words were pulled"""
+    text: str
+    pulled: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "word-stream"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for word in re.findall(r"\S+\s*", self.text):
+            self.pulled.append(word)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+@pytest.fixture
+def ticket():
+    return {"subject": "Double charge", "description": "I was billed twice this month"}
+
+@pytest.fixture
+def context():
+    return {"category": "Billing", "documents": ["Refunds take 5-7 business days"]}
+
+def use_draft_model(mocker, text: str) -> WordStreamModel:
+    model = WordStreamModel(text=text, pulled=[])
+    get_llm = llm_service.get_llm
+    mocker.patch.object(llm_service, "get_llm",
+                        side_effect=lambda purpose: model if purpose == "draft" else get_llm(purpose))
+    return model
+
+def test_violation_stops_generation_early(mocker, ticket, context):
+    model = use_draft_model(mocker, VIOLATING)
+    released = []
+    draft = stream_draft(ticket, context, category="Billing", on_token=released.append)
+
+    assert draft["aborted"] is True
+    assert draft["violations"] == ["Do not promise refunds"]
+    assert len(model.pulled) < len(re.findall(r"\S+\s*", VIOLATING)) // 4
+    assert released == []
+
+def test_clean_draft_streams_checked_text(mocker, ticket, context):
+    use_draft_model(mocker, CLEAN)
+    released = []
+    draft = stream_draft(ticket, context, category="Technical", on_token=released.append)
+
+    assert "aborted" not in draft
+    assert "".join(released) == draft["content"] == CLEAN
+
+def test_unfinished_sentence_is_not_checked(mocker, monkeypatch, ticket, context):
+    from src.config import settings
+    # Check after every word, so the guard sees "...I will send you the refund " mid-sentence
+    monkeypatch.setattr(settings, "DRAFT_STREAM_CHECK_CHARS", 1)
+    text = ("Thanks for your patience while we look into the duplicate charge, "
+            "and I will send you the refund policy document shortly. It explains the timeline.")
+    use_draft_model(mocker, text)
+    released = []
+    draft = stream_draft(ticket, context, category="Billing", on_token=released.append)
+
+    assert "aborted" not in draft
+    assert "".join(released) == draft["content"] == text
+
+def test_async_violation_stops_generation_early(mocker, ticket, context):
+    model = use_draft_model(mocker, VIOLATING)
+    draft = asyncio.run(astream_draft(ticket, context, category="Billing"))
+
+    assert draft["aborted"] is True
+    assert len(model.pulled) < len(re.findall(r"\S+\s*", VIOLATING))
+
+def test_aborted_draft_skips_llm_review(mocker, ticket):
+    use_draft_model(mocker, VIOLATING)
+    mocker.patch("src.core.agent.classify_ticket", return_value={"category": "Billing", "confidence": 0.9})
+    review_llm = mocker.patch("src.services.review._PROMPT")
+    tokens = []
+    agent = SupportAgent(on_draft_token=lambda attempt, text: tokens.append((attempt, text)))
+
+    result = agent.process_ticket(ticket)
+
+    review_llm.__or__.assert_not_called()
+    assert result["review"]["violations"] == ["Do not promise refunds"]
+    assert result["review"]["feedback"].startswith("Draft stopped early")
+    assert result["escalated"] is True
+    assert tokens == []
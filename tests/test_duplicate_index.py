@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core import SupportAgent
+from src.core import duplicate_index as module
+from src.core.duplicate_index import DuplicateIndex
+from src.services.ticket_analysis import analyze_ticket
+
+ORIGINAL = {
+    "subject": "Refund status",
+    "description": "I was charged twice for my subscription this month and would like to know "
+                   "when the refund for the duplicate charge will arrive."
+}
+REWORDED = {
+    "subject": "Refund status",
+    "description": "Hi, I was charged twice for my subscription this month and would like to know "
+                   "when the refund for the duplicate charge will arrive. Thanks"
+}
+UNRELATED = {
+    "subject": "App crashes",
+    "description": "The mobile app crashes on startup since the latest update on Android."
+}
+CLASSIFICATION = {"category": "Billing", "confidence": 0.9}
+DRAFT = {"content": "Refunds take 5-7 business days.", "context_used": ["Refunds take 5-7 business days"]}
+
+def test_near_duplicate_matches_and_unrelated_does_not():
+    index = DuplicateIndex(threshold=0.6)
+    index.add(analyze_ticket(ORIGINAL), CLASSIFICATION, DRAFT)
+
+    match = index.find(analyze_ticket(REWORDED))
+    assert match is not None
+    assert 0.6 <= match["similarity"] < 1.0
+    assert match["draft"] == DRAFT
+    assert index.find(analyze_ticket(UNRELATED)) is None
+    assert index.stats()["avoided_runs"] == 1
+    assert index.stats()["lookups"] == 2
+
+def test_entries_expire_and_are_bounded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    index = DuplicateIndex(max_entries=1, ttl_seconds=60)
+
+    index.add(analyze_ticket(ORIGINAL), CLASSIFICATION, DRAFT)
+    index.add(analyze_ticket(UNRELATED), {"category": "Technical", "confidence": 0.9}, DRAFT)
+    assert index.stats()["entries"] == 1
+    assert index.find(analyze_ticket(ORIGINAL)) is None
+
+    assert index.find(analyze_ticket(UNRELATED)) is not None
+    now[0] += 61
+    assert index.find(analyze_ticket(UNRELATED)) is None
+    assert index.stats()["entries"] == 0
+
+@pytest.fixture
+def pipeline(mocker):
+    mocks = {
+        "classify": mocker.patch("src.core.agent.classify_ticket", return_value=CLASSIFICATION),
+        "draft": mocker.patch("src.core.agent.generate_draft", return_value=DRAFT),
+        "review": mocker.patch("src.core.agent.review_draft",
+                               return_value={"approved": True, "feedback": None, "violations": []}),
+    }
+    return mocks
+
+def test_agent_reuses_approved_response_for_near_duplicate(pipeline):
+    index = DuplicateIndex(threshold=0.6)
+    agent = SupportAgent(duplicate_index=index)
+
+    first = agent.process_ticket(ORIGINAL)
+    second = agent.process_ticket(REWORDED)
+
+    assert "reused" not in first or first["reused"] is None
+    assert second["reused"]["fingerprint"] == first["analysis"]["fingerprint"]
+    assert second["draft"] == DRAFT
+    assert second["review"]["approved"] is True and second["escalated"] is False
+    assert pipeline["draft"].call_count == 1
+    assert pipeline["review"].call_count == 1
+    assert index.stats()["avoided_runs"] == 1
+
+def test_ticket_needing_escalation_is_not_reused(pipeline):
+    index = DuplicateIndex(threshold=0.5)
+    agent = SupportAgent(duplicate_index=index)
+    agent.process_ticket(ORIGINAL)
+
+    legal = {**REWORDED, "description": REWORDED["description"] + " Otherwise my lawyer will be in touch."}
+    result = agent.process_ticket(legal)
+
+    assert not result.get("reused")
+    # Escalated from the ticket itself, before any draft
+    assert result["escalated"] is True
+    assert pipeline["draft"].call_count == 1
@@ -0,0 +1,58 @@
+import sys
+import csv
+import json
+import sqlite3
+import threading
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.escalation import EscalationSink, create_backend
+
+def _record(i):
+    return {"timestamp": "t", "subject": f"Ticket {i}", "description": "d",
+            "category": "Billing", "attempts": 2, "draft": "x", "feedback": "y"}
+
+def test_csv_sink_batches_and_writes_single_header(tmp_path):
+    path = str(tmp_path / "escalations.csv")
+    sinks = [EscalationSink(create_backend("csv", path), batch_size=7, flush_interval=0.05) for _ in range(2)]
+
+    def produce(sink, offset):
+        for i in range(50):
+            sink.write(_record(offset + i))
+
+    threads = [threading.Thread(target=produce, args=(sink, n * 100)) for n, sink in enumerate(sinks)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for sink in sinks:
+        sink.close()
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 100
+    assert len({row["subject"] for row in rows}) == 100
+    assert Path(path).read_text().count("timestamp,subject") == 1
+
+def test_csv_sink_respects_existing_header(tmp_path):
+    path = tmp_path / "escalations.csv"
+    path.write_text("subject,category\n")
+    sink = EscalationSink(create_backend("csv", str(path)))
+    sink.write(_record(1))
+    sink.close()
+    assert path.read_text().splitlines() == ["subject,category", "Ticket 1,Billing"]
+
+@pytest.mark.parametrize("kind", ["jsonl", "sqlite"])
+def test_other_backends(tmp_path, kind):
+    path = str(tmp_path / f"escalations.{kind}")
+    sink = EscalationSink(create_backend(kind, path))
+    for i in range(3):
+        sink.write(_record(i))
+    sink.close()
+
+    if kind == "jsonl":
+        rows = [json.loads(line) for line in Path(path).read_text().splitlines()]
+    else:
+        rows = sqlite3.connect(path).execute("SELECT subject FROM escalations").fetchall()
+    assert len(rows) == 3
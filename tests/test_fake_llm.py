@@ -0,0 +1,41 @@
+import sys
+import json
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from src.core.fake_llm import LatencyModel, ReplayChatModel, SyntheticChatModel, prompt_hash
+
+def test_synthetic_outputs_are_schema_valid_and_deterministic():
+    classify = SyntheticChatModel(purpose="classification", seed=7)
+    assert classify.invoke("Subject: x").content in ["Billing", "Technical", "Security", "General"]
+    assert classify.invoke("Subject: x").content == classify.invoke("Subject: x").content
+
+    review = json.loads(SyntheticChatModel(purpose="review").invoke("draft").content)
+    assert set(review) == {"approved", "feedback", "violations"}
+
+    draft = SyntheticChatModel(purpose="draft").invoke("Ticket Subject: Login issue\nDescription: x")
+    assert "Login issue" in draft.content
+    assert draft.usage_metadata["total_tokens"] > 0
+
+def test_latency_distribution_mean():
+    import random
+    rng = random.Random(0)
+    model = LatencyModel("lognormal", mean_ms=100, spread=0.5)
+    samples = [model.sample(rng) for _ in range(5000)]
+    assert sum(samples) / len(samples) == pytest.approx(0.1, rel=0.05)
+    assert LatencyModel("lognormal", mean_ms=100, spread=0.5, scale=0).sample(rng) == 0.0
+
+def test_replay_serves_and_records(tmp_path):
+    fixture = tmp_path / "fixtures.json"
+    recorder = ReplayChatModel(fixture_path=str(fixture), record=True,
+                               fallback=FakeListChatModel(responses=["recorded"]))
+    assert recorder.invoke("hello").content == "recorded"
+
+    replay = ReplayChatModel(fixture_path=str(fixture))
+    assert replay.invoke("hello").content == "recorded"
+    assert json.loads(fixture.read_text()) == {prompt_hash([HumanMessage("hello")]): "recorded"}
+    with pytest.raises(KeyError):
+        replay.invoke("never recorded")
@@ -0,0 +1,81 @@
+import sys
+import asyncio
+import json
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage
+from src.core import SupportAgent
+from src.core.instrumentation import (
+    InMemoryExporter,
+    Instrumentation,
+    NodeSpan,
+    PrometheusExporter,
+    SpanFileExporter,
+    _current_span,
+    record_cache_hit,
+    record_llm_call
+)
+
+TICKET = {"subject": "Login issue", "description": "Cannot log in after the password reset"}
+
+def test_disabled_agent_adds_no_trace():
+    agent = SupportAgent()
+    assert agent.instrumentation is None
+    assert "trace" not in agent.process_ticket(TICKET)
+
+def test_nodes_are_traced_and_exported(tmp_path):
+    memory = InMemoryExporter()
+    prometheus = PrometheusExporter()
+    spans_path = tmp_path / "spans.jsonl"
+    agent = SupportAgent(Instrumentation([memory, prometheus, SpanFileExporter(str(spans_path))]))
+
+    result = agent.process_ticket(TICKET)
+
+    trace = result["trace"]
+    names = [span["name"] for span in trace["spans"]]
+    assert names[:4] == ["classify", "retrieve", "draft", "review"]
+    assert all(span["trace_id"] == trace["trace_id"] for span in trace["spans"])
+    assert all(span["duration"] >= 0 for span in trace["spans"])
+    draft_span = next(span for span in trace["spans"] if span["name"] == "draft")
+    assert draft_span["llm_calls"] == 1 and draft_span["completion_tokens"] > 0
+    assert trace["llm_calls"] == sum(span["llm_calls"] for span in trace["spans"])
+    assert memory.traces == [trace]
+
+    metrics = prometheus.render()
+    assert 'support_agent_node_runs_total{node="classify",outcome="ok"} 1' in metrics
+    assert 'support_agent_node_duration_seconds_count{node="draft"}' in metrics
+    drafts = names.count("draft")
+    assert f'support_agent_llm_calls_total{{node="draft"}} {drafts}' in metrics
+
+    exported = [json.loads(line) for line in spans_path.read_text().splitlines()]
+    assert exported[0]["name"] == "process_ticket" and exported[0]["parentSpanId"] is None
+    assert {span["parentSpanId"] for span in exported[1:]} == {exported[0]["spanId"]}
+
+def test_async_pipeline_is_traced():
+    agent = SupportAgent(Instrumentation([InMemoryExporter()]))
+    result = asyncio.run(agent.aprocess_ticket(TICKET))
+    assert [span["name"] for span in result["trace"]["spans"]][:4] == ["classify", "retrieve", "draft", "review"]
+
+def test_hooks_record_only_inside_a_span():
+    record_llm_call(AIMessage(content="x", usage_metadata={"input_tokens": 3, "output_tokens": 2, "total_tokens": 5}))
+    span = NodeSpan("t", "draft")
+    token = _current_span.set(span)
+    try:
+        record_llm_call(AIMessage(content="x", usage_metadata={"input_tokens": 3, "output_tokens": 2, "total_tokens": 5}))
+        record_cache_hit()
+    finally:
+        _current_span.reset(token)
+    assert (span.llm_calls, span.prompt_tokens, span.completion_tokens, span.cache_hits) == (1, 3, 2, 1)
+
+def test_prometheus_histogram_is_cumulative(tmp_path):
+    exporter = PrometheusExporter(textfile_path=str(tmp_path / "metrics.prom"))
+    span = {"name": "review", "outcome": "approved", "duration": 0.03, "llm_calls": 1,
+            "prompt_tokens": 10, "completion_tokens": 5, "cache_hits": 0}
+    exporter.export({"outcome": "resolved", "spans": [span]})
+    metrics = exporter.render()
+    assert 'support_agent_node_duration_seconds_bucket{node="review",le="0.025"} 0' in metrics
+    assert 'support_agent_node_duration_seconds_bucket{node="review",le="0.05"} 1' in metrics
+    assert 'support_agent_node_duration_seconds_bucket{node="review",le="+Inf"} 1' in metrics
+    exporter.close()
+    assert (tmp_path / "metrics.prom").read_text() == metrics
@@ -0,0 +1,124 @@
+import sys
+import csv
+import json
+import multiprocessing
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core import SupportAgent
+from src.core.job_queue import JobQueue, _worker_process, process_job, run_worker
+
+TICKET = {"subject": "Refund request", "description": "I was charged twice this month"}
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2)
+    yield q
+    q.close()
+
+def test_lease_is_exclusive_until_it_expires(queue):
+    job_id = queue.enqueue(TICKET)
+    job = queue.lease("worker-a")
+    assert job.id == job_id and job.attempts == 1
+    assert queue.lease("worker-b") is None
+
+    queue.lease_seconds = -1  # make the next lease expire immediately
+    queue._conn.execute("UPDATE jobs SET lease_expires = 0")
+    taken_over = queue.lease("worker-b")
+    assert taken_over.id == job_id and taken_over.attempts == 2
+    # The original owner can no longer write
+    assert not queue.complete(job_id, "worker-a", {"stale": True})
+
+def test_run_worker_drains_queue(queue):
+    queue.enqueue_many([TICKET, {"subject": "Login issue", "description": "Cannot log in"}])
+    assert run_worker(queue, SupportAgent(), worker_id="w") == 2
+    stats = queue.stats()
+    assert stats["done"] == 2 and stats["depth"] == 0
+    results = list(queue.results())
+    assert [r["ticket"]["subject"] for r in results] == ["Refund request", "Login issue"]
+
+def test_crashed_job_resumes_after_last_completed_node(queue, mocker):
+    queue.enqueue(TICKET)
+    agent = SupportAgent()
+    job = queue.lease("crashing")
+
+    class Crash(BaseException):  # like the process being killed: nothing handles it
+        pass
+
+    def crash_after_draft(node, state):
+        queue.checkpoint(job.id, "crashing", node, state)
+        if node == "draft":
+            raise Crash()
+
+    with pytest.raises(Crash):
+        agent.process_ticket(job.ticket, on_node=crash_after_draft)
+
+    queue._conn.execute("UPDATE jobs SET lease_expires = 0")  # the crashed worker's lease lapses
+    resumed = queue.lease("rescuer")
+    assert resumed.last_node == "draft" and resumed.state["draft"]["content"]
+
+    classify = mocker.patch("src.core.agent.classify_ticket")
+    draft = mocker.patch("src.core.agent.generate_draft")
+    review = mocker.patch("src.core.agent.review_draft",
+                          return_value={"approved": True, "feedback": "ok", "violations": []})
+    result = process_job(agent, queue, resumed, "rescuer")
+
+    classify.assert_not_called()
+    draft.assert_not_called()
+    review.assert_called_once()
+    assert result["draft"] == resumed.state["draft"]
+    assert "resume_at" not in result
+    assert queue.stats()["done"] == 1
+
+def test_failing_job_is_parked_after_max_attempts(queue):
+    class BrokenAgent:
+        def process_ticket(self, ticket, on_node=None):
+            raise RuntimeError("provider outage")
+
+    queue.enqueue(TICKET)
+    for attempt in range(2):
+        queue._conn.execute("UPDATE jobs SET lease_expires = 0")  # skip the retry backoff
+        job = queue.lease("w")
+        assert process_job(BrokenAgent(), queue, job, "w") is None
+    stats = queue.stats()
+    assert stats["failed"] == 1 and stats["queued"] == 0
+
+def test_provider_outage_requeues_instead_of_completing(queue, mocker):
+    mocker.patch("src.core.agent.classify_ticket", return_value={"category": "Billing", "confidence": 0.9})
+    mocker.patch("src.core.agent.generate_draft", side_effect=TimeoutError("provider timed out"))
+    queue.enqueue(TICKET)
+
+    job = queue.lease("w")
+    assert process_job(SupportAgent(), queue, job, "w") is None
+
+    stats = queue.stats()
+    assert stats["done"] == 0 and stats["queued"] == 1
+
+def test_failed_job_waits_out_its_backoff(queue):
+    queue.enqueue(TICKET)
+    job = queue.lease("w")
+    queue.fail(job.id, "w", "HTTP 503", job.attempts)
+
+    assert queue.lease("w") is None
+    assert queue.stats()["queued"] == 1
+    queue._conn.execute("UPDATE jobs SET lease_expires = 0")  # the backoff has passed
+    assert queue.lease("w").attempts == 2
+    assert queue.retry_delay(1) < queue.retry_delay(2) <= queue.retry_backoff_max
+
+def test_worker_processes_flush_escalations(tmp_path, monkeypatch):
+    log_path = tmp_path / "escalations.csv"
+    monkeypatch.setenv("ESCALATION_LOG_PATH", str(log_path))
+    db = str(tmp_path / "queue.db")
+    queue = JobQueue(db)
+    # Legal threats escalate right after classification
+    queue.enqueue_many([{"subject": f"Complaint {i}", "description": "My lawyer will file a lawsuit"}
+                        for i in range(4)])
+
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        assert sum(pool.map(_worker_process, [db] * 2)) == 4
+
+    assert queue.stats()["done"] == 4
+    queue.close()
+    with open(log_path, newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 4
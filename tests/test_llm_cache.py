@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from src.core.llm_cache import LLMResponseCache
+
+def test_cache_serves_normalized_duplicates():
+    cache = LLMResponseCache(max_entries=10)
+    llm = FakeListChatModel(responses=["Billing", "Technical"], cache=cache)
+
+    assert llm.invoke("Refund   status?").content == "Billing"
+    assert llm.invoke("Refund status?").content == "Billing"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    # Case is significant
+    assert llm.invoke("REFUND status?").content == "Technical"
+
+def test_cache_evicts_lru_and_expires(monkeypatch):
+    cache = LLMResponseCache(max_entries=1, ttl_seconds=10)
+    llm = FakeListChatModel(responses=["a", "b", "c"], cache=cache)
+    llm.invoke("first")
+    llm.invoke("second")
+    assert cache.stats()["entries"] == 1
+    assert llm.invoke("first").content == "c"
+
+    import src.core.llm_cache as llm_cache
+    now = llm_cache.time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 60)
+    assert cache.lookup("anything", "model") is None
+
+def test_sqlite_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    LLMResponseCache(sqlite_path=path).update(
+        "prompt", "model", [ChatGeneration(message=AIMessage(content="General"))])
+
+    warm = LLMResponseCache(sqlite_path=path)
+    cached = warm.lookup("prompt", "model")
+    assert cached[0].message.content == "General"
+    assert warm.stats()["hits"] == 1
+
+def test_expired_sqlite_rows_are_purged(tmp_path, monkeypatch):
+    import src.core.llm_cache as llm_cache
+    path = str(tmp_path / "cache.db")
+    LLMResponseCache(ttl_seconds=10, sqlite_path=path).update(
+        "prompt", "model", [ChatGeneration(message=AIMessage(content="General"))])
+
+    now = llm_cache.time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 60)
+    warm = LLMResponseCache(sqlite_path=path)
+    assert warm._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] == 0
+    assert warm.lookup("prompt", "model") is None
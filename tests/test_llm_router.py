@@ -0,0 +1,77 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from src.core.llm_router import ProviderRateLimiter, ProviderRoute, RouterChatModel, TokenBucket, is_retryable
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+class FlakyChatModel(FakeListChatModel):
+    """Fails with the queued errors before answering"""
+    errors: list = []
+    calls: int = 0
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return super()._call(*args, **kwargs)
+
+def _router(*models, **kwargs):
+    routes = [ProviderRoute(f"p{i}", model) for i, model in enumerate(models)]
+    return RouterChatModel(routes=routes, sleep=lambda _: None, **kwargs)
+
+def test_fails_over_on_rate_limit():
+    primary = FlakyChatModel(responses=["primary"], errors=[ProviderError(429)])
+    secondary = FlakyChatModel(responses=["secondary"])
+    assert _router(primary, secondary).invoke("hi").content == "secondary"
+    assert primary.calls == 1
+
+def test_retries_rounds_with_backoff():
+    sleeps = []
+    primary = FlakyChatModel(responses=["ok"], errors=[ProviderError(503), ProviderError(503)])
+    router = RouterChatModel(routes=[ProviderRoute("p", primary)], max_retries=2, sleep=sleeps.append)
+    assert router.invoke("hi").content == "ok"
+    assert len(sleeps) == 2
+
+def test_non_retryable_error_is_raised():
+    primary = FlakyChatModel(responses=["ok"], errors=[ProviderError(400)])
+    secondary = FlakyChatModel(responses=["secondary"])
+    with pytest.raises(ProviderError):
+        _router(primary, secondary).invoke("hi")
+    assert secondary.calls == 0
+
+def test_async_failover():
+    primary = FlakyChatModel(responses=["primary"], errors=[ConnectionError("reset")])
+    secondary = FlakyChatModel(responses=["secondary"])
+    assert asyncio.run(_router(primary, secondary).ainvoke("hi")).content == "secondary"
+
+def test_token_bucket_reports_wait_when_exhausted():
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+def test_is_retryable_classification():
+    assert is_retryable(ProviderError(429))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ValueError("bad request"))
+
+class ToolModel(FakeListChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=tools, **kwargs)
+
+def test_bound_tools_change_the_cache_key():
+    schema = {"title": "policy_review", "description": "Verdict", "type": "object",
+              "properties": {"approved": {"type": "boolean"}}}
+    router = _router(ToolModel(responses=["ok"]))
+    bound = router.bind_tools([schema], tool_choice="policy_review")
+
+    assert bound._get_llm_string() != router._get_llm_string()
+    assert bound._get_llm_string() != router.bind_tools([schema], tool_choice="any")._get_llm_string()
+    assert bound._get_llm_string() == router.bind_tools([schema], tool_choice="policy_review")._get_llm_string()
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core import memory as module
+from src.core.memory import AgentMemory
+
+TICKET = {"subject": "Login issue", "description": "Cannot reset my password"}
+
+def test_conversation_records_turns_in_order():
+    memory = AgentMemory()
+    ticket_id = memory.initialize_conversation(TICKET)
+    memory.add_interaction(ticket_id, "customer", "Cannot reset my password")
+    memory.add_interaction(ticket_id, "agent", "Use the 'Forgot password' link")
+
+    conversation = memory.get_conversation(ticket_id)
+    assert conversation.ticket == TICKET
+    assert conversation.messages() == [
+        {"role": "customer", "content": "Cannot reset my password"},
+        {"role": "agent", "content": "Use the 'Forgot password' link"}
+    ]
+    with pytest.raises(ValueError):
+        memory.add_interaction("unknown", "agent", "hello")
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    memory = AgentMemory(max_conversations=2, ttl_seconds=60)
+    first = memory.initialize_conversation(TICKET)
+    second = memory.initialize_conversation(TICKET)
+    memory.get_conversation(first)
+    memory.initialize_conversation(TICKET)
+
+    assert memory.get_conversation(second) is None
+    assert memory.get_conversation(first) is not None
+    stats = memory.stats()
+    assert stats["entries"] == 2 and stats["occupancy"] == 1.0
+    assert stats["evictions"] == 1
+
+    now = module.time.time()
+    monkeypatch.setattr(module.time, "time", lambda: now + 61)
+    assert memory.get_conversation(first) is None
+    assert memory.stats()["expirations"] == 1
+
+def test_sqlite_tier_resumes_conversation_in_new_instance(tmp_path):
+    path = str(tmp_path / "memory.db")
+    writer = AgentMemory(max_conversations=1, sqlite_path=path)
+    ticket_id = writer.initialize_conversation(TICKET, ticket_id="T-1")
+    writer.add_interaction(ticket_id, "customer", "Still locked out")
+    writer.initialize_conversation(TICKET, ticket_id="T-2")
+
+    # Evicted from memory, reloaded from SQLite
+    assert writer.get_conversation("T-1").messages()[0]["content"] == "Still locked out"
+
+    reader = AgentMemory(sqlite_path=path)
+    reader.add_interaction("T-1", "agent", "Your account is unlocked")
+    conversation = AgentMemory(sqlite_path=path).get_conversation("T-1")
+    assert [t.role for t in conversation.history] == ["customer", "agent"]
+    assert reader.stats()["persisted"] == 2
+
+def test_sqlite_tier_sees_turns_from_another_instance(tmp_path):
+    path = str(tmp_path / "memory.db")
+    first = AgentMemory(sqlite_path=path)
+    first.initialize_conversation(TICKET, ticket_id="T-1")
+    first.add_interaction("T-1", "customer", "Still locked out")
+
+    # A second process continues the conversation the first one still holds in memory
+    AgentMemory(sqlite_path=path).add_interaction("T-1", "agent", "Your account is unlocked")
+    first.add_interaction("T-1", "customer", "Thanks")
+
+    assert [t.content for t in first.get_conversation("T-1").history] == [
+        "Still locked out", "Your account is unlocked", "Thanks"
+    ]
+    assert [t.role for t in AgentMemory(sqlite_path=path).get_conversation("T-1").history] == [
+        "customer", "agent", "customer"
+    ]
+
+def test_sqlite_path_directory_is_created(tmp_path):
+    path = tmp_path / "state" / "memory.db"
+    AgentMemory(sqlite_path=str(path)).initialize_conversation(TICKET, ticket_id="T-1")
+    assert path.exists()
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services import review
+from src.services.policy_engine import PolicyEngine
+
+@pytest.fixture
+def engine():
+    return PolicyEngine(review.POLICY_RULES, ["Do not promise refunds", "Escalate legal inquiries"])
+
+def test_refund_promise_is_certain_escalation(engine):
+    verdict = engine.evaluate("Billing", {"subject": "Refund", "description": "Charged twice"},
+                              "Sorry about that! We will issue you a full refund today.")
+    assert verdict.violations == ["Do not promise refunds"]
+    assert verdict.escalate is True
+
+def test_category_rules_only_apply_to_their_category(engine):
+    text = "Your password is hunter22, please keep it safe."
+    assert engine.check_draft("Security", text) == ["Do not share credentials"]
+    assert engine.check_draft("Technical", text) == []
+
+def test_clean_draft_is_inconclusive(engine):
+    verdict = engine.evaluate("Billing", {"subject": "Refund", "description": "Where is my refund?"},
+                              "Refunds take 5-7 business days once approved by our billing team.")
+    assert not verdict.conclusive
+
+def test_review_short_circuits_without_llm(mocker):
+    get_llm = mocker.patch.object(review.llm_service, "get_llm")
+    result = review.review_draft(
+        {"subject": "Refund", "description": "Charged twice"},
+        {"content": "We'll refund you right away.", "context_used": []},
+        category="Billing"
+    )
+    assert result["approved"] is False
+    assert result["violations"] == ["Do not promise refunds"]
+    get_llm.assert_not_called()
+
+@pytest.mark.parametrize("category, text", [
+    ("Billing", "We will send you the refund policy document."),
+    ("Billing", "I will check your refund status and get back to you."),
+    ("Billing", "We will process your refund request within 2 days."),
+    ("Security", "Your password is never requested by email."),
+    ("Security", "The password is case-sensitive."),
+])
+def test_informational_mentions_are_not_violations(engine, category, text):
+    assert engine.check_draft(category, text) == []
+
+def test_negated_match_is_ambiguous_not_violation(engine):
+    verdict = engine.evaluate("Technical", {"subject": "Crash", "description": "App crashes"},
+                              "We cannot guarantee this will fix it, but please try reinstalling.")
+    assert not verdict.conclusive
+    assert verdict.ambiguous == ["Do not guarantee fixes"]
+    # Negation in an earlier clause does not cover a later promise
+    assert engine.check_draft("Billing", "We can't change your plan, but we will issue a full refund.") \
+        == ["Do not promise refunds"]
+
+def test_unauthorized_charges_are_not_a_breach(engine):
+    ticket = {"subject": "Billing", "description": "I see unauthorized charges on my card"}
+    assert engine.check_ticket("Security", ticket) == []
+    hacked = {"subject": "Help", "description": "My account was hacked last night"}
+    assert engine.check_ticket("Security", hacked) == ["Escalate account breaches"]
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.retrieval_engine import BM25Engine, VectorEngine, build_vector_index
+
+@pytest.fixture
+def documents():
+    return [
+        {"category": "Billing", "text": "Refunds take 5-7 business days"},
+        {"category": "Billing", "text": "Invoices available in Billing Portal"},
+        {"category": "Technical", "text": "Clear cache/cookies for login issues"},
+        {"category": "Technical", "text": "API rate limit: 100 requests/minute"},
+        {"category": "Technical", "text": "Reset your password from the login page"},
+    ]
+
+def test_bm25_ranks_and_filters_by_category(documents):
+    engine = BM25Engine(documents)
+    results = engine.search("login cookies problem", "Technical", top_k=2)
+    assert results[0] == "Clear cache/cookies for login issues"
+    assert len(results) == 2
+    assert engine.search("refunds", "Technical", top_k=3) == []
+
+def test_vector_index_roundtrip(documents, tmp_path):
+    pytest.importorskip("numpy")
+    build_vector_index(documents, str(tmp_path), dim=256)
+    engine = VectorEngine.load(str(tmp_path))
+
+    results = engine.search("api rate limit requests", "Technical", top_k=1)
+    assert results == ["API rate limit: 100 requests/minute"]
+    assert all(doc in engine.category_documents("Billing") for doc in engine.search("invoices", "Billing", 5))
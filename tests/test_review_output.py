@@ -0,0 +1,90 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+from typing import Any, List, Optional
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from src.services import review, review_output
+from src.services.review_output import parse_review, resolve_review, review_parse_stats
+
+TICKET = {"subject": "Login issue", "description": "Cannot reset my password"}
+DRAFT = {"content": "Please use the 'Forgot password' link on the sign-in page.", "context_used": []}
+
+class ToolCallingModel(BaseChatModel):
+    """Answers every prompt with a tool call carrying ``args``"""
+    args: dict
+
+    @property
+    def _llm_type(self) -> str:
+        return "tool-calling-test"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=tools, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        message = AIMessage(content="", tool_calls=[{"name": "policy_review", "args": self.args, "id": "call-1"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+def _delta(before, outcome):
+    return review_parse_stats()[outcome] - before[outcome]
+
+def test_tolerant_parser_accepts_common_formatting_slips():
+    fenced = 'Here is my review:\n```json\n{"approved": True, "feedback": "Fine", "violations": [],}\n```'
+    assert parse_review(fenced) == {"approved": True, "feedback": "Fine", "violations": []}
+    assert parse_review('{"approved": "false", "feedback": "Too vague"}')["approved"] is False
+    # Violations always reject
+    assert parse_review('{"approved": true, "violations": "Do not promise refunds"}') == {
+        "approved": False, "feedback": "Policy check completed", "violations": ["Do not promise refunds"]
+    }
+
+def test_one_repair_call_fixes_unparseable_output(mocker):
+    before = review_parse_stats()
+    repair = FakeListChatModel(responses=['{"approved": true, "feedback": "", "violations": []}'])
+    mocker.patch.object(review_output.llm_service, "get_llm", return_value=repair)
+
+    result = resolve_review("Looks good to me, approve it.")
+
+    assert result["approved"] is True
+    assert _delta(before, "repaired") == 1
+
+def test_failed_repair_rejects_without_system_failure(mocker):
+    before = review_parse_stats()
+    mocker.patch.object(review_output.llm_service, "get_llm",
+                        return_value=FakeListChatModel(responses=["I cannot do that."]))
+
+    result = resolve_review("approved: maybe")
+
+    assert result["approved"] is False
+    assert result["violations"] == ["Unparseable review"]
+    assert _delta(before, "failed") == 1
+
+def test_review_uses_structured_output_when_supported(mocker):
+    before = review_parse_stats()
+    model = ToolCallingModel(args={"approved": True, "feedback": "Clear next steps", "violations": []})
+    mocker.patch.object(review.llm_service, "get_llm", return_value=model)
+
+    result = review.review_draft(TICKET, DRAFT, category="Security")
+
+    assert result == {"approved": True, "feedback": "Clear next steps", "violations": []}
+    assert _delta(before, "structured") == 1
+
+class OutageError(Exception):
+    status_code = 503
+
+def test_retryable_error_is_raised_not_reported_as_system_failure(mocker):
+    model = FakeListChatModel(responses=["unused"])
+    mocker.patch.object(review.llm_service, "get_llm", return_value=model)
+    mocker.patch.object(review, "structured_review_llm", return_value=None)
+    mocker.patch.object(FakeListChatModel, "invoke", side_effect=OutageError("HTTP 503"))
+    mocker.patch.object(FakeListChatModel, "ainvoke", side_effect=OutageError("HTTP 503"))
+
+    with pytest.raises(OutageError):
+        review.review_draft(TICKET, DRAFT, category="Security")
+    with pytest.raises(OutageError):
+        asyncio.run(review.areview_draft(TICKET, DRAFT, category="Security"))
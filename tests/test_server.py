@@ -0,0 +1,101 @@
+import sys
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core import SupportAgent
+from src.server import create_server
+
+class SlowAgent:
+    instrumentation = None
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def process_ticket(self, ticket):
+        time.sleep(self.delay)
+        return {"ticket": ticket, "attempt": 1, "escalated": False}
+
+def _serve(agent, concurrency=2, max_queue=2):
+    server = create_server("127.0.0.1", 0, concurrency, max_queue, agent=agent)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def _post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST",
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+@pytest.fixture
+def served():
+    servers = []
+    def start(*args, **kwargs):
+        server, url = _serve(*args, **kwargs)
+        servers.append(server)
+        return url
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_single_ticket_and_metrics(served):
+    url = served(SupportAgent())
+    status, result = _post(f"{url}/tickets", {"subject": "Login issue", "description": "Cannot log in"})
+    assert status == 200
+    assert result["ticket"]["subject"] == "Login issue"
+    assert result["draft"]["content"]
+
+    with urllib.request.urlopen(f"{url}/metrics", timeout=10) as response:
+        metrics = response.read().decode()
+    assert 'support_agent_http_requests_total{path="/tickets",status="200"} 1' in metrics
+    assert "support_agent_ticket_latency_seconds_count 1" in metrics
+
+def test_batch_preserves_order(served):
+    url = served(SlowAgent(), max_queue=10)
+    tickets = [{"subject": f"Ticket {i}", "description": "Help"} for i in range(5)]
+    status, body = _post(f"{url}/tickets/batch", {"tickets": tickets})
+    assert status == 200
+    assert [r["ticket"]["subject"] for r in body["results"]] == [t["subject"] for t in tickets]
+
+def test_rejects_with_429_when_queue_is_full(served):
+    url = served(SlowAgent(delay=0.3), concurrency=1, max_queue=1)
+    statuses = []
+    threads = [threading.Thread(target=lambda: statuses.append(
+        _post(f"{url}/tickets", {"subject": "s", "description": "d"})[0])) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses.count(200) == 2
+    assert statuses.count(429) == 2
+
+def test_rejects_malformed_requests(served):
+    url = served(SlowAgent())
+    assert _post(f"{url}/tickets", ["not", "an", "object"])[0] == 400
+    assert _post(f"{url}/tickets/batch", {"tickets": "nope"})[0] == 400
+    assert _post(f"{url}/unknown", {})[0] == 404
+
+def test_batch_over_capacity_is_too_large_not_busy(served):
+    url = served(SlowAgent(), concurrency=2, max_queue=2)
+    tickets = [{"subject": f"Ticket {i}", "description": "Help"} for i in range(5)]
+    status, body = _post(f"{url}/tickets/batch", {"tickets": tickets})
+    assert status == 413
+    assert "maximum of 4" in body["error"]
+
+def test_unknown_paths_share_one_metrics_label(served):
+    url = served(SlowAgent())
+    for path in ("/a", "/b", "/c?x=1"):
+        assert _post(f"{url}{path}", {})[0] == 404
+    with urllib.request.urlopen(f"{url}/metrics", timeout=10) as response:
+        metrics = response.read().decode()
+    assert 'support_agent_http_requests_total{path="other",status="404"} 3' in metrics
+    assert 'path="/a"' not in metrics
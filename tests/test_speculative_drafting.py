@@ -0,0 +1,123 @@
+import asyncio
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import settings
+from src.core import SupportAgent
+from src.services import speculative_drafting
+from src.services.speculative_drafting import aspeculative_draft, plan_candidates, speculative_draft
+
+TICKET = {"subject": "Double charge", "description": "I was billed twice for my plan this month"}
+CONTEXT = {"category": "Billing", "documents": ["Refunds take 5-7 business days", "Invoices are monthly"]}
+
+def _review(ticket, draft, category):
+    approved = draft["content"] == "draft@0.8"
+    return {"approved": approved, "feedback": None if approved else "Too vague", "violations": []}
+
+def test_first_approved_candidate_wins_and_slow_ones_are_cancelled(mocker):
+    def fake_stream(ticket, context, previous_draft, review, category, temperature, should_stop):
+        if temperature is None:
+            # The regular candidate is slow: it only returns once cancelled
+            for _ in range(500):
+                if should_stop():
+                    break
+                __import__("time").sleep(0.01)
+        return {"content": f"draft@{temperature}", "context_used": context["documents"]}
+    mocker.patch.object(speculative_drafting, "stream_draft", side_effect=fake_stream)
+    review = mocker.patch.object(speculative_drafting, "review_draft", side_effect=_review)
+
+    outcome = speculative_draft(TICKET, CONTEXT, "Billing")
+
+    assert outcome["draft"]["content"] == "draft@0.8"
+    assert outcome["review"]["approved"] is True
+    assert outcome["stats"]["candidates"] == 3
+    assert outcome["stats"]["winner"] == 2
+    assert outcome["stats"]["cancelled"] == 1
+    # Leave-one-out context subsets for the extra candidates
+    assert outcome["draft"]["context_used"] == ["Refunds take 5-7 business days"]
+    assert all(call.args[1]["content"] != "draft@None" for call in review.call_args_list)
+
+def test_all_rejected_keeps_regular_draft(mocker):
+    mocker.patch.object(speculative_drafting, "stream_draft",
+                        side_effect=lambda *a, temperature, **k: {"content": f"draft@{temperature}", "context_used": []})
+    mocker.patch.object(speculative_drafting, "review_draft",
+                        return_value={"approved": False, "feedback": "Too vague", "violations": []})
+
+    outcome = speculative_draft(TICKET, CONTEXT, "Security")
+
+    assert outcome["stats"]["candidates"] == 2 and outcome["stats"]["winner"] is None
+    assert outcome["draft"]["content"] == "draft@None"
+
+def test_retryable_failure_is_raised_when_no_candidate_is_approved(mocker):
+    def fake_stream(ticket, context, previous_draft, review, category, temperature, should_stop):
+        if temperature is not None:
+            raise TimeoutError("draft timed out")
+        return {"content": "draft@None", "context_used": []}
+    mocker.patch.object(speculative_drafting, "stream_draft", side_effect=fake_stream)
+    mocker.patch.object(speculative_drafting, "review_draft",
+                        return_value={"approved": False, "feedback": "Too vague", "violations": []})
+
+    with pytest.raises(TimeoutError):
+        speculative_draft(TICKET, CONTEXT, "Security")
+
+def test_async_retryable_failure_is_raised_when_no_candidate_is_approved(mocker):
+    async def fake_astream(ticket, context, previous_draft, review, category, temperature):
+        if temperature is not None:
+            raise TimeoutError("draft timed out")
+        return {"content": "draft@None", "context_used": []}
+
+    async def fake_review(ticket, draft, category):
+        return {"approved": False, "feedback": "Too vague", "violations": []}
+
+    mocker.patch.object(speculative_drafting, "astream_draft", side_effect=fake_astream)
+    mocker.patch.object(speculative_drafting, "areview_draft", side_effect=fake_review)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(aspeculative_draft(TICKET, CONTEXT, "Security"))
+
+def test_token_budget_limits_candidates(monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_TOKEN_BUDGETS", {"General": 1})
+    planned, tokens = plan_candidates(TICKET, CONTEXT, "Billing")
+    assert len(planned) == 1 and planned[0][0] is None
+    assert tokens > 1
+
+def test_async_candidates_are_cancelled_after_a_win(mocker):
+    cancelled = []
+
+    async def fake_astream(ticket, context, previous_draft, review, category, temperature):
+        if temperature is None:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(temperature)
+                raise
+        return {"content": f"draft@{temperature}", "context_used": []}
+
+    async def fake_review(ticket, draft, category):
+        return _review(ticket, draft, category)
+
+    mocker.patch.object(speculative_drafting, "astream_draft", side_effect=fake_astream)
+    mocker.patch.object(speculative_drafting, "areview_draft", side_effect=fake_review)
+
+    outcome = asyncio.run(aspeculative_draft(TICKET, CONTEXT, "Billing"))
+
+    assert outcome["stats"]["winner"] == 2
+    assert cancelled == [None]
+
+def test_agent_applies_speculative_review(mocker):
+    mocker.patch("src.core.agent.classify_ticket", return_value={"category": "Billing", "confidence": 0.9})
+    speculate = mocker.patch("src.core.agent.speculative_draft", return_value={
+        "draft": {"content": "We are looking into the double charge.", "context_used": []},
+        "review": {"approved": True, "feedback": None, "violations": []},
+        "stats": {"candidates": 3, "winner": 1, "cancelled": 2, "prompt_tokens": 900}
+    })
+    review = mocker.patch("src.core.agent.review_draft")
+
+    result = SupportAgent(speculative_drafts=True).process_ticket(TICKET)
+
+    assert result["review"]["approved"] is True and not result["escalated"]
+    assert result["speculation"]["winner"] == 1
+    assert speculate.call_count == 1
+    review.assert_not_called()
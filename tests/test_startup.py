@@ -0,0 +1,36 @@
+import sys
+import json
+import os
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+def _loaded_modules(code):
+    output = subprocess.check_output(
+        [sys.executable, "-c", f"import sys, json\n{code}\nprint(json.dumps(sorted(sys.modules)))"],
+        cwd=ROOT, env={**os.environ, "LLM_PROVIDER": "synthetic"}, text=True
+    )
+    return set(json.loads(output.strip().splitlines()[-1]))
+
+def test_cli_import_skips_heavy_dependencies():
+    modules = _loaded_modules("import src.main")
+    assert not {"langgraph", "langchain_core", "langchain_groq", "langchain_openai"} & modules
+
+def test_only_selected_provider_sdk_is_loaded():
+    modules = _loaded_modules(
+        "from src.core.llm_service import llm_service\n"
+        "llm_service.get_llm('draft')"
+    )
+    assert "src.core.fake_llm" in modules
+    assert "langchain_groq" not in modules
+    # The openai fallback has no key in the test environment, so its SDK stays unloaded
+    if not os.getenv("OPENAI_API_KEY"):
+        assert "langchain_openai" not in modules
+
+def test_import_does_not_configure_logging():
+    output = subprocess.check_output(
+        [sys.executable, "-c", "import logging, src.core.agent; print(len(logging.getLogger().handlers))"],
+        cwd=ROOT, env={**os.environ, "LLM_PROVIDER": "synthetic"}, text=True
+    )
+    assert output.strip().splitlines()[-1] == "0"
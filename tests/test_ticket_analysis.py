@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core import SupportAgent
+from src.services.retrieval_engine import VectorEngine, build_vector_index
+from src.services.ticket_analysis import analyze_ticket
+
+def test_trivial_variants_share_fingerprint():
+    first = analyze_ticket({"subject": "Refund  status", "description": "Where is my refund?\n\n"})
+    second = analyze_ticket({"subject": "refund status", "description": "  WHERE is my refund?"})
+
+    assert first["text"] == "Refund status\nWhere is my refund?"
+    assert first["fingerprint"] == second["fingerprint"]
+    assert first["embedding"] is None  # BM25 retrieval needs no query vector
+
+def test_language_and_keywords():
+    english = analyze_ticket({"subject": "Login error", "description": "I can't log in to my account, the login page errors"})
+    spanish = analyze_ticket({"subject": "Factura", "description": "No encuentro la factura de mi cuenta para el mes"})
+    unknown = analyze_ticket({"subject": "ERR_500", "description": "api 500"})
+
+    assert english["language"] == "en"
+    assert english["keywords"][0] == "login"
+    assert "account" in english["keywords"]
+    assert spanish["language"] == "es"
+    assert unknown["language"] == "und"
+
+def test_analysis_runs_once_across_retries(mocker):
+    analyze = mocker.patch("src.core.agent.analyze_ticket", side_effect=analyze_ticket)
+    mocker.patch("src.core.agent.classify_ticket", return_value={"category": "Billing", "confidence": 0.9})
+    retrieve = mocker.patch("src.core.agent.retrieve_context",
+                            return_value={"category": "Billing", "documents": ["Refunds take 5-7 business days"]})
+    mocker.patch("src.core.agent.generate_draft", return_value={"content": "Draft", "context_used": []})
+    mocker.patch("src.core.agent.review_draft", side_effect=[
+        {"approved": False, "feedback": "Missing context about refund timing", "violations": []},
+        {"approved": True, "feedback": None, "violations": []},
+    ])
+
+    result = SupportAgent().process_ticket({"subject": "Refund", "description": "Where is my refund?"})
+
+    assert result["review"]["approved"] is True
+    assert retrieve.call_count == 2
+    assert analyze.call_count == 1
+    assert all(call.args[2] == result["analysis"] for call in retrieve.call_args_list)
+
+def test_vector_search_reuses_precomputed_embedding(tmp_path):
+    pytest.importorskip("numpy")
+    documents = [
+        {"category": "Technical", "text": "API rate limit: 100 requests/minute"},
+        {"category": "Technical", "text": "Clear cache/cookies for login issues"},
+    ]
+    build_vector_index(documents, str(tmp_path), dim=128)
+    engine = VectorEngine.load(str(tmp_path))
+    query = "api rate limit"
+
+    embedding = engine.embed_query(query)
+    assert engine.search(query, "Technical", 1, embedding=embedding) == engine.search(query, "Technical", 1)
+
+def test_non_english_ticket_is_classified_by_llm(mocker):
+    from src.services import classification
+    llm = mocker.Mock()
+    llm.invoke.return_value.content = "Billing"
+    mocker.patch.object(classification, "_PROMPT", mocker.MagicMock(__or__=lambda self, other: llm))
+    ticket = {"subject": "Refund invoice", "description": "No encuentro la factura del refund de mi cuenta"}
+
+    result = classification.classify_ticket(ticket, analyze_ticket(ticket))
+
+    assert result["source"] == "llm"
+    llm.invoke.assert_called_once()